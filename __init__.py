@@ -1,9 +1,12 @@
 """Typst bot plugin for nonebot2."""
 
+from nonebot import get_driver
 from nonebot.plugin import PluginMetadata
 
+from .core import default_executor, lifecycle, loop_monitor, metrics, setup_metrics_endpoint
 from .features import (
     admin_feature,
+    preload_features,
     render_feature,
     welcome_feature,
     daily_summary_feature,
@@ -18,6 +21,7 @@ __plugin_meta__ = PluginMetadata(
     /enable <功能名> - 启用功能
     /disable <功能名> - 禁用功能
     /status - 查看功能状态
+    /profile [秒数] - 对事件循环采样分析（仅超级管理员）
     /add_admin <QQ号> - 添加管理员
     /remove_admin <QQ号> - 移除管理员
     
@@ -48,6 +52,34 @@ __plugin_meta__ = PluginMetadata(
     },
 )
 
+driver = get_driver()
+driver.on_startup(loop_monitor.start)
+
+# 启动时在线程中创建功能实例，首条消息不再在事件循环中初始化数据库等
+driver.on_startup(preload_features)
+
+# 收到退出信号时先在连接断开前排空进行中的请求，关闭时再执行各功能注册的关闭钩子
+driver.on_startup(lifecycle.install_signal_handlers)
+driver.on_shutdown(lifecycle.shutdown)
+lifecycle.on_shutdown(loop_monitor.stop)
+
+# 运行指标：GET /metrics（Prometheus文本格式），需在配置 metrics 中启用并建议设置令牌
+setup_metrics_endpoint(driver)
+metrics.gauge(
+    "loop_blocked_seconds",
+    "事件循环被阻塞的累计时间",
+    collect=lambda: {(): loop_monitor.blocked_seconds}
+)
+metrics.gauge(
+    "loop_max_lag_seconds",
+    "事件循环最长唤醒延迟",
+    collect=lambda: {(): loop_monitor.max_lag}
+)
+
+@lifecycle.on_shutdown
+async def _shutdown_executor():
+    default_executor.shutdown(wait=False)
+
 __all__ = [
     "admin_feature",
     "render_feature",
@@ -0,0 +1,63 @@
+"""Shared helpers for the benchmark scripts."""
+
+import importlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+# 插件根目录
+ROOT = Path(__file__).resolve().parent.parent
+
+def load_module(relative_path: str) -> ModuleType:
+    """按文件路径加载单个无相对导入的模块，避免触发插件初始化"""
+    path = ROOT / relative_path
+    name = f"_bench_{path.stem}"
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def count_tokens(text: str) -> int:
+    """统计token数，未安装tiktoken时按字符粗略估算"""
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except ImportError:
+        cjk = sum(1 for ch in text if "⺀" <= ch <= "鿿" or "＀" <= ch <= "￯")
+        return cjk + (len(text) - cjk + 3) // 4
+
+def init_nonebot(workdir: Optional[Path] = None) -> Path:
+    """在临时工作目录中初始化nonebot，返回工作目录
+
+    插件在导入时会按相对路径创建数据目录，因此切换到临时目录，
+    只复制配置文件。
+    """
+    import nonebot
+    from nonebot.adapters.onebot.v11 import Adapter
+
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="typst_bot_bench_"))
+    config_dir = workdir / "src/plugins/typst_bot/data"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy(ROOT / "data/config.json", config_dir / "config.json")
+    os.chdir(workdir)
+
+    sys.path.insert(0, str(ROOT.parent))
+    nonebot.init()
+    nonebot.get_driver().register_adapter(Adapter)
+    return workdir
+
+def load_plugin(workdir: Optional[Path] = None) -> ModuleType:
+    """在临时工作目录中初始化nonebot并加载插件"""
+    import nonebot
+
+    init_nonebot(workdir)
+    nonebot.load_plugin(ROOT.name)
+    return importlib.import_module(ROOT.name)
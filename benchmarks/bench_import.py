@@ -0,0 +1,87 @@
+"""Import-time budget for loading the plugin.
+
+用法：
+    python benchmarks/bench_import.py [--repeat 5] [--budget 400]
+
+每次在新的子进程中初始化nonebot后计时加载插件（不含nonebot自身的初始化），
+并检查加载后是否导入了应延迟加载的重量级依赖，最后逐个触发功能实例的初始化，
+统计首次使用的开销。加载耗时中位数超出预算或导入了重量级依赖时以状态码1退出。
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import ROOT, init_nonebot
+
+# 加载插件时不应导入的依赖，由各功能在首次使用时导入
+HEAVY_MODULES = ("sqlalchemy", "jinja2", "httpx", "aiohttp", "opencc")
+
+FEATURES = ("render_feature", "welcome_feature", "daily_summary_feature", "yau_feature")
+
+def measure() -> dict:
+    """在当前进程中计时加载插件及各功能的首次初始化"""
+    import nonebot
+
+    init_nonebot()
+    before = set(sys.modules)
+    started = time.perf_counter()
+    nonebot.load_plugin(ROOT.name)
+    load_seconds = time.perf_counter() - started
+    imported = set(sys.modules) - before
+
+    plugin = sys.modules[ROOT.name]
+    first_use = {}
+    for name in FEATURES:
+        started = time.perf_counter()
+        getattr(plugin, name).resolve()
+        first_use[name] = time.perf_counter() - started
+
+    return {
+        "load": load_seconds,
+        "modules": len(imported),
+        "heavy": sorted(name for name in HEAVY_MODULES if name in imported),
+        "first_use": first_use,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=300, help="加载耗时预算（毫秒）")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    load_ms = statistics.median(run["load"] for run in runs) * 1000
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    print(f"加载插件: median={load_ms:.1f}ms 预算={args.budget:.0f}ms 新导入模块={runs[0]['modules']}")
+    for name in FEATURES:
+        first_use = statistics.median(run["first_use"][name] for run in runs) * 1000
+        print(f"  首次使用 {name:<24} {first_use:>8.1f}ms")
+
+    failed = False
+    if heavy:
+        print(f"加载时导入了应延迟加载的依赖: {', '.join(heavy)}")
+        failed = True
+    if load_ms > args.budget:
+        print("加载耗时超出预算")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
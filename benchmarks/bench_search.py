@@ -0,0 +1,114 @@
+"""Query latency of the message full-text index on a synthetic corpus.
+
+用法：
+    python benchmarks/bench_search.py [--rows 2000000] [--groups 50] [--queries 200]
+
+生成多群组的合成聊天记录（经由触发器同步写入全文索引），
+分别统计全文检索与LIKE全表扫描的查询延迟。
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from _common import load_plugin
+
+VOCABULARY = (
+    "typst 排版 公式 模板 编译 字体 表格 引用 脚注 图片 代码 高亮 "
+    "latex markdown 渲染 插件 函数 变量 循环 分页 目录 标题 列表 "
+    "数学 矩阵 积分 求和 向量 坐标 颜色 渐变 边距 行距 对齐 缩进"
+).split()
+
+# 低频词，约1%的消息包含其一
+RARE_TERMS = ("cetz", "oxifmt", "tablex", "polylux", "touying", "fletcher")
+
+QUERIES = ("typst 编译", "数学公式", "模板", "markdown") + RARE_TERMS
+
+def populate(db_path: str, rows: int, groups: int) -> None:
+    """直接写入合成数据，触发器负责同步全文索引"""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=90)
+    conn = sqlite3.connect(db_path)
+    batch = []
+    for i in range(rows):
+        words = rng.choices(VOCABULARY, k=rng.randint(3, 15))
+        if rng.random() < 0.01:
+            words.append(rng.choice(RARE_TERMS))
+        batch.append((
+            f"bench{i}",
+            f"g{i % groups}",
+            f"u{rng.randrange(2000)}",
+            "bench",
+            "".join(w if rng.random() < 0.7 else f" {w} " for w in words),
+            "text",
+            (start + timedelta(seconds=i * 90 * 86400 // rows)).isoformat(sep=" "),
+        ))
+        if len(batch) >= 50000:
+            conn.executemany(
+                "INSERT INTO messages (msg_id, group_id, sender_id, sender_name, "
+                "content, msg_type, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            conn.commit()
+            batch.clear()
+    if batch:
+        conn.executemany(
+            "INSERT INTO messages (msg_id, group_id, sender_id, sender_name, "
+            "content, msg_type, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        conn.commit()
+    conn.close()
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    plugin = load_plugin()
+    feature = plugin.daily_summary_feature
+    if not feature.fts_enabled:
+        print("当前SQLite不支持FTS5")
+        return
+
+    started = time.perf_counter()
+    populate(str(feature.db_path), args.rows, args.groups)
+    print(f"写入 {args.rows} 行: {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(7)
+    since = datetime.now() - timedelta(days=30)
+    fts_ms, like_ms = {}, {}
+    for _ in range(args.queries):
+        group_id = f"g{rng.randrange(args.groups)}"
+        query = rng.choice(QUERIES)
+        kind = "rare" if query in RARE_TERMS else "common"
+
+        started = time.perf_counter()
+        feature.search_messages(group_id, query, since=since, limit=20)
+        fts_ms.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+
+        # 对照组：仅用LIKE过滤
+        feature.fts_enabled = False
+        started = time.perf_counter()
+        feature.search_messages(group_id, query, since=since, limit=20)
+        like_ms.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+        feature.fts_enabled = True
+
+    for name, results in (("fts5", fts_ms), ("like", like_ms)):
+        for kind, values in sorted(results.items()):
+            print(
+                f"{name}/{kind}: p50={statistics.median(values):.2f}ms "
+                f"p95={percentile(values, 0.95):.2f}ms p99={percentile(values, 0.99):.2f}ms"
+            )
+
+if __name__ == "__main__":
+    main()
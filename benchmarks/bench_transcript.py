@@ -0,0 +1,84 @@
+"""Compare prompt sizes of the JSON and compact transcript encodings.
+
+用法：
+    python benchmarks/bench_transcript.py [messages.db] [--group GROUP_ID]
+
+读取 MessageTable 导出（SQLite数据库），按群组分别统计两种编码的
+字符数与token数。
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from _common import ROOT, count_tokens, load_module
+
+def load_records(db_path: str, group_id: str | None):
+    """从数据库读取消息，按群组分组"""
+    conn = sqlite3.connect(db_path)
+    query = (
+        "SELECT group_id, sender_id, sender_name, content, timestamp, topic_id "
+        "FROM messages"
+    )
+    params: tuple = ()
+    if group_id:
+        query += " WHERE group_id = ?"
+        params = (group_id,)
+    query += " ORDER BY group_id, timestamp"
+
+    groups: dict = {}
+    for gid, sender_id, sender_name, content, timestamp, topic_id in conn.execute(query, params):
+        groups.setdefault(gid, []).append(SimpleNamespace(
+            sender_id=sender_id,
+            sender_name=sender_name,
+            content=content,
+            timestamp=datetime.fromisoformat(timestamp),
+            topic_id=topic_id,
+        ))
+    conn.close()
+    return groups
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "db",
+        nargs="?",
+        default=str(ROOT / "data/daily_summary/messages.db"),
+        help="MessageTable 所在的SQLite数据库"
+    )
+    parser.add_argument("--group", default=None, help="只统计指定群组")
+    args = parser.parse_args()
+
+    transcript = load_module("core/transcript.py")
+    encoder = transcript.TranscriptEncoder()
+
+    groups = load_records(args.db, args.group)
+    if not groups:
+        print(f"{args.db} 中没有消息记录")
+        return
+
+    print(f"{'group':>12} {'msgs':>6} {'json_tok':>9} {'compact_tok':>11} {'saved':>7} {'enc_ms':>7}")
+    total_json = total_compact = 0
+    for gid, records in groups.items():
+        json_text = transcript.encode_json(records)
+        started = time.perf_counter()
+        compact_text = encoder.encode(records)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        json_tokens = count_tokens(json_text)
+        compact_tokens = count_tokens(compact_text)
+        total_json += json_tokens
+        total_compact += compact_tokens
+        saved = 1 - compact_tokens / json_tokens if json_tokens else 0
+        print(
+            f"{gid:>12} {len(records):>6} {json_tokens:>9} "
+            f"{compact_tokens:>11} {saved:>6.1%} {elapsed:>7.1f}"
+        )
+
+    if total_json:
+        print(f"总计: {total_json} -> {total_compact} tokens ({1 - total_compact / total_json:.1%} 减少)")
+
+if __name__ == "__main__":
+    main()
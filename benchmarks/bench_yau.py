@@ -0,0 +1,63 @@
+"""Throughput of YauFeature._convert_text with and without its caches.
+
+用法：
+    python benchmarks/bench_yau.py [--messages 20000]
+
+语料按齐夫分布从常见短句中抽取并拼接，模拟群聊中反复出现的
+相同或相近的句子；同时校验分段转换与整段转换结果一致。
+"""
+
+import argparse
+import random
+import time
+
+from _common import load_plugin
+
+PHRASES = (
+    "今天天气真好", "这个公式怎么写", "我觉得这个说法有问题", "数学家都是这样的",
+    "你们国内的学生", "这个问题很简单", "我在哈佛的时候", "这是常识",
+    "没有什么好讨论的", "请大家认真学习", "年轻人要脚踏实地", "我说的都是事实",
+    "这个证明是错误的", "菲尔兹奖", "中国的数学教育", "基础研究很重要",
+)
+PUNCTUATION = "，。！？"
+
+def build_corpus(count: int, seed: int = 0):
+    """生成语料：多数为短句，少量为由多句拼接的长文本"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(PHRASES))]
+    corpus = []
+    for _ in range(count):
+        parts = rng.choices(PHRASES, weights=weights, k=rng.choice((1, 1, 2, 3, 12, 40)))
+        corpus.append("".join(p + rng.choice(PUNCTUATION) for p in parts))
+    return corpus
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    plugin = load_plugin()
+    feature = plugin.yau_feature
+    corpus = build_corpus(args.messages)
+    chars = sum(len(text) for text in corpus)
+
+    started = time.perf_counter()
+    expected = [feature.converter.convert(text) for text in corpus]
+    baseline = time.perf_counter() - started
+
+    feature._text_cache.clear()
+    feature._segment_cache.clear()
+    started = time.perf_counter()
+    actual = [feature._convert_text(text) for text in corpus]
+    cached = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(actual, expected) if a != b)
+    print(f"语料: {len(corpus)} 条, {chars} 字")
+    print(f"opencc:  {len(corpus) / baseline:>10.0f} msg/s  {chars / baseline / 1e6:.2f} Mchar/s")
+    print(f"cached:  {len(corpus) / cached:>10.0f} msg/s  {chars / cached / 1e6:.2f} Mchar/s")
+    print(f"加速: {baseline / cached:.1f}x, 结果不一致: {mismatches}")
+    for name, stats in feature.cache_stats().items():
+        print(f"{name}: hit_rate={stats['hit_rate']:.1%} size={stats['size']} evictions={stats['evictions']}")
+
+if __name__ == "__main__":
+    main()
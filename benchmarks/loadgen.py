@@ -0,0 +1,493 @@
+"""Offline load generator against a fake OneBot v11 implementation.
+
+用法：
+    python benchmarks/loadgen.py [--duration 60] [--rate 5] [--joins 0.2]
+                                 [--mix typ=3,teq=1,yau=2,chat=20,summary=0.05]
+                                 [--terminate] [--output loadgen.json]
+
+在临时目录中以子进程启动机器人（fastapi驱动），本脚本作为OneBot v11实现
+通过反向WebSocket接入，按泊松过程向多个群发送 typ/teq/yau/聊天消息、
+/summary 命令和入群通知，并应答机器人的API调用；同时在本地启动兼容OpenAI
+接口的假模型服务和头像服务，不访问任何外部网络（Typst包除外）。
+
+每个需要回复的请求使用独立的群号，以群号关联回复并计算延迟；
+入群通知的延迟包含欢迎功能的合并窗口（join_batch_window）。
+结束时输出各功能的吞吐量、p50/p95/p99延迟、机器人进程的CPU与内存占用，
+以及从 /metrics 读取的各流水线编译耗时。
+指定 --terminate 时在发送结束后立即向机器人发送SIGTERM（模拟重启），
+报告当时进行中的请求有多少在连接断开前得到回复。
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from _common import ROOT
+from bench_yau import build_corpus
+
+SELF_ID = 10000
+SUPERUSER_ID = 10001
+METRICS_TOKEN = "loadgen-metrics"
+
+SAMPLES = {
+    "typ": (
+        "#lorem(30)",
+        "= 标题\n$ sum_(k=1)^n k = (n(n+1))/2 $",
+        "#table(columns: 3, [a], [b], [c], [1], [2], [3])",
+    ),
+    "teq": ("x = (-b +- sqrt(b^2 - 4a c))/(2a)", "integral_0^1 x^2 dif x = 1/3"),
+    "yau": ("你们国内的学生", "这个问题很简单\n学生：老师好\n这是常识"),
+}
+
+# 出现在错误回复中的词，不含图片的回复据此判断成败
+ERROR_WORDS = ("失败", "错误", "后再试")
+
+# 假模型返回的分析结果
+ANALYSIS = {
+    "topics": [{"name": "Typst排版", "heat": 4, "summary": "讨论模板与公式", "key_points": ["模板", "公式"]}],
+    "code_snippets": [],
+    "issues": [],
+    "resources": [],
+    "innovative_ideas": [],
+    "top_contributors": [{"name": "用户1", "contribution": "解答问题"}],
+}
+
+BOT_SCRIPT = """
+import sys
+import nonebot
+from nonebot.adapters.onebot.v11 import Adapter
+
+nonebot.init(driver="~fastapi", host="127.0.0.1", port={port}, command_start={{"/"}},
+             superusers={{"{superuser}"}}, log_level="WARNING")
+nonebot.get_driver().register_adapter(Adapter)
+sys.path.insert(0, {plugin_parent!r})
+nonebot.load_plugin({plugin_name!r})
+nonebot.run()
+"""
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def solid_png(size: int, rgb: Tuple[int, int, int] = (96, 140, 200)) -> bytes:
+    """生成纯色PNG，作为假头像"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(rgb) * size
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * size))
+        + chunk(b"IEND", b"")
+    )
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+@dataclass
+class FeatureStats:
+    """单个功能的统计"""
+    sent: int = 0
+    ok: int = 0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+class ProcessSampler:
+    """按 /proc 采样机器人进程（含已回收子进程）的CPU与内存"""
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.rss: List[int] = []
+        self.cpu: List[float] = []
+        self.cpu_start: Optional[float] = None
+        self.cpu_end: Optional[float] = None
+
+    def _read(self) -> Tuple[float, float, int]:
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        own = (int(fields[11]) + int(fields[12])) / self.ticks
+        children = (int(fields[13]) + int(fields[14])) / self.ticks
+        return own, children, int(fields[21]) * self.page_size
+
+    async def run(self) -> None:
+        last_time = time.monotonic()
+        own, children, rss = self._read()
+        self.cpu_start = own + children
+        last_cpu = self.cpu_start
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                own, children, rss = self._read()
+            except (FileNotFoundError, ProcessLookupError):
+                return
+            now = time.monotonic()
+            self.cpu.append((own + children - last_cpu) / (now - last_time) * 100)
+            self.rss.append(rss)
+            self.cpu_end = last_cpu = own + children
+            last_time = now
+
+class FakeOneBot:
+    """OneBot v11 实现端：发送事件并应答机器人的API调用"""
+    def __init__(self, avatar_png: bytes):
+        self.avatar_png = avatar_png
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.stats: Dict[str, FeatureStats] = {}
+        self.inflight: Dict[int, Tuple[str, float]] = {}  # 群号 -> (功能, 发送时间)
+        self.message_ids = itertools.count(1)
+        self.api_calls: Dict[str, int] = {}
+        self.last_errors: Dict[str, str] = {}
+
+    async def connect(self, session: aiohttp.ClientSession, url: str, timeout: float = 60) -> None:
+        """等待机器人启动并建立反向WebSocket连接"""
+        deadline = time.monotonic() + timeout
+        headers = {"X-Self-ID": str(SELF_ID), "X-Client-Role": "Universal"}
+        while True:
+            try:
+                self.ws = await session.ws_connect(url, headers=headers, max_msg_size=0)
+                return
+            except aiohttp.ClientError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.5)
+
+    async def serve(self) -> None:
+        async for msg in self.ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            if "action" in data:
+                asyncio.create_task(self._handle_api(data))
+
+    async def _handle_api(self, data: Dict[str, Any]) -> None:
+        action = data["action"]
+        params = data.get("params") or {}
+        self.api_calls[action] = self.api_calls.get(action, 0) + 1
+
+        result: Any = None
+        if action in ("send_msg", "send_group_msg", "send_group_forward_msg", "send_private_forward_msg"):
+            result = {"message_id": next(self.message_ids)}
+            if params.get("group_id") is not None:
+                self._complete(int(params["group_id"]), action, params.get("message"))
+        elif action == "get_group_info":
+            group_id = int(params["group_id"])
+            result = {"group_id": group_id, "group_name": f"压测群{group_id}", "member_count": 500, "max_member_count": 2000}
+        elif action == "get_group_member_info":
+            result = {
+                "group_id": int(params["group_id"]), "user_id": int(params["user_id"]),
+                "nickname": f"成员{params['user_id']}", "card": "", "join_time": int(time.time()),
+                "role": "member",
+            }
+        elif action == "get_login_info":
+            result = {"user_id": SELF_ID, "nickname": "TypstBot"}
+
+        await self.ws.send_str(json.dumps({
+            "status": "ok", "retcode": 0, "data": result, "echo": data.get("echo")
+        }))
+
+    def _complete(self, group_id: int, action: str, message: Any) -> None:
+        pending = self.inflight.pop(group_id, None)
+        if pending is None:
+            return
+        feature, started = pending
+        stats = self.stats[feature]
+        stats.latencies.append(time.perf_counter() - started)
+        text = json.dumps(message, ensure_ascii=False)
+        if "forward" in action or "image" in text or not any(word in text for word in ERROR_WORDS):
+            stats.ok += 1
+        else:
+            stats.errors += 1
+            self.last_errors[feature] = text[:300]
+
+    def _stats(self, feature: str) -> FeatureStats:
+        return self.stats.setdefault(feature, FeatureStats())
+
+    async def send_message(self, feature: str, group_id: int, user_id: int, text: str, expect_reply: bool) -> None:
+        self._stats(feature).sent += 1
+        if expect_reply:
+            self.inflight[group_id] = (feature, time.perf_counter())
+        await self.ws.send_str(json.dumps({
+            "time": int(time.time()), "self_id": SELF_ID, "post_type": "message",
+            "message_type": "group", "sub_type": "normal", "message_id": next(self.message_ids),
+            "group_id": group_id, "user_id": user_id, "anonymous": None,
+            "message": [{"type": "text", "data": {"text": text}}], "raw_message": text, "font": 0,
+            "sender": {"user_id": user_id, "nickname": f"用户{user_id}", "card": "", "role": "member"},
+        }))
+
+    async def send_join(self, group_id: int, user_ids: List[int]) -> None:
+        self._stats("join").sent += 1
+        self.inflight[group_id] = ("join", time.perf_counter())
+        for user_id in user_ids:
+            await self.ws.send_str(json.dumps({
+                "time": int(time.time()), "self_id": SELF_ID, "post_type": "notice",
+                "notice_type": "group_increase", "sub_type": "approve",
+                "group_id": group_id, "operator_id": SELF_ID, "user_id": user_id,
+            }))
+
+def fake_services(avatar_png: bytes, llm_delay: float) -> web.Application:
+    """兼容OpenAI接口的假模型服务和头像服务"""
+    async def completions(request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(llm_delay)
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": json.dumps(ANALYSIS, ensure_ascii=False)}}]
+        })
+
+    async def avatar(request: web.Request) -> web.Response:
+        return web.Response(body=avatar_png, content_type="image/png")
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    app.router.add_get("/avatar/{user_id}", avatar)
+    return app
+
+def prepare_workdir(workdir: Path, bot_port: int, service_port: int, rate_limit: bool = True) -> Path:
+    """复制数据目录并将模型和头像地址指向本地服务"""
+    shutil.copytree(ROOT / "data", workdir / "data", ignore=shutil.ignore_patterns("*.db", ".DS_Store"))
+    config = json.loads((ROOT / "data/config.json").read_text(encoding="utf-8"))
+    daily = config.setdefault("daily_summary", {})
+    daily["storage_path"] = "data/daily_summary/loadgen.db"
+    daily.setdefault("model", {}).update(
+        base_url=f"http://127.0.0.1:{service_port}/v1/chat/completions",
+        api_key="sk-loadgen"
+    )
+    config.setdefault("welcome", {})["avatar_url"] = f"http://127.0.0.1:{service_port}/avatar/{{user_id}}"
+    config["metrics"] = {"enabled": True, "token": METRICS_TOKEN}
+    if not rate_limit:
+        config.setdefault("ratelimit", {})["enabled"] = False
+
+    config_dir = workdir / "src/plugins/typst_bot/data"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / "config.json").write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    script = workdir / "bot.py"
+    script.write_text(BOT_SCRIPT.format(
+        port=bot_port, superuser=SUPERUSER_ID,
+        plugin_parent=str(ROOT.parent), plugin_name=ROOT.name
+    ), encoding="utf-8")
+    return script
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ("typ", "teq", "yau", "chat", "summary"):
+            raise SystemExit(f"未知消息类型: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+async def generate(bot: FakeOneBot, args: argparse.Namespace) -> None:
+    """按泊松过程发送消息和入群通知"""
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    kinds, weights = list(mix), list(mix.values())
+    chat_groups = [200000 + i for i in range(args.groups)]
+    corpus = build_corpus(5000, args.seed)
+    request_groups = itertools.count(300000)
+    users = itertools.count(500000)
+    deadline = time.monotonic() + args.duration
+
+    async def messages() -> None:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(rng.expovariate(args.rate))
+            kind = rng.choices(kinds, weights)[0]
+            if kind == "chat":
+                await bot.send_message("chat", rng.choice(chat_groups), rng.randrange(1, 400), rng.choice(corpus), False)
+            elif kind == "summary":
+                idle = [g for g in chat_groups if g not in bot.inflight]
+                if idle:
+                    await bot.send_message("summary", rng.choice(idle), SUPERUSER_ID, "/summary", True)
+            else:
+                text = f"{kind} {rng.choice(SAMPLES[kind])}"
+                await bot.send_message(kind, next(request_groups), rng.randrange(1, 400), text, True)
+
+    async def joins() -> None:
+        while args.joins > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(rng.expovariate(args.joins))
+            await bot.send_join(next(request_groups), [next(users) for _ in range(args.join_burst)])
+
+    await asyncio.gather(messages(), joins())
+
+async def scrape_compile_seconds(session: aiohttp.ClientSession, url: str) -> Dict[str, float]:
+    """从 /metrics 读取各流水线的编译耗时总和"""
+    try:
+        async with session.get(url, headers={"Authorization": f"Bearer {METRICS_TOKEN}"}) as response:
+            body = await response.text()
+    except aiohttp.ClientError:
+        return {}
+    result = {}
+    for line in body.splitlines():
+        if line.startswith("typst_bot_stage_seconds_sum") and 'stage="compile"' in line:
+            pipeline = line.split('pipeline="', 1)[1].split('"', 1)[0]
+            result[pipeline] = float(line.rsplit(" ", 1)[1])
+    return result
+
+def report(bot: FakeOneBot, sampler: ProcessSampler, compile_seconds: Dict[str, float], elapsed: float) -> Dict[str, Any]:
+    features = {}
+    for name, stats in sorted(bot.stats.items()):
+        entry: Dict[str, Any] = {
+            "sent": stats.sent, "ok": stats.ok, "errors": stats.errors,
+            "throughput": stats.sent / elapsed,
+        }
+        if stats.latencies:
+            entry.update(
+                completed=len(stats.latencies),
+                timeouts=stats.sent - len(stats.latencies),
+                p50=percentile(stats.latencies, 0.50),
+                p95=percentile(stats.latencies, 0.95),
+                p99=percentile(stats.latencies, 0.99),
+            )
+        features[name] = entry
+
+    resources = {
+        "cpu_percent_mean": statistics.fmean(sampler.cpu) if sampler.cpu else None,
+        "cpu_percent_max": max(sampler.cpu, default=None),
+        "cpu_seconds": (sampler.cpu_end - sampler.cpu_start) if sampler.cpu_end else None,
+        "rss_max_mb": max(sampler.rss, default=0) / 2**20,
+        "compile_seconds": compile_seconds,
+    }
+    return {
+        "elapsed": elapsed,
+        "features": features,
+        "resources": resources,
+        "api_calls": bot.api_calls,
+        "last_errors": bot.last_errors,
+    }
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"\n持续 {result['elapsed']:.1f}s")
+    print(f"{'功能':<10}{'发送':>8}{'成功':>8}{'失败':>8}{'超时':>8}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, entry in result["features"].items():
+        latency = "".join(
+            f"{entry[q] * 1000:>8.0f}ms" if q in entry else f"{'-':>10}"
+            for q in ("p50", "p95", "p99")
+        )
+        print(
+            f"{name:<10}{entry['sent']:>8}{entry['ok']:>8}{entry['errors']:>8}"
+            f"{entry.get('timeouts', 0):>8}{entry['throughput']:>9.2f}{latency}"
+        )
+    resources = result["resources"]
+    if resources["cpu_percent_mean"] is not None:
+        print(
+            f"\nCPU 平均 {resources['cpu_percent_mean']:.0f}% / 峰值 {resources['cpu_percent_max']:.0f}%"
+            f"（含Typst子进程，共 {resources['cpu_seconds']:.1f}s），内存峰值 {resources['rss_max_mb']:.0f} MB"
+        )
+    for pipeline, seconds in sorted(resources["compile_seconds"].items()):
+        print(f"{pipeline} 编译耗时合计 {seconds:.1f}s")
+    if restart := result.get("restart"):
+        print(
+            f"SIGTERM 时进行中 {restart['inflight']} 个请求，断开前送达 {restart['delivered']} 个，"
+            f"进程 {restart['exit_seconds']:.1f}s 后退出"
+        )
+    for feature, error in sorted(result["last_errors"].items()):
+        print(f"{feature} 最近的错误回复: {error[:120]}")
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    avatar_png = solid_png(160)
+
+    bot_port, service_port = free_port(), free_port()
+    workdir = Path(tempfile.mkdtemp(prefix="typst_bot_loadgen_"))
+    script = prepare_workdir(workdir, bot_port, service_port, rate_limit=not args.no_rate_limit)
+
+    runner = web.AppRunner(fake_services(avatar_png, args.llm_delay))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", service_port).start()
+
+    log = open(workdir / "bot.log", "w")
+    process = subprocess.Popen([sys.executable, str(script)], cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+    sampler = ProcessSampler(process.pid)
+    bot = FakeOneBot(avatar_png)
+    try:
+        async with aiohttp.ClientSession() as session:
+            await bot.connect(session, f"ws://127.0.0.1:{bot_port}/onebot/v11/ws")
+            serve_task = asyncio.create_task(bot.serve())
+            sampler_task = asyncio.create_task(sampler.run())
+
+            started = time.monotonic()
+            await generate(bot, args)
+            if args.terminate:
+                # 模拟重启：负载中发送SIGTERM，检查进行中的请求在连接断开前是否得到回复
+                # 先等最后发出的事件送达机器人：信号之后到达的事件按设计不再处理
+                await asyncio.sleep(0.5)
+                compile_seconds = await scrape_compile_seconds(session, f"http://127.0.0.1:{bot_port}/metrics")
+                pending = set(bot.inflight)
+                terminated = time.monotonic()
+                process.terminate()
+                drain_deadline = terminated + args.drain
+                while pending & set(bot.inflight) and not serve_task.done() and time.monotonic() < drain_deadline:
+                    await asyncio.sleep(0.05)
+                elapsed = time.monotonic() - started
+                await asyncio.to_thread(process.wait, args.drain)
+                restart = {
+                    "inflight": len(pending),
+                    "delivered": len(pending - set(bot.inflight)),
+                    "exit_seconds": time.monotonic() - terminated,
+                }
+            else:
+                # 等待未完成的请求
+                drain_deadline = time.monotonic() + args.drain
+                while bot.inflight and time.monotonic() < drain_deadline:
+                    await asyncio.sleep(0.2)
+                elapsed = time.monotonic() - started
+                compile_seconds = await scrape_compile_seconds(session, f"http://127.0.0.1:{bot_port}/metrics")
+                restart = None
+            sampler_task.cancel()
+            serve_task.cancel()
+            result = report(bot, sampler, compile_seconds, elapsed)
+            if restart is not None:
+                result["restart"] = restart
+            return result
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+        await runner.cleanup()
+        print(f"机器人日志: {workdir / 'bot.log'}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=60, help="发送持续时间（秒）")
+    parser.add_argument("--rate", type=float, default=5, help="消息到达率（条/秒）")
+    parser.add_argument("--mix", default="typ=3,teq=1,yau=2,chat=20,summary=0.05", help="消息类型权重")
+    parser.add_argument("--groups", type=int, default=20, help="聊天消息分布的群数")
+    parser.add_argument("--joins", type=float, default=0.2, help="入群事件到达率（次/秒）")
+    parser.add_argument("--join-burst", type=int, default=1, help="每次同时入群的人数")
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="假模型的响应延迟（秒）")
+    parser.add_argument("--drain", type=float, default=60, help="结束后等待未完成请求的时间（秒）")
+    parser.add_argument("--terminate", action="store_true", help="发送结束时向机器人发送SIGTERM，检查进行中的请求是否在退出前得到回复")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-rate-limit", action="store_true", help="关闭限流，测量编译容量上限")
+    parser.add_argument("--output", type=Path, help="JSON结果文件")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Benchmark suite for the compile, template and ingestion hot paths.
+
+用法：
+    python benchmarks/run.py [--filter compile] [--repeat 5] [--output results.json]
+    python benchmarks/run.py --compare benchmarks/results/old.json
+
+每个用例先预热再重复计时，结果（含环境信息与git提交）写入JSON文件，
+默认保存在 benchmarks/results/ 下；--compare 与之前的结果逐项对比。
+依赖网络包（如 @preview/physica）的模板在离线环境中编译失败时记为错误，不影响其他用例。
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from _common import ROOT, count_tokens, load_plugin
+from bench_yau import build_corpus
+
+RESULTS_DIR = ROOT / "benchmarks/results"
+
+# 各模板的示例输入
+TYP_SAMPLE = "= 标题\n\n" + "#lorem(40)\n\n" * 4 + "$ sum_(k=1)^n k = (n(n+1))/2 $"
+TEQ_SAMPLE = "integral_0^oo e^(-x^2) dif x = sqrt(pi)/2"
+TYPC_SAMPLE = "let fib(n) = if n < 2 { n } else { fib(n - 1) + fib(n - 2) }\nfib(15)"
+
+@dataclass
+class Case:
+    """基准用例"""
+    name: str
+    func: Callable[[], Any]          # 同步函数或返回协程的函数
+    items: int = 1                   # 每次调用处理的条目数，用于计算吞吐量
+    unit: str = "op"
+    setup: Optional[Callable[[], Any]] = None  # 每次计时前调用，不计入耗时
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def _typst_version(compiler_path: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            [compiler_path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def _synthetic_day(count: int, seed: int = 0) -> list:
+    """生成一天的合成聊天记录"""
+    MessageRecord = importlib.import_module(f"{ROOT.name}.models").MessageRecord
+
+    rng = random.Random(seed)
+    corpus = build_corpus(count, seed)
+    start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    return [
+        MessageRecord(
+            msg_id=f"bench-{seed}-{i}",
+            group_id="bench",
+            sender_id=str(10000 + rng.randrange(40)),
+            sender_name=f"用户{rng.randrange(40)}",
+            content=text if rng.random() > 0.05 else f"[CQ:image,file={i}.png]",
+            msg_type="text",
+            timestamp=start + timedelta(seconds=i * 50400 // count),
+            topic_id=f"t{i // 30}"
+        )
+        for i, text in enumerate(corpus)
+    ]
+
+def build_cases(plugin) -> List[Case]:
+    """构造全部用例"""
+    core = importlib.import_module(f"{ROOT.name}.core")
+    avatar = importlib.import_module(f"{ROOT.name}.core.avatar")
+    render = core.TemplateManager.render_content
+    compiler = core.TypstCompiler(core.CompilerConfig(ppi=144))
+    cases: List[Case] = []
+
+    # 编译：各模板使用仓库中附带的版本
+    def template(path: str) -> str:
+        return (ROOT / "data" / path).read_text(encoding="utf-8")
+
+    welcome_context = {
+        "group_id": "123456", "group_name": "Typst 中文交流群", "user_id": "10001",
+        "nickname": "新成员", "join_time": "2025-01-01 12:00:00", "member_count": 500,
+        "nickname_list": '("新成员",)', "count": 1,
+        "avatar": "avatar-10001.png", "avatar_list": '("avatar-10001.png",)',
+    }
+    welcome_assets = {"avatar-10001.png": avatar.PLACEHOLDER_PNG}
+    sources = {
+        "typ": render(template("render/templates/typ.typ"), {"code": TYP_SAMPLE}),
+        "teq": render(template("render/templates/teq.typ"), {"equation": TEQ_SAMPLE}),
+        "typc": render(template("render/templates/typc.typ"), {"script": TYPC_SAMPLE}),
+        "yau": render(template("yaubot/templates/yau.typ"), {
+            "messages": plugin.yau_feature._render_messages(
+                [importlib.import_module(f"{ROOT.name}.models.yau").YauMessage(content="你好")],
+                ["你好"]
+            ),
+            "text": "你好",
+            "datetime_now": "2025-01-01 12:00:00",
+        }),
+        "welcome": render(template("welcome/templates/default.typ"), welcome_context),
+    }
+    for name, source in sources.items():
+        assets = welcome_assets if name == "welcome" else None
+
+        async def compile_once(source=source, assets=assets):
+            result = await compiler.compile(source, assets=assets)
+            if not result.success:
+                raise RuntimeError(result.error)
+
+        cases.append(Case(f"compile/{name}", compile_once, unit="doc"))
+
+    # 模板替换：体积最大的欢迎模板，实际字节数记录在 template_bytes
+    welcome_template = template("welcome/templates/default.typ")
+    cases.append(Case(
+        "template/welcome",
+        lambda: render(welcome_template, welcome_context),
+        unit="render",
+        extra={"template_bytes": len(welcome_template.encode())}
+    ))
+
+    # 繁体转换：冷缓存下处理一批齐夫分布的语料
+    yau = plugin.yau_feature
+    corpus = build_corpus(2000)
+
+    def clear_yau_caches():
+        yau._text_cache.clear()
+        yau._segment_cache.clear()
+
+    cases.append(Case(
+        "yau/convert_text",
+        lambda: [yau._convert_text(text) for text in corpus],
+        items=len(corpus),
+        unit="msg",
+        setup=clear_yau_caches,
+        extra={"chars": sum(len(text) for text in corpus)}
+    ))
+
+    # 消息写入：逐条与批量
+    daily = plugin.daily_summary_feature
+    batches = iter(range(1, 1_000_000))
+
+    single = {"records": []}
+    cases.append(Case(
+        "daily/save_message",
+        lambda: [daily.save_message(record) for record in single["records"]],
+        items=200,
+        unit="row",
+        setup=lambda: single.update(records=_synthetic_day(200, next(batches)))
+    ))
+
+    bulk = {"records": []}
+    cases.append(Case(
+        "daily/save_messages",
+        lambda: daily.save_messages(bulk["records"]),
+        items=5000,
+        unit="row",
+        setup=lambda: bulk.update(records=_synthetic_day(5000, next(batches)))
+    ))
+
+    # 提示词编码：一天约2000条消息
+    day = _synthetic_day(2000)
+    for prompt_format in ("compact", "json"):
+        def prepare(prompt_format=prompt_format):
+            daily.config.prompt_format = prompt_format
+            return daily._prepare_messages(day)
+
+        prompt = prepare()
+        cases.append(Case(
+            f"daily/prepare_messages/{prompt_format}",
+            prepare,
+            items=len(day),
+            unit="msg",
+            extra={"chars": len(prompt), "tokens": count_tokens(prompt)}
+        ))
+
+    return cases
+
+def run_case(case: Case, loop: asyncio.AbstractEventLoop, warmup: int, repeat: int) -> Dict[str, Any]:
+    """执行用例并统计耗时"""
+    def call():
+        result = case.func()
+        if inspect.isawaitable(result):
+            loop.run_until_complete(result)
+
+    try:
+        for _ in range(warmup):
+            if case.setup:
+                case.setup()
+            call()
+
+        samples = []
+        for _ in range(repeat):
+            if case.setup:
+                case.setup()
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+    except Exception as e:
+        return {"unit": case.unit, "items": case.items, "error": " ".join(str(e).split())[:200]}
+
+    median = statistics.median(samples)
+    return {
+        "unit": case.unit,
+        "items": case.items,
+        "repeat": repeat,
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "throughput": case.items / median if median else None,
+        "extra": case.extra,
+        "error": None,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """与基线结果对比，返回变慢的用例数"""
+    regressions = 0
+    print(f"\n对比基线 {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or old.get("error") or result.get("error"):
+            continue
+        ratio = result["median"] / old["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  变慢"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  变快"
+        print(f"{name:<36} {old['median'] * 1000:>10.2f}ms -> {result['median'] * 1000:>10.2f}ms  x{ratio:.2f}{flag}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="结果文件路径")
+    parser.add_argument("--compare", type=Path, help="作为基线的结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="对比时视为变化的比例")
+    args = parser.parse_args()
+
+    output = args.output and args.output.resolve()
+    baseline_path = args.compare and args.compare.resolve()
+    plugin = load_plugin()
+    cases = [case for case in build_cases(plugin) if args.filter in case.name]
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "typst": _typst_version("typst"),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "results": {},
+    }
+
+    loop = asyncio.new_event_loop()
+    for case in cases:
+        result = run_case(case, loop, args.warmup, args.repeat)
+        report["results"][case.name] = result
+        if result["error"]:
+            print(f"{case.name:<36} 失败: {result['error']}")
+        else:
+            print(
+                f"{case.name:<36} median={result['median'] * 1000:>10.2f}ms "
+                f"stdev={result['stdev'] * 1000:>8.2f}ms "
+                f"{result['throughput']:>12.1f} {case.unit}/s"
+                + "".join(f"  {key}={value}" for key, value in case.extra.items())
+            )
+    loop.close()
+
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['meta']['commit'] or 'unknown'}.json"
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n结果已写入 {output}")
+
+    if baseline_path:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,69 @@
 """Core functionality for the Typst bot."""
 
-from .compiler import TypstCompiler, CompilerConfig, CompileResult, default_compiler
+from .compiler import TypstCompiler, CompilerConfig, CompileResult, default_compiler, png_dimensions
 from .message import MessageSender, MessageResult, default_sender
 from .template import TemplateManager, TemplateConfig
+from .avatar import AvatarCache, AvatarConfig, image_format
+from .cache import TTLCache, LRUCache
+from .http import CachedFetcher, FetchConfig, get_session, close_session
+from .transcript import TranscriptEncoder, TranscriptConfig, encode_json
+from .timing import StageTimer, TimingRegistry, timing_registry
+from .metrics import MetricsConfig, MetricsRegistry, metrics, requests_total, setup_metrics_endpoint
+from .executor import CPUExecutor, ExecutorConfig, LoopMonitor, default_executor, loop_monitor
+from .profiler import SamplingProfiler, ProfilerConfig, ProfileResult, profiler
+from .lifecycle import LifecycleManager, LifecycleConfig, lifecycle
+from .ratelimit import RateLimiter, RateLimitConfig, rate_limiter
+from .breaker import CircuitBreaker, CircuitBreakerConfig, CircuitOpenError, BreakerConfig, circuit_breakers
 
 __all__ = [
     "TypstCompiler",
     "CompilerConfig",
     "CompileResult",
     "default_compiler",
+    "png_dimensions",
     "MessageSender",
     "MessageResult",
     "default_sender",
     "TemplateManager",
-    "TemplateConfig"
+    "TemplateConfig",
+    "AvatarCache",
+    "AvatarConfig",
+    "image_format",
+    "TTLCache",
+    "LRUCache",
+    "CachedFetcher",
+    "FetchConfig",
+    "get_session",
+    "close_session",
+    "TranscriptEncoder",
+    "TranscriptConfig",
+    "encode_json",
+    "StageTimer",
+    "TimingRegistry",
+    "timing_registry",
+    "MetricsConfig",
+    "MetricsRegistry",
+    "metrics",
+    "requests_total",
+    "setup_metrics_endpoint",
+    "CPUExecutor",
+    "ExecutorConfig",
+    "LoopMonitor",
+    "default_executor",
+    "loop_monitor",
+    "SamplingProfiler",
+    "ProfilerConfig",
+    "ProfileResult",
+    "profiler",
+    "LifecycleManager",
+    "LifecycleConfig",
+    "lifecycle",
+    "RateLimiter",
+    "RateLimitConfig",
+    "rate_limiter",
+    "CircuitBreaker",
+    "CircuitBreakerConfig",
+    "CircuitOpenError",
+    "BreakerConfig",
+    "circuit_breakers",
 ]
@@ -0,0 +1,154 @@
+"""Avatar fetching with a size-capped disk cache."""
+
+import asyncio
+import io
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from pydantic import BaseModel
+
+from .http import get_session
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow为可选依赖，缺失时不缩放
+    Image = None
+
+# 头像获取失败时使用的1x1透明PNG
+PLACEHOLDER_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360606060000000050001a5f645400000000049454e44ae426082"
+)
+
+# 按文件头识别的图片格式 -> 扩展名，Typst按扩展名判断图片格式
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+_EXTENSIONS = ("png", "jpg", "gif", "webp")
+
+def image_format(data: bytes) -> str:
+    """根据文件头识别图片格式，返回扩展名，无法识别时按PNG处理"""
+    for signature, extension in _SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "png"
+
+class AvatarConfig(BaseModel):
+    """头像缓存配置"""
+    url_template: str = "https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=640"
+    cache_dir: Path = Path("src/plugins/typst_bot/data/avatars")
+    ttl: float = 86400               # 头像有效期（秒）
+    max_bytes: int = 64 * 1024 * 1024  # 磁盘缓存上限
+    size: int = 160                  # 缩放后的边长（像素）
+    timeout: float = 5               # 下载超时（秒）
+
+class AvatarCache:
+    """QQ头像获取器
+
+    头像下载后缩放为模板显示尺寸并以PNG存入磁盘（未安装Pillow时按原格式保存），
+    超过容量上限时按获取时间淘汰最旧的文件；下载失败时使用过期缓存或占位图。
+    磁盘读写在线程中执行。
+    """
+    def __init__(self, config: Optional[AvatarConfig] = None):
+        self.config = config or AvatarConfig()
+        self.cache_dir = Path(self.config.cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._total_bytes = sum(f.stat().st_size for f in self._files())
+
+    def _files(self) -> List[Path]:
+        return [f for f in self.cache_dir.iterdir() if f.suffix[1:] in _EXTENSIONS]
+
+    def _path(self, user_id: str, extension: str = "png") -> Path:
+        return self.cache_dir / f"{user_id}.{extension}"
+
+    def _read(self, user_id: str) -> Optional[Tuple[bytes, float]]:
+        """读取缓存的头像及其获取时间"""
+        for extension in _EXTENSIONS:
+            path = self._path(user_id, extension)
+            try:
+                return path.read_bytes(), path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _resize(self, data: bytes) -> bytes:
+        """缩放到模板显示尺寸并转为PNG"""
+        if Image is None:
+            return data
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGBA")
+            image.thumbnail((self.config.size, self.config.size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue()
+
+    def _store(self, user_id: str, data: bytes) -> None:
+        """写入缓存并执行容量淘汰"""
+        path = self._path(user_id, image_format(data))
+        with self._lock:
+            for extension in _EXTENSIONS:
+                old = self._path(user_id, extension)
+                if old.exists():
+                    self._total_bytes -= old.stat().st_size
+                    if old != path:
+                        old.unlink()
+            path.write_bytes(data)
+            self._total_bytes += len(data)
+
+            if self._total_bytes <= self.config.max_bytes:
+                return
+            files = sorted(self._files(), key=lambda f: f.stat().st_mtime)
+            for old in files:
+                if self._total_bytes <= self.config.max_bytes:
+                    break
+                if old == path:
+                    continue
+                self._total_bytes -= old.stat().st_size
+                old.unlink(missing_ok=True)
+
+    async def _download(self, user_id: str) -> bytes:
+        """下载并缩放头像"""
+        import aiohttp
+
+        url = self.config.url_template.format(user_id=user_id)
+        async with get_session().get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            data = await response.read()
+
+        data = await asyncio.to_thread(self._resize, data)
+        await asyncio.to_thread(self._store, user_id, data)
+        return data
+
+    async def get(self, user_id: Union[int, str]) -> bytes:
+        """获取头像图片数据（格式见 image_format），失败时返回过期缓存或占位图"""
+        user_id = str(user_id)
+        stale: Optional[bytes] = None
+        cached = await asyncio.to_thread(self._read, user_id)
+        if cached is not None:
+            stale, fetched_at = cached
+            if time.time() - fetched_at <= self.config.ttl:
+                return stale
+
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._download(user_id))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            print(f"获取头像 {user_id} 失败: {e}")
+            return stale or PLACEHOLDER_PNG
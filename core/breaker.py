@@ -0,0 +1,228 @@
+"""Circuit breakers for external backends (Typst compiler, language model)."""
+
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from .config import config_manager
+from .metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+_STATE_NAMES = {CLOSED: "正常", HALF_OPEN: "探测中", OPEN: "熔断"}
+
+class BreakerConfig(BaseModel):
+    """单个熔断器参数"""
+    window: int = Field(20, ge=1, description="按最近多少次调用统计失败率")
+    window_seconds: float = Field(120.0, gt=0, description="超过该时长的调用结果不再计入统计（秒）")
+    min_calls: int = Field(5, ge=1, description="窗口内调用数达到该值才判断失败率")
+    failure_rate: float = Field(0.5, gt=0, le=1, description="失败率达到该值时熔断")
+    open_seconds: float = Field(30.0, gt=0, description="熔断后等待多久开始探测（秒）")
+    max_open_seconds: float = Field(300.0, gt=0, description="探测失败时等待时间翻倍的上限（秒）")
+    half_open_calls: int = Field(1, ge=1, description="探测阶段放行的请求数，全部成功后恢复")
+
+class CircuitBreakerConfig(BaseModel):
+    """熔断配置"""
+    enabled: bool = True
+    default: BreakerConfig = Field(default_factory=BreakerConfig)
+    breakers: Dict[str, BreakerConfig] = Field(default_factory=lambda: {
+        # 总结请求量小且单次超时长，少量失败即熔断
+        "llm": BreakerConfig(min_calls=3, open_seconds=60),
+    })
+
+def retry_hint(retry_after: float) -> str:
+    """重试提示；探测进行中时等待时间未知"""
+    if retry_after <= 0:
+        return "正在恢复，请稍后再试"
+    return f"请 {math.ceil(retry_after)} 秒后再试"
+
+class CircuitOpenError(RuntimeError):
+    """熔断期间拒绝调用"""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 暂时不可用，{retry_hint(retry_after)}")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """熔断器
+
+    关闭状态下记录最近的调用结果，窗口内失败率达到阈值时打开：之后的调用直接
+    拒绝，不再等待注定失败的超时。等待 open_seconds 后进入半开状态，放行少量
+    探测请求，全部成功则恢复，任一失败则重新打开并将等待时间翻倍。
+
+    每次切换状态时代数加一，放行的调用持有放行时的代数，结果只计入同一代：
+    熔断前发起、半开时才结束的调用不会被当作探测结果。
+    """
+    def __init__(self, name: str, config: Optional[BreakerConfig] = None, enabled: bool = True):
+        self.name = name
+        self.config = config or BreakerConfig()
+        self.enabled = enabled
+        self._state = CLOSED
+        self._results: Deque[Tuple[float, bool]] = deque(maxlen=self.config.window)  # (时间, 是否失败)
+        self._open_seconds = self.config.open_seconds
+        self._opened_until = 0.0
+        self._probes = 0            # 进行中的探测请求数
+        self._probe_successes = 0
+        self._generation = 0        # 状态切换次数
+
+    @property
+    def state(self) -> str:
+        self._advance(time.monotonic())
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """距离开始探测的秒数；半开状态下探测结果未知，为0"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_until - time.monotonic())
+
+    def _advance(self, now: float) -> None:
+        if self._state == OPEN and now >= self._opened_until:
+            self._state = HALF_OPEN
+            self._generation += 1
+            self._probes = 0
+            self._probe_successes = 0
+
+    def allow(self) -> Optional[int]:
+        """是否放行本次调用：放行时返回调用凭据，拒绝时返回None
+
+        放行后须以该凭据调用 record_success / record_failure / release 之一。
+        """
+        if not self.enabled:
+            return self._generation
+        self._advance(time.monotonic())
+        if self._state == CLOSED:
+            return self._generation
+        if self._state == HALF_OPEN and self._probes < self.config.half_open_calls:
+            self._probes += 1
+            return self._generation
+        _rejected.labels(self.name).inc()
+        return None
+
+    def _current(self, ticket: int, now: float) -> bool:
+        """凭据是否属于当前状态；过期的调用结果不再计入"""
+        self._advance(now)
+        return self.enabled and ticket == self._generation
+
+    def record_success(self, ticket: int) -> None:
+        now = time.monotonic()
+        if not self._current(ticket, now):
+            return
+        if self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.config.half_open_calls:
+                self._close()
+        elif self._state == CLOSED:
+            self._results.append((now, False))
+
+    def record_failure(self, ticket: int) -> None:
+        now = time.monotonic()
+        if not self._current(ticket, now):
+            return
+        if self._state == HALF_OPEN:
+            self._open_seconds = min(self._open_seconds * 2, self.config.max_open_seconds)
+            self._trip(now, "探测失败")
+        elif self._state == CLOSED:
+            self._results.append((now, True))
+            while self._results and now - self._results[0][0] > self.config.window_seconds:
+                self._results.popleft()
+            calls = len(self._results)
+            failures = sum(failed for _, failed in self._results)
+            if calls >= self.config.min_calls and failures / calls >= self.config.failure_rate:
+                self._trip(now, f"最近 {calls} 次调用失败 {failures} 次")
+
+    def release(self, ticket: int) -> None:
+        """放弃已放行的调用而不记录结果，如请求被取消"""
+        if self._current(ticket, time.monotonic()) and self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def _trip(self, now: float, reason: str) -> None:
+        self._state = OPEN
+        self._generation += 1
+        self._opened_until = now + self._open_seconds
+        self._results.clear()
+        _opened.labels(self.name).inc()
+        print(f"熔断器 {self.name} 打开（{reason}），{self._open_seconds:.0f} 秒后探测")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._generation += 1
+        self._open_seconds = self.config.open_seconds
+        self._results.clear()
+        print(f"熔断器 {self.name} 已恢复")
+
+    @contextmanager
+    def guard(self, is_failure: Optional[Callable[[BaseException], bool]] = None) -> Iterator[None]:
+        """保护一次调用：熔断时抛出 CircuitOpenError，否则按结果记录
+
+        Args:
+            is_failure: 判断异常是否为后端故障，返回False的异常（如用户输入错误）
+                说明后端工作正常，按成功记录；默认所有异常均为故障
+        """
+        ticket = self.allow()
+        if ticket is None:
+            raise CircuitOpenError(self.name, self.retry_after)
+        try:
+            yield
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure(ticket)
+            else:
+                self.record_success(ticket)
+            raise
+        except BaseException:
+            self.release(ticket)
+            raise
+        else:
+            self.record_success(ticket)
+
+class BreakerRegistry:
+    """按名称管理熔断器，首次使用时按配置创建"""
+    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+        self.config = config or CircuitBreakerConfig()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(
+                name,
+                self.config.breakers.get(name, self.config.default),
+                self.config.enabled
+            )
+        return breaker
+
+    def describe(self) -> str:
+        """各熔断器状态摘要"""
+        parts = []
+        for name, breaker in sorted(self._breakers.items()):
+            state = breaker.state
+            text = f"{name} {_STATE_NAMES[state]}"
+            if state == OPEN:
+                text += f"（{math.ceil(breaker.retry_after)} 秒后探测）"
+            parts.append(text)
+        return ", ".join(parts)
+
+    def __iter__(self) -> Iterator[CircuitBreaker]:
+        return iter(list(self._breakers.values()))
+
+_rejected = metrics.counter("circuit_rejected_total", "熔断期间被拒绝的调用数", ("name",))
+_opened = metrics.counter("circuit_opened_total", "熔断器打开次数", ("name",))
+
+# 全局实例
+circuit_breakers = BreakerRegistry(CircuitBreakerConfig(**config_manager.get_feature_config("breaker")))
+
+metrics.gauge(
+    "circuit_state",
+    "熔断器状态（0正常，1探测中，2熔断）",
+    ("name",),
+    collect=lambda: {(breaker.name,): _STATE_VALUES[breaker.state] for breaker in circuit_breakers}
+)
@@ -1,80 +1,445 @@
 import asyncio
+import hashlib
+import os
 from pathlib import Path
 import base64
+import shlex
+import signal
 import tempfile
 import re
-from typing import Optional
+import struct
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 
+from .breaker import CircuitOpenError, circuit_breakers, retry_hint
+from .cache import LRUCache
+from .lifecycle import lifecycle, signal_process
+from .metrics import metrics
+
+try:
+    import resource
+except ImportError:  # 非POSIX平台不支持资源限制
+    resource = None
+from .timing import StageTimer
+
+# 所有编译器共享的并发编译数上限，超出的请求排队等待
+_compile_slots = asyncio.Semaphore(os.cpu_count() or 1)
+
+_compile_running = metrics.gauge("compile_running", "正在执行的编译数")
+_compile_queued = metrics.gauge("compile_queued", "排队等待的编译数")
+_compile_success = metrics.counter("compiles_total", "编译次数", ("status",)).labels("success")
+_compile_error = metrics.counter("compiles_total", "编译次数", ("status",)).labels("error")
+_compile_limits = metrics.counter("compile_limits_total", "编译因触及资源限制而失败的次数", ("limit",))
+_compile_fallbacks = metrics.counter("compile_fallbacks_total", "编译服务不可用时返回缓存结果的次数")
+
+# 子进程被资源限制终止时的信号
+_SIGXCPU = getattr(signal, "SIGXCPU", None)
+_SIGXFSZ = getattr(signal, "SIGXFSZ", None)
+_SIGKILL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+# 像素探针：排版完成后、光栅化之前按每页实际尺寸计算像素数，超限时中止编译
+_PIXEL_PROBE = (
+    "#set page(foreground: layout(size => {{"
+    " let w = calc.ceil(size.width / 1pt * {ppi} / 72);"
+    " let h = calc.ceil(size.height / 1pt * {ppi} / 72);"
+    " if w * h > {max_pixels} {{ panic(\"typst-bot-pixels \" + str(w) + \"x\" + str(h)) }}"
+    " }}))\n"
+)
+_PIXEL_PROBE_PATTERN = re.compile(r"typst-bot-pixels (\d+)x(\d+)")
+_SOURCE_LINE_PATTERN = re.compile(r"^(┌─ \S*input\.typ:)?(\d+)(:\d+$| │.*$)")
+
+# 编译器自身或环境故障（而非文档错误）的输出特征，如包缓存损坏、无法下载包
+_BACKEND_ERRORS = (
+    "failed to download package",
+    "failed to load package",
+    "network failed",
+    "failed to create output",
+    "permission denied",
+)
+
+class CompileLimitError(RuntimeError):
+    """编译触及资源限制"""
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+class CompileBackendError(RuntimeError):
+    """编译器或运行环境故障，与文档内容无关"""
+
+class CompileCrashError(RuntimeError):
+    """编译进程被信号终止：可能由文档触发（如递归过深），也可能是编译器故障"""
+
+# 探针文档：编译失败说明编译器本身不可用
+_CANARY_DOCUMENT = "#set page(width: auto, height: auto, margin: 1pt)\nok"
+
+def _is_backend_failure(error: BaseException) -> bool:
+    """是否计入熔断统计：只计入与文档无关的故障，如编译器缺失、包缓存损坏
+
+    用户可以构造超时或使编译器崩溃的文档，这类失败不直接计入，否则任何人都能让
+    所有群的排版服务熔断；改由 _is_suspect 触发探针编译判断编译器是否正常。
+    """
+    return isinstance(error, (CompileBackendError, OSError))
+
+def _is_suspect(error: BaseException) -> bool:
+    """超时、被终止或崩溃：无法区分是文档还是编译器的问题"""
+    if isinstance(error, CompileLimitError):
+        return error.limit in ("timeout", "killed")
+    return isinstance(error, CompileCrashError)
+
 class CompilerConfig(BaseModel):
     """编译器配置"""
     timeout: int = 30
     format: str = "png"
     ppi: int = 300
     compiler_path: str = "typst"
+    max_pixels: int = 0   # 单张图片像素上限，0表示不限制
+    max_pages: int = 0    # 分页输出时最多导出的页数，0表示不限制
+    # 编译进程数据段上限（RLIMIT_DATA），0表示不限制。不使用RLIMIT_AS：Typst的每个
+    # 工作线程和内存分配器都会预留大量虚拟地址，多核机器上远超实际占用，容易误杀正常文档
+    max_memory_mb: int = 0
+    max_cpu_seconds: int = 60   # 编译进程CPU时间上限（RLIMIT_CPU，多线程累计），0表示不限制
+    max_output_mb: int = 64     # 输出文件总大小上限（单个文件同时受RLIMIT_FSIZE限制），0表示不限制
+    fallback_size: int = 16     # 保留最近成功结果的条数，编译服务不可用时按内容返回，0表示不保留
+    fallback_max_kb: int = 512  # 超过该大小的结果不保留
 
 class CompileResult(BaseModel):
     """编译结果"""
     success: bool
-    content: Optional[str] = None  # base64编码的图片数据
+    content: Optional[str] = None  # base64编码的图片数据（分页时为第一页）
+    pages: List[str] = []          # 分页输出时每页base64编码的图片数据
     error: Optional[str] = None    # 错误信息
+    timings: Dict[str, float] = {} # 各阶段耗时（秒）
+    unavailable: bool = False      # 编译服务熔断中，未执行编译
+    degraded: bool = False         # 编译服务不可用时返回的缓存结果
+    truncated: bool = False        # 分页输出超过 max_pages，只返回了前 max_pages 页
 
 class TypstCompiler:
-    """Typst文档编译器"""
-    def __init__(self, config: Optional[CompilerConfig] = None):
+    """Typst文档编译器
+
+    每个编译器带一个名为 typst.<name> 的熔断器：编译器缺失、包缓存损坏等环境故障
+    的比例过高时直接拒绝编译，并对内容相同的请求返回最近一次成功的结果。文档编译
+    超时或崩溃时另行编译一个最小的探针文档，探针也失败才计为编译器故障。
+    """
+    def __init__(self, config: Optional[CompilerConfig] = None, name: str = "default"):
         self.config = config or CompilerConfig()
+        self.breaker = circuit_breakers.get(f"typst.{name}")
+        self._fallback: LRUCache[CompileResult] = LRUCache(maxsize=self.config.fallback_size)
+        self._canary: Optional[asyncio.Task] = None
 
-    async def compile(self, content: str) -> CompileResult:
-        """编译Typst文档并返回结果"""
+    async def compile(
+        self,
+        content: str,
+        assets: Optional[Dict[str, bytes]] = None,
+        paginate: bool = False,
+        ppi: Optional[int] = None
+    ) -> CompileResult:
+        """编译Typst文档并返回结果
+
+        Args:
+            assets: 编译时可引用的附加文件，键为相对路径
+            paginate: 是否按页分别输出图片
+            ppi: 覆盖配置中的输出分辨率，如用于低分辨率预览
+        """
+        timer = StageTimer()
+        key = self._fallback_key(content, assets, paginate, ppi) if self.config.fallback_size else None
         try:
-            return CompileResult(
+            with self.breaker.guard(_is_backend_failure):
+                pages, truncated = await self._compile_document(content, assets, paginate, ppi, timer)
+            _compile_success.inc()
+            result = CompileResult(
                 success=True,
-                content=await self._compile_document(content)
+                content=pages[0],
+                pages=pages if paginate else [],
+                timings=timer.stages,
+                truncated=truncated
+            )
+            if key is not None and sum(map(len, result.pages or [result.content])) <= self.config.fallback_max_kb * 1024:
+                self._fallback.set(key, result)
+            return result
+        except CircuitOpenError as e:
+            if cached := self._get_fallback(key, timer):
+                return cached
+            return CompileResult(
+                success=False,
+                error=f"排版服务暂时不可用，{retry_hint(e.retry_after)}",
+                timings=timer.stages,
+                unavailable=True
             )
         except Exception as e:
+            _compile_error.inc()
+            if isinstance(e, CompileLimitError):
+                _compile_limits.labels(e.limit).inc()
+            if _is_suspect(e):
+                self._start_canary()
+            if (_is_backend_failure(e) or _is_suspect(e)) and (cached := self._get_fallback(key, timer)):
+                print(f"编译失败，返回缓存结果: {e}")
+                return cached
             return CompileResult(
                 success=False,
-                error=str(e)
+                error=str(e),
+                timings=timer.stages
             )
 
-    async def _compile_document(self, content: str) -> str:
-        """编译文档并返回base64编码的图片"""
+    def _start_canary(self) -> None:
+        """在后台编译探针文档，结果计入熔断统计；同一时间只运行一个"""
+        if self._canary is not None and not self._canary.done():
+            return
+        self._canary = asyncio.ensure_future(self._run_canary())
+
+    async def _run_canary(self) -> None:
+        try:
+            # 探针文档的任何失败都说明编译器本身有问题
+            with self.breaker.guard():
+                await self._compile_document(_CANARY_DOCUMENT)
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            print(f"编译器探针失败: {e}")
+
+    def _fallback_key(
+        self,
+        content: str,
+        assets: Optional[Dict[str, bytes]],
+        paginate: bool,
+        ppi: Optional[int]
+    ) -> str:
+        """按文档内容、附加文件和输出参数计算缓存键"""
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16)
+        for name, data in sorted((assets or {}).items()):
+            digest.update(name.encode("utf-8"))
+            digest.update(hashlib.blake2b(data, digest_size=16).digest())
+        return f"{digest.hexdigest()}:{int(paginate)}:{ppi or self.config.ppi}"
+
+    def _get_fallback(self, key: Optional[str], timer: StageTimer) -> Optional[CompileResult]:
+        """获取内容相同的最近一次成功结果"""
+        cached = self._fallback.get(key) if key is not None else None
+        if cached is None:
+            return None
+        _compile_fallbacks.inc()
+        return cached.model_copy(update={"timings": timer.stages, "degraded": True})
+
+    async def _compile_document(
+        self,
+        content: str,
+        assets: Optional[Dict[str, bytes]] = None,
+        paginate: bool = False,
+        ppi: Optional[int] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[List[str], bool]:
+        """编译文档，返回每页base64编码的图片，以及页数是否超过 max_pages 被截断
+
+        限制像素数时在文档前插入像素探针，超大的页面在光栅化之前即被拒绝。
+        """
+        timer = timer or StageTimer()
+        probe = self._pixel_probe(ppi)
+
         async def compile_task():
             with tempfile.TemporaryDirectory() as tmpdir:
                 input_file = Path(tmpdir) / "input.typ"
-                output_file = Path(tmpdir) / f"output.{self.config.format}"
-                
-                input_file.write_text(content, encoding='utf-8')
-                await self._run_compiler(input_file, output_file)
+                if paginate:
+                    output_file = Path(tmpdir) / f"output-{{p}}.{self.config.format}"
+                else:
+                    output_file = Path(tmpdir) / f"output.{self.config.format}"
                 
-                return base64.b64encode(output_file.read_bytes()).decode('utf-8')
-        
+                with timer.stage("write"):
+                    input_file.write_text(probe + content, encoding='utf-8')
+                    for name, data in (assets or {}).items():
+                        asset_file = Path(tmpdir) / name
+                        asset_file.parent.mkdir(parents=True, exist_ok=True)
+                        asset_file.write_bytes(data)
+                await self._run_compiler(input_file, output_file, paginate, ppi, timer, probe.count("\n"))
+
+                truncated = False
+                if paginate:
+                    files = sorted(
+                        Path(tmpdir).glob(f"output-*.{self.config.format}"),
+                        key=lambda f: int(f.stem.rsplit("-", 1)[1])
+                    )
+                    # 多导出的一页只用于判断是否截断
+                    if self.config.max_pages and len(files) > self.config.max_pages:
+                        files = files[:self.config.max_pages]
+                        truncated = True
+                else:
+                    files = [output_file]
+                self._check_output_size(files)
+
+                pages = []
+                for file in files:
+                    with timer.stage("read"):
+                        data = file.read_bytes()
+                        # 文档自行设置 foreground 时探针失效，读取后再检查一次
+                        self._check_pixels(data)
+                    with timer.stage("encode"):
+                        pages.append(base64.b64encode(data).decode('utf-8'))
+                return pages, truncated
+
+        # 排队时间不计入编译超时
+        _compile_queued.inc()
+        try:
+            with timer.stage("queue_wait"):
+                await _compile_slots.acquire()
+        finally:
+            _compile_queued.dec()
+        _compile_running.inc()
         try:
             return await asyncio.wait_for(compile_task(), timeout=self.config.timeout)
         except asyncio.TimeoutError:
-            raise RuntimeError("编译超时，请尝试简化代码")
-
-    async def _run_compiler(self, input_file: Path, output_file: Path) -> None:
-        """运行编译器进程"""
-        cmd = (
-            f'{self.config.compiler_path} compile "{input_file}" "{output_file}" '
-            f'--format {self.config.format} --ppi {self.config.ppi}'
-        )
-        
-        process = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        
+            # 超时取消时编译进程已在 _run_compiler 中被终止
+            raise CompileLimitError("timeout", f"编译超时（超过 {self.config.timeout} 秒），请尝试简化代码")
+        finally:
+            _compile_running.dec()
+            _compile_slots.release()
+
+    def _check_output_size(self, files: List[Path]) -> None:
+        """检查输出文件总大小是否超过上限"""
+        if not self.config.max_output_mb:
+            return
+        total = sum(file.stat().st_size for file in files)
+        if total > self.config.max_output_mb * 1024 * 1024:
+            raise CompileLimitError(
+                "output",
+                f"输出大小 {total / 1024 / 1024:.1f} MB 超过上限（{self.config.max_output_mb} MB），请缩短内容"
+            )
+
+    def _pixel_probe(self, ppi: Optional[int] = None) -> str:
+        """生成插入文档开头的像素探针，不限制像素数时为空"""
+        if not self.config.max_pixels or self.config.format != "png":
+            return ""
+        return _PIXEL_PROBE.format(ppi=ppi or self.config.ppi, max_pixels=self.config.max_pixels)
+
+    def _check_pixels(self, data: bytes) -> None:
+        """检查图片像素数是否超过上限"""
+        if not self.config.max_pixels or self.config.format != "png":
+            return
+        width, height = png_dimensions(data)
+        if width * height > self.config.max_pixels:
+            raise CompileLimitError(
+                "pixels",
+                f"图片尺寸 {width}x{height} 超过上限（{self.config.max_pixels} 像素），请缩短内容"
+            )
+
+    async def _run_compiler(
+        self,
+        input_file: Path,
+        output_file: Path,
+        paginate: bool = False,
+        ppi: Optional[int] = None,
+        timer: Optional[StageTimer] = None,
+        line_offset: int = 0
+    ) -> None:
+        """运行编译器进程，分别记录进程启动和编译耗时
+
+        编译进程在独立的进程组中运行并受资源限制约束；超时或请求被取消时
+        终止整个进程组，不会留下继续占用CPU的子进程。
+
+        Args:
+            line_offset: 文档前插入的行数，错误位置按原文档行号显示
+        """
+        timer = timer or StageTimer()
+        args = [
+            *shlex.split(self.config.compiler_path),
+            "compile", str(input_file), str(output_file),
+            "--format", self.config.format,
+            "--ppi", str(ppi or self.config.ppi),
+        ]
+        if paginate and self.config.max_pages:
+            # 多导出一页，用于判断内容是否被截断
+            args += ["--pages", f"1-{self.config.max_pages + 1}"]
+
+        with timer.stage("spawn"):
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        lifecycle.register_process(process)
+        try:
+            self._apply_limits(process.pid)
+            with timer.stage("compile"):
+                stdout, stderr = await process.communicate()
+        except BaseException:
+            signal_process(process, _SIGKILL)
+            await asyncio.shield(process.wait())
+            raise
+        finally:
+            lifecycle.unregister_process(process)
+
         if process.returncode != 0:
-            error_msg = stderr.decode().strip()
-            formatted_error = self._format_error_message(error_msg, str(input_file))
+            error_msg = stderr.decode(errors="replace").strip()
+            self._raise_for_limit(process.returncode, error_msg)
+            formatted_error = self._format_error_message(error_msg, str(input_file), line_offset)
+            if any(pattern in error_msg.lower() for pattern in _BACKEND_ERRORS):
+                # 包缓存、网络等环境故障，与文档内容无关
+                raise CompileBackendError(f"Typst编译器运行失败：\n{formatted_error}")
+            if process.returncode < 0:
+                raise CompileCrashError(f"Typst编译器异常退出（信号 {-process.returncode}）：\n{formatted_error}")
             raise RuntimeError(f"Typst编译错误：\n{formatted_error}")
 
-    def _format_error_message(self, error_msg: str, file_path: str) -> str:
-        """格式化错误信息"""
+    def _apply_limits(self, pid: int) -> None:
+        """为编译进程设置资源限制
+
+        进程启动后立即通过 prlimit 设置，而不是使用 preexec_fn：
+        后者在多线程进程中 fork 后执行Python代码，可能死锁。
+        """
+        if resource is None or not hasattr(resource, "prlimit"):
+            return
+        limits = []
+        if self.config.max_memory_mb:
+            size = self.config.max_memory_mb * 1024 * 1024
+            limits.append((resource.RLIMIT_DATA, (size, size)))
+        if self.config.max_cpu_seconds:
+            # 软限制触发SIGXCPU，硬限制多留1秒后由内核强制结束
+            limits.append((resource.RLIMIT_CPU, (self.config.max_cpu_seconds, self.config.max_cpu_seconds + 1)))
+        if self.config.max_output_mb:
+            size = self.config.max_output_mb * 1024 * 1024
+            limits.append((resource.RLIMIT_FSIZE, (size, size)))
+        for limit, value in limits:
+            try:
+                resource.prlimit(pid, limit, value)
+            except ProcessLookupError:
+                return
+            except OSError as e:
+                print(f"设置编译进程资源限制失败: {e}")
+
+    def _raise_for_limit(self, returncode: int, error_msg: str) -> None:
+        """根据退出信号和错误输出判断编译进程是否因资源限制而终止"""
+        signum = -returncode if returncode < 0 else None
+        if match := _PIXEL_PROBE_PATTERN.search(error_msg):
+            width, height = match.groups()
+            raise CompileLimitError(
+                "pixels",
+                f"图片尺寸 {width}x{height} 超过上限（{self.config.max_pixels} 像素），请缩短内容"
+            )
+        if signum is not None and signum == _SIGXCPU:
+            raise CompileLimitError(
+                "cpu",
+                f"编译CPU时间超过上限（{self.config.max_cpu_seconds} 秒），请尝试简化代码"
+            )
+        if signum is not None and signum == _SIGKILL:
+            # 超过CPU硬限制，或因内存不足被系统终止
+            limits = [f"CPU时间上限 {self.config.max_cpu_seconds} 秒"] if self.config.max_cpu_seconds else []
+            if self.config.max_memory_mb:
+                limits.append(f"内存上限 {self.config.max_memory_mb} MB")
+            raise CompileLimitError(
+                "killed",
+                f"编译进程被系统终止（{'，'.join(limits) or '可能内存不足'}），请尝试简化代码"
+            )
+        if (signum is not None and signum == _SIGXFSZ) or "File too large" in error_msg:
+            raise CompileLimitError(
+                "output",
+                f"输出文件超过上限（{self.config.max_output_mb} MB），请缩短内容"
+            )
+        if self.config.max_memory_mb and (
+            "memory allocation" in error_msg or "out of memory" in error_msg.lower()
+        ):
+            raise CompileLimitError(
+                "memory",
+                f"编译内存超过上限（{self.config.max_memory_mb} MB），请尝试简化代码"
+            )
+
+    def _format_error_message(self, error_msg: str, file_path: str, line_offset: int = 0) -> str:
+        """格式化错误信息，行号减去 line_offset 后为原文档中的位置"""
         error_msg = error_msg.replace(file_path, "input.typ")
         error_lines = []
         
@@ -88,11 +453,21 @@ class TypstCompiler:
             elif "at" in line and "input.typ" in line:
                 if match := re.search(r"at .*:(\d+):(\d+)", line):
                     line_num, col_num = match.groups()
-                    error_lines.append(f"位置：第 {line_num} 行，第 {col_num} 列")
+                    error_lines.append(f"位置：第 {int(line_num) - line_offset} 行，第 {col_num} 列")
+            elif line_offset and (match := _SOURCE_LINE_PATTERN.match(line)):
+                # 源码片段和 ┌─ 位置行中的行号同样按原文档显示
+                prefix, line_num, rest = match.groups()
+                error_lines.append(f"{prefix or ''}{int(line_num) - line_offset}{rest}")
             else:
                 error_lines.append(line)
                 
         return "\n".join(error_lines)
 
+def png_dimensions(data: bytes) -> Tuple[int, int]:
+    """从PNG文件头读取图片宽高（像素）"""
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        raise ValueError("不是有效的PNG图片")
+    return struct.unpack(">II", data[16:24])
+
 # 创建默认编译器实例
 default_compiler = TypstCompiler()
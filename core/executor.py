@@ -0,0 +1,112 @@
+"""Worker pool for CPU-bound preprocessing and event-loop blocking monitor."""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Literal, Optional, Tuple, TypeVar
+from pydantic import BaseModel
+
+from .config import config_manager
+
+T = TypeVar("T")
+
+class ExecutorConfig(BaseModel):
+    """执行器配置"""
+    kind: Literal["thread", "process"] = "thread"
+    max_workers: int = 2
+    inline_threshold: int = 4096     # 输入小于该长度时直接在事件循环中执行
+    monitor_interval: float = 0.1    # 阻塞检测间隔（秒）
+    block_threshold: float = 0.05    # 超过该延迟视为事件循环被阻塞（秒）
+
+class CPUExecutor:
+    """CPU密集型任务执行器
+
+    短输入直接执行，避免线程切换的开销；长输入提交到线程池或进程池。
+    使用进程池时，提交的函数及参数必须可被pickle。
+    """
+    def __init__(self, config: Optional[ExecutorConfig] = None):
+        self.config = config or ExecutorConfig()
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        """按需创建工作池"""
+        if self._pool is None:
+            if self.config.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.config.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    thread_name_prefix="typst_bot_cpu"
+                )
+        return self._pool
+
+    def offloads(self, size: int) -> bool:
+        """判断该大小的输入是否会被提交到工作池"""
+        return size >= self.config.inline_threshold
+
+    async def run(self, func: Callable[..., T], *args: Any, size: int = 0) -> T:
+        """执行函数，size 为输入大小（如字符数）"""
+        if not self.offloads(size):
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), partial(func, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭工作池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+
+class LoopMonitor:
+    """事件循环阻塞检测
+
+    周期性休眠并测量实际唤醒延迟，延迟超过阈值即说明有回调长时间占用事件循环。
+    """
+    def __init__(self, interval: float = 0.1, threshold: float = 0.05):
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked_count = 0
+        self.blocked_seconds = 0.0
+        self.max_lag = 0.0
+        self.recent: Deque[Tuple[float, float]] = deque(maxlen=20)  # (时间戳, 延迟)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            if lag > self.threshold:
+                self.blocked_count += 1
+                self.blocked_seconds += lag
+                self.max_lag = max(self.max_lag, lag)
+                self.recent.append((time.time(), lag))
+
+    async def start(self) -> None:
+        """启动检测"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止检测"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """阻塞统计"""
+        return {
+            "blocked_count": self.blocked_count,
+            "blocked_seconds": self.blocked_seconds,
+            "max_lag": self.max_lag,
+            "recent": list(self.recent),
+        }
+
+_config = ExecutorConfig(**config_manager.get_feature_config("executor"))
+
+# 全局实例
+default_executor = CPUExecutor(_config)
+loop_monitor = LoopMonitor(_config.monitor_interval, _config.block_threshold)
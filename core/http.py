@@ -0,0 +1,169 @@
+"""Shared HTTP session and cached fetching for remote resources."""
+
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import aiohttp
+
+_session: Optional["aiohttp.ClientSession"] = None
+
+def get_session() -> "aiohttp.ClientSession":
+    """获取共享的HTTP会话（复用连接池），aiohttp在首次使用时才导入"""
+    import aiohttp
+
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15)
+        )
+    return _session
+
+async def close_session() -> None:
+    """关闭共享的HTTP会话"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+class FetchConfig(BaseModel):
+    """缓存获取配置"""
+    ttl: float = 600                    # 缓存新鲜期（秒）
+    stale_ttl: float = 86400            # 过期后仍可先返回旧内容的时长（秒）
+    timeout: float = 10                 # 单次请求超时（秒）
+    cache_dir: Optional[Path] = None    # 磁盘缓存目录，源站不可用时兜底
+
+class CacheEntry(BaseModel):
+    """缓存条目"""
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0
+
+class CachedFetcher:
+    """带缓存的远程文本获取器
+
+    - 新鲜期内直接返回缓存
+    - 过期但在 stale_ttl 内时先返回旧内容，后台用条件请求刷新
+    - 同一URL的并发请求合并为一次
+    - 源站不可用时退回磁盘缓存
+    """
+    def __init__(self, config: Optional[FetchConfig] = None):
+        self.config = config or FetchConfig()
+        self._entries: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        if self.config.cache_dir:
+            Path(self.config.cache_dir).mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, url: str) -> Optional[Path]:
+        """磁盘缓存文件路径"""
+        if not self.config.cache_dir:
+            return None
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return Path(self.config.cache_dir) / f"{digest}.json"
+
+    def _load_entry(self, url: str) -> Optional[CacheEntry]:
+        """读取内存或磁盘缓存"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+
+        path = self._disk_path(url)
+        if path and path.exists():
+            try:
+                entry = CacheEntry(**json.loads(path.read_text(encoding="utf-8")))
+                self._entries[url] = entry
+                return entry
+            except Exception as e:
+                print(f"读取缓存 {path.name} 失败: {e}")
+        return None
+
+    def _store_entry(self, url: str, entry: CacheEntry) -> None:
+        """写入内存和磁盘缓存"""
+        self._entries[url] = entry
+        path = self._disk_path(url)
+        if path:
+            try:
+                path.write_text(json.dumps(entry.model_dump(), ensure_ascii=False), encoding="utf-8")
+            except Exception as e:
+                print(f"写入缓存 {path.name} 失败: {e}")
+
+    async def _request(self, url: str, entry: Optional[CacheEntry]) -> CacheEntry:
+        """发送（条件）请求并更新缓存"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        import aiohttp
+
+        async with get_session().get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        ) as response:
+            if response.status == 304 and entry is not None:
+                entry = entry.model_copy(update={"fetched_at": time.time()})
+            elif response.status == 200:
+                entry = CacheEntry(
+                    body=await response.text(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    fetched_at=time.time()
+                )
+            else:
+                raise RuntimeError(f"HTTP {response.status}")
+
+        self._store_entry(url, entry)
+        return entry
+
+    def _revalidate(self, url: str, entry: Optional[CacheEntry]) -> asyncio.Task:
+        """启动或复用同一URL的刷新任务"""
+        task = self._inflight.get(url)
+        if task is None or task.done():
+            task = asyncio.create_task(self._request(url, entry))
+            task.add_done_callback(lambda t: self._finish(url, t))
+            self._inflight[url] = task
+        return task
+
+    def _finish(self, url: str, task: asyncio.Task) -> None:
+        """清理刷新任务，后台刷新失败时仅记录"""
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"刷新 {url} 失败: {task.exception()}")
+
+    async def fetch(self, url: str) -> str:
+        """获取URL内容"""
+        entry = self._load_entry(url)
+        age = time.time() - entry.fetched_at if entry else None
+
+        if entry is not None and age <= self.config.ttl:
+            return entry.body
+
+        if entry is not None and age <= self.config.ttl + self.config.stale_ttl:
+            self._revalidate(url, entry)
+            return entry.body
+
+        try:
+            return (await asyncio.shield(self._revalidate(url, entry))).body
+        except Exception:
+            if entry is not None:
+                # 源站不可用，使用过期的磁盘缓存
+                return entry.body
+            raise
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """清除缓存，不指定URL时清除全部内存缓存"""
+        if url is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(url, None)
@@ -0,0 +1,55 @@
+"""Lazily constructed feature instances."""
+
+import asyncio
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+class LazyProxy(Generic[T]):
+    """延迟创建的对象代理
+
+    首次访问属性时才调用工厂函数创建实例，之后的属性读写都转发给该实例。
+    用于功能实例：模块导入时只注册事件处理器，数据库、模板目录、转换词典等
+    在第一次处理请求时才初始化，全局禁用的功能不会产生这些开销。
+    """
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        """实例是否已创建"""
+        return self._instance is not None
+
+    def resolve(self) -> T:
+        """获取实例，尚未创建时创建"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    async def resolve_async(self) -> T:
+        """获取实例，尚未创建时在线程中创建，初始化期间不阻塞事件循环"""
+        instance = self._instance
+        if instance is None:
+            instance = await asyncio.to_thread(self.resolve)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazyProxy of {getattr(self._factory, '__qualname__', self._factory)} (未加载)>"
+        return repr(self._instance)
@@ -0,0 +1,169 @@
+"""Graceful shutdown: stop admitting work, drain in-flight requests, clean up."""
+
+import asyncio
+import inspect
+import os
+import signal
+import threading
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, List, Optional, Set, TypeVar, Union
+from pydantic import BaseModel
+
+from .config import config_manager
+from .metrics import metrics
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+ShutdownHook = Callable[[], Union[Awaitable[Any], Any]]
+
+def signal_process(process: asyncio.subprocess.Process, sig: int) -> None:
+    """向子进程发送信号；子进程为独立进程组的组长时发给整个进程组"""
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, "killpg") and os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+class LifecycleConfig(BaseModel):
+    """生命周期配置"""
+    drain_timeout: float = 20.0   # 关闭时等待进行中请求完成的最长时间（秒）
+    kill_timeout: float = 3.0     # 终止子进程后等待其退出的时间，超时则强制结束（秒）
+
+class LifecycleManager:
+    """进程生命周期管理
+
+    关闭时依次：停止接收新请求 -> 在期限内等待进行中的请求完成 -> 终止残留的编译进程
+    -> 按注册顺序执行关闭钩子（写入消息缓冲、关闭工作池和HTTP会话等）。
+    前两步应在服务器断开连接之前完成，见 install_signal_handlers。
+    """
+    def __init__(self, config: Optional[LifecycleConfig] = None):
+        self.config = config or LifecycleConfig()
+        self.accepting = True
+        self.inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        self._hooks: List[ShutdownHook] = []
+        self._drain_task: Optional[asyncio.Task] = None
+        self._drain_deadline: Optional[float] = None
+
+    def tracked(self, func: F) -> F:
+        """装饰事件处理器：关闭期间忽略新请求，其余请求计入进行中的工作"""
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self.accepting:
+                return None
+            self.inflight += 1
+            self._idle.clear()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.inflight -= 1
+                if not self.inflight:
+                    self._idle.set()
+        return wrapper
+
+    def register_process(self, process: asyncio.subprocess.Process) -> None:
+        """登记子进程，关闭时仍未退出的将被终止"""
+        self._processes.add(process)
+
+    def unregister_process(self, process: asyncio.subprocess.Process) -> None:
+        self._processes.discard(process)
+
+    def on_shutdown(self, func: ShutdownHook) -> ShutdownHook:
+        """注册关闭钩子，在请求排空后按注册顺序执行"""
+        self._hooks.append(func)
+        return func
+
+    async def install_signal_handlers(self) -> None:
+        """在服务器处理退出信号之前排空请求，须在事件循环所在的主线程中启动后调用
+
+        uvicorn 收到 SIGINT/SIGTERM 后先断开所有连接（包括OneBot反向WebSocket），
+        之后才执行关闭钩子，此时进行中的请求已无法回复。这里包装服务器已安装的
+        信号处理函数：收到信号时先停止接收新请求并等待进行中的请求完成，再交给
+        原处理函数关闭服务器；排空期间再次收到信号则立即交给原处理函数。
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                if self._drain_task is None:
+                    loop.call_soon_threadsafe(self._drain_before_exit, previous, signum)
+                else:
+                    previous(signum, frame)
+            signal.signal(sig, handler)
+
+    def _drain_before_exit(self, handler: Callable[[int, Any], Any], signum: int) -> None:
+        async def drain_then_exit():
+            await self.drain()
+            handler(signum, None)
+
+        if self._drain_task is None:
+            self._drain_task = asyncio.ensure_future(drain_then_exit())
+
+    async def drain(self) -> None:
+        """停止接收新请求，并在期限内等待进行中的请求完成
+
+        期限从第一次调用时开始计算，信号处理和关闭钩子先后调用时总共只等待一次。
+        """
+        self.accepting = False
+        if self._drain_deadline is None:
+            self._drain_deadline = time.monotonic() + self.config.drain_timeout
+        if self.inflight:
+            print(f"等待 {self.inflight} 个进行中的请求完成…")
+            try:
+                await asyncio.wait_for(
+                    self._idle.wait(),
+                    timeout=max(0.0, self._drain_deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                print(f"等待超时，仍有 {self.inflight} 个请求未完成")
+
+    async def shutdown(self) -> None:
+        """优雅关闭；已由信号处理排空时不再重复等待"""
+        started = time.perf_counter()
+        await self.drain()
+        await self._kill_processes()
+
+        for hook in self._hooks:
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"执行关闭钩子 {getattr(hook, '__qualname__', hook)} 失败: {e}")
+
+        print(f"已完成关闭，用时 {time.perf_counter() - started:.1f}s")
+
+    async def _kill_processes(self) -> None:
+        """终止残留的子进程，超时未退出则强制结束"""
+        processes = [p for p in self._processes if p.returncode is None]
+        if not processes:
+            return
+        print(f"终止 {len(processes)} 个残留的编译进程")
+        for process in processes:
+            signal_process(process, signal.SIGTERM)
+
+        _, pending = await asyncio.wait(
+            [asyncio.create_task(p.wait()) for p in processes],
+            timeout=self.config.kill_timeout
+        )
+        if pending:
+            for process in processes:
+                signal_process(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+            await asyncio.wait(pending, timeout=self.config.kill_timeout)
+        self._processes.clear()
+
+# 全局实例
+lifecycle = LifecycleManager(LifecycleConfig(**config_manager.get_feature_config("lifecycle")))
+
+metrics.gauge("inflight_requests", "进行中的请求数", collect=lambda: {(): lifecycle.inflight})
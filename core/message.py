@@ -1,4 +1,4 @@
-from typing import Union, Optional
+from typing import Any, List, Union, Optional
 from pathlib import Path
 import base64
 from nonebot.adapters.onebot.v11 import Bot, MessageSegment, Event, Message, GroupMessageEvent
@@ -10,6 +10,13 @@ class MessageResult(BaseModel):
     message_id: Optional[str] = None
     error: Optional[str] = None
 
+def _message_id(result: Any) -> Optional[str]:
+    """从发送接口的返回值中提取消息ID"""
+    if isinstance(result, dict):
+        message_id = result.get("message_id")
+        return None if message_id is None else str(message_id)
+    return None if result is None else str(result)
+
 class MessageSender:
     """消息发送工具类"""
     @staticmethod
@@ -30,7 +37,7 @@ class MessageSender:
             result = await bot.send(event, message)
             return MessageResult(
                 success=True,
-                message_id=str(result)
+                message_id=_message_id(result)
             )
         except Exception as e:
             return MessageResult(
@@ -65,7 +72,53 @@ class MessageSender:
             )
             return MessageResult(
                 success=True,
-                message_id=str(result)
+                message_id=_message_id(result)
+            )
+        except Exception as e:
+            return MessageResult(
+                success=False,
+                error=f"{error_msg}: {e}"
+            )
+
+    @staticmethod
+    async def send_forward_images(
+        bot: Bot,
+        event: Event,
+        images: List[str],
+        nickname: str = "TypstBot",
+        error_msg: str = "发送图片失败"
+    ) -> MessageResult:
+        """将多张图片打包为合并转发消息发送
+
+        Args:
+            images: base64编码的图片数据列表
+        """
+        try:
+            nodes = [
+                MessageSegment.node_custom(
+                    user_id=int(bot.self_id),
+                    nickname=nickname,
+                    content=Message(MessageSegment.image(
+                        image if image.startswith("base64://") else f"base64://{image}"
+                    ))
+                )
+                for image in images
+            ]
+            if isinstance(event, GroupMessageEvent):
+                result = await bot.call_api(
+                    "send_group_forward_msg",
+                    group_id=event.group_id,
+                    messages=Message(nodes)
+                )
+            else:
+                result = await bot.call_api(
+                    "send_private_forward_msg",
+                    user_id=event.get_user_id(),
+                    messages=Message(nodes)
+                )
+            return MessageResult(
+                success=True,
+                message_id=_message_id(result)
             )
         except Exception as e:
             return MessageResult(
@@ -105,7 +158,7 @@ class MessageSender:
             )
             return MessageResult(
                 success=True,
-                message_id=str(result)
+                message_id=_message_id(result)
             )
         except Exception as e:
             return MessageResult(
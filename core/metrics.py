@@ -0,0 +1,275 @@
+"""Lightweight metrics registry with Prometheus text exposition."""
+
+import hmac
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from pydantic import BaseModel
+
+from .config import config_manager
+from .timing import DEFAULT_BUCKETS, Histogram as _Buckets, timing_registry
+
+LabelValues = Tuple[str, ...]
+
+class MetricsConfig(BaseModel):
+    """指标端点配置"""
+    enabled: bool = False   # 是否在HTTP服务上开放指标端点，端点与OneBot连接共用监听地址
+    path: str = "/metrics"
+    token: str = ""         # 非空时须通过 Authorization: Bearer <token> 或 ?token=<token> 访问
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _CounterChild:
+    """带标签的计数器实例，热路径上只做一次属性加法"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self.value += amount
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: Union[int, float]) -> None:
+        self.value = value
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: Union[int, float] = 1) -> None:
+        self.value -= amount
+
+class _Metric:
+    """指标基类，按标签值缓存子实例"""
+    kind = "untyped"
+    child_class: type = _CounterChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values: str):
+        """获取标签值对应的子实例，热路径上应缓存返回值"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} 需要标签 {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return self.child_class()
+
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+class Counter(_Metric):
+    """单调递增计数器"""
+    kind = "counter"
+    child_class = _CounterChild
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self._default.inc(amount)
+
+class Gauge(_Metric):
+    """可增减的瞬时值
+
+    传入 collect 时在导出时调用回调获取各标签的值，适合缓存命中率、队列长度等
+    已由其他对象维护的状态。
+    """
+    kind = "gauge"
+    child_class = _GaugeChild
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ):
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def set(self, value: Union[int, float]) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: Union[int, float] = 1) -> None:
+        self._default.dec(amount)
+
+    def samples(self) -> Iterable[str]:
+        if self.collect is None:
+            yield from super().samples()
+            return
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"采集指标 {self.name} 失败: {e}")
+            return
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Histogram(_Metric):
+    """固定桶直方图"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield from _histogram_samples(self.name, self.labelnames, values, child)
+
+def _histogram_samples(
+    name: str,
+    labelnames: Sequence[str],
+    values: Sequence[str],
+    histogram: _Buckets
+) -> Iterable[str]:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        yield f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}"
+    yield f"{name}_sum{_format_labels(labelnames, values)} {_format_value(histogram.sum)}"
+    yield f"{name}_count{_format_labels(labelnames, values)} {histogram.count}"
+
+class MetricsRegistry:
+    """指标注册表"""
+    def __init__(self, prefix: str = "typst_bot_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """注册指标，同名指标已存在时返回已有实例
+
+        Raises:
+            ValueError: 同名指标的类型、标签、桶或采集回调不一致
+        """
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if (
+                type(existing) is not type(metric)
+                or existing.labelnames != metric.labelnames
+                or getattr(existing, "buckets", None) != getattr(metric, "buckets", None)
+                or getattr(metric, "collect", None) is not None
+            ):
+                raise ValueError(
+                    f"指标 {metric.name} 已注册为 {existing.kind}{list(existing.labelnames)}，"
+                    f"不能再注册为 {metric.kind}{list(metric.labelnames)}"
+                )
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def expose(self) -> str:
+        """导出Prometheus文本格式，包含各流水线的阶段耗时直方图"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.expose())
+
+        name = f"{self.prefix}stage_seconds"
+        lines.append(f"# HELP {name} 各流水线阶段耗时（秒）")
+        lines.append(f"# TYPE {name} histogram")
+        for (pipeline, stage), histogram in sorted(timing_registry.histograms.items()):
+            lines.extend(_histogram_samples(name, ("pipeline", "stage"), (pipeline, stage), histogram))
+        return "\n".join(lines) + "\n"
+
+def setup_metrics_endpoint(driver, config: Optional[MetricsConfig] = None) -> bool:
+    """在驱动器的HTTP服务上注册指标端点，未启用或驱动器不支持时返回False"""
+    from nonebot.drivers import ASGIMixin, HTTPServerSetup, Request, Response, URL
+
+    config = config or metrics_config
+    if not config.enabled or not isinstance(driver, ASGIMixin):
+        return False
+
+    async def handle_metrics(request: Request) -> Response:
+        if config.token and not _authorized(request, config.token):
+            return Response(
+                401,
+                headers={"WWW-Authenticate": "Bearer"},
+                content="unauthorized\n"
+            )
+        return Response(
+            200,
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            content=metrics.expose()
+        )
+
+    driver.setup_http_server(HTTPServerSetup(URL(config.path), "GET", "typst_bot_metrics", handle_metrics))
+    return True
+
+def _authorized(request, token: str) -> bool:
+    """校验请求头或查询参数中的令牌"""
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        credentials = request.url.query.get("token", "")
+    return hmac.compare_digest(credentials.encode(), token.encode())
+
+# 全局实例
+metrics = MetricsRegistry()
+metrics_config = MetricsConfig(**config_manager.get_feature_config("metrics"))
+
+# 各功能的请求数，status 为 success / error
+requests_total = metrics.counter("requests_total", "各功能处理的请求数", ("feature", "status"))
@@ -0,0 +1,223 @@
+"""On-demand sampling profiler for the event-loop thread."""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from pydantic import BaseModel
+
+from .config import config_manager
+
+class ProfilerConfig(BaseModel):
+    """采样分析器配置"""
+    interval: float = 0.005          # 采样间隔（秒）
+    max_duration: int = 60           # 单次分析最长时间（秒）
+    max_depth: int = 64              # 每个栈最多保留的帧数
+    slow_callback: float = 0.05      # 慢回调阈值（秒）
+    top_n: int = 10                  # 摘要中显示的函数数
+    max_tasks: int = 20              # 摘要中显示的任务数
+    keep_files: int = 10             # 保留的折叠栈文件数
+    output_dir: Path = Path("src/plugins/typst_bot/data/profiles")
+
+class ProfileResult(BaseModel):
+    """一次分析的结果"""
+    duration: float
+    samples: int
+    idle_samples: int                              # 事件循环空闲（等待IO）时的采样数
+    self_top: List[Tuple[str, int]] = []           # 按自身采样数排序的函数
+    total_top: List[Tuple[str, int]] = []          # 按包含子调用的采样数排序的函数
+    slow_callbacks: List[Tuple[str, float]] = []   # (回调, 耗时)
+    tasks: List[str] = []
+    task_count: int = 0
+    folded_path: Optional[str] = None              # 折叠栈文件，可直接用于 flamegraph.pl / speedscope
+
+    def summary(self) -> str:
+        """生成文字摘要"""
+        busy = self.samples - self.idle_samples
+        lines = [
+            f"采样 {self.duration:.1f}s，共 {self.samples} 个样本，"
+            f"事件循环忙碌 {busy / self.samples:.0%}" if self.samples else "未采集到样本"
+        ]
+        if self.self_top:
+            lines.append("自身耗时最多：")
+            lines.extend(f"  {count / busy:>4.0%} {name}" for name, count in self.self_top)
+        if self.total_top:
+            lines.append("累计耗时最多：")
+            lines.extend(f"  {count / busy:>4.0%} {name}" for name, count in self.total_top)
+        if self.slow_callbacks:
+            lines.append(f"慢回调 {len(self.slow_callbacks)} 个：")
+            lines.extend(
+                f"  {seconds * 1000:.0f}ms {callback}"
+                for callback, seconds in self.slow_callbacks[:5]
+            )
+        lines.append(f"当前任务 {self.task_count} 个：")
+        lines.extend(f"  {task}" for task in self.tasks)
+        if self.folded_path:
+            # 摘要会发到群聊，只给出文件名，不暴露服务器上的路径
+            lines.append(f"折叠栈文件：{Path(self.folded_path).name}（保存在 output_dir 下）")
+        return "\n".join(lines)
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{Path(code.co_filename).stem}:{name}"
+
+def _is_idle(frame) -> bool:
+    """事件循环线程是否阻塞在 selector 上等待IO"""
+    return frame.f_code.co_name in ("select", "poll", "epoll") and "selectors" in frame.f_code.co_filename
+
+def _is_callback_runner(frame) -> bool:
+    """是否为事件循环执行回调的帧（asyncio.events.Handle._run）"""
+    return frame.f_code.co_name == "_run" and frame.f_code.co_filename.endswith("events.py")
+
+def _describe_task(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    name = getattr(coro, "__qualname__", type(coro).__name__)
+    stack = task.get_stack(limit=1)
+    where = f" @ {Path(stack[0].f_code.co_filename).name}:{stack[0].f_lineno}" if stack else ""
+    return f"{task.get_name()} {name}{where}"
+
+class SamplingProfiler:
+    """事件循环采样分析器
+
+    由独立线程按固定间隔读取事件循环线程的调用栈（sys._current_frames），
+    不插桩、不开启事件循环调试模式，开销只与采样频率有关。栈从回调入口开始记录，
+    省略事件循环自身的调度帧；同一回调连续被采到的时长超过阈值即记为慢回调。
+    同一时间只允许一次分析，时长受 max_duration 限制。
+    """
+    def __init__(self, config: Optional[ProfilerConfig] = None):
+        self.config = config or ProfilerConfig()
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _sample(
+        self,
+        thread_id: int,
+        stop: threading.Event,
+        stacks: Counter,
+        slow: List[Tuple[str, float]]
+    ) -> None:
+        """采样线程"""
+        interval = self.config.interval
+        max_depth = self.config.max_depth
+        # (回调入口帧, 名称, 首次, 末次)；持有入口帧的引用，之后的回调不会复用同一对象
+        current: Optional[Tuple[Any, str, float, float]] = None
+
+        def finish() -> None:
+            if current is not None:
+                duration = current[3] - current[2] + interval
+                if duration >= self.config.slow_callback:
+                    slow.append((current[1], duration))
+
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            now = time.perf_counter()
+            if _is_idle(frame):
+                stacks[None] += 1
+                finish()
+                current = None
+                continue
+
+            # 自叶子帧向上遍历至回调入口，回调入口下的第一帧即被执行的回调
+            names, entry, child = [], None, None
+            while frame is not None:
+                if _is_callback_runner(frame):
+                    entry = frame
+                    break
+                if len(names) < max_depth:
+                    names.append(_frame_name(frame))
+                child, frame = frame, frame.f_back
+            stacks[";".join(reversed(names))] += 1
+
+            if entry is None or child is None:
+                continue
+            # 每次执行回调都有新的入口帧：与上次采到的不是同一对象即为新的回调
+            if current is None or current[0] is not entry:
+                finish()
+                current = (entry, _frame_name(child), now, now)
+            else:
+                current = (entry, current[1], current[2], now)
+        finish()
+
+    async def profile(self, seconds: float) -> ProfileResult:
+        """对事件循环线程采样指定时长（秒）"""
+        if self.running:
+            raise RuntimeError("已有分析正在进行，请稍后再试")
+
+        async with self._lock:
+            seconds = max(0.1, min(seconds, self.config.max_duration))
+            stacks: Counter = Counter()
+            slow: List[Tuple[str, float]] = []
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), stop, stacks, slow),
+                name="typst_bot_profiler",
+                daemon=True
+            )
+
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+            duration = time.perf_counter() - started
+            await asyncio.to_thread(sampler.join)
+
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            idle = stacks.pop(None, 0)
+            return ProfileResult(
+                duration=duration,
+                samples=sum(stacks.values()) + idle,
+                idle_samples=idle,
+                self_top=self._top(stacks, leaf=True),
+                total_top=self._top(stacks, leaf=False),
+                slow_callbacks=sorted(slow, key=lambda r: r[1], reverse=True),
+                tasks=[_describe_task(task) for task in tasks[:self.config.max_tasks]],
+                task_count=len(tasks),
+                folded_path=self._write_folded(stacks)
+            )
+
+    def _top(self, stacks: Counter, leaf: bool) -> List[Tuple[str, int]]:
+        """按叶子帧（自身）或栈上出现（累计）统计函数采样数"""
+        counts: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            if leaf:
+                counts[frames[-1]] += count
+            else:
+                for name in set(frames):
+                    counts[name] += count
+        return counts.most_common(self.config.top_n)
+
+    def _write_folded(self, stacks: Counter) -> Optional[str]:
+        """写入折叠栈格式文件，并清理旧文件"""
+        if not stacks:
+            return None
+        try:
+            output_dir = self.config.output_dir
+            output_dir.mkdir(parents=True, exist_ok=True)
+            path = output_dir / f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+            path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()),
+                encoding="utf-8"
+            )
+            for old in sorted(output_dir.glob("profile-*.folded"))[:-self.config.keep_files]:
+                old.unlink(missing_ok=True)
+            return str(path)
+        except Exception as e:
+            print(f"写入分析结果失败: {e}")
+            return None
+
+# 全局实例
+profiler = SamplingProfiler(ProfilerConfig(**config_manager.get_feature_config("profiler")))
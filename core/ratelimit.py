@@ -0,0 +1,154 @@
+"""Token-bucket rate limiting per user, per group and globally."""
+
+import math
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from .config import config_manager
+from .metrics import metrics
+
+class BucketConfig(BaseModel):
+    """令牌桶参数"""
+    rate: float = Field(..., gt=0, description="每秒补充的令牌数")
+    burst: float = Field(..., ge=1, description="桶容量，即允许的突发请求数")
+
+class FeatureLimits(BaseModel):
+    """单个功能的限流配置，未设置的范围不限流"""
+    user: Optional[BucketConfig] = None
+    group: Optional[BucketConfig] = None
+    global_: Optional[BucketConfig] = Field(None, alias="global")
+
+    model_config = {"populate_by_name": True}
+
+class RateLimitConfig(BaseModel):
+    """限流配置"""
+    enabled: bool = True
+    evict_interval: float = 300.0   # 清理空闲令牌桶的间隔（秒）
+    features: Dict[str, FeatureLimits] = Field(default_factory=lambda: {
+        "render": FeatureLimits(
+            user=BucketConfig(rate=1 / 10, burst=5),
+            group=BucketConfig(rate=1 / 3, burst=10),
+            global_=BucketConfig(rate=2, burst=20)
+        ),
+        "yau": FeatureLimits(
+            user=BucketConfig(rate=1 / 10, burst=5),
+            group=BucketConfig(rate=1 / 3, burst=10),
+            global_=BucketConfig(rate=2, burst=20)
+        ),
+        "welcome": FeatureLimits(
+            user=BucketConfig(rate=1 / 60, burst=2),
+            group=BucketConfig(rate=1 / 20, burst=3)
+        ),
+    })
+
+class _Bucket:
+    """令牌桶，只保存剩余令牌数和上次更新时间"""
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+class Decision(NamedTuple):
+    """限流判定结果"""
+    allowed: bool
+    retry_after: float = 0.0     # 距离可再次请求的秒数
+    scope: Optional[str] = None  # 触发限流的范围：user / group / global
+    notify: bool = False         # 是否需要回复提示（同一冷却期内只提示一次）
+
+    def message(self) -> str:
+        """冷却提示"""
+        if self.scope == "user":
+            return f"操作过于频繁，请 {math.ceil(self.retry_after)} 秒后再试"
+        if self.scope == "group":
+            return f"本群请求过多，请 {math.ceil(self.retry_after)} 秒后再试"
+        return f"机器人繁忙，请 {math.ceil(self.retry_after)} 秒后再试"
+
+ALLOWED = Decision(True)
+
+class RateLimiter:
+    """令牌桶限流器
+
+    每个功能分别按用户、群组和全局三个范围限流，请求需同时取得三个桶的令牌，
+    任一范围不足时整体拒绝且不消耗令牌。令牌桶在首次请求时创建，补满后
+    不再携带状态，定期清理。
+    """
+    def __init__(self, config: Optional[RateLimitConfig] = None):
+        self.config = config or RateLimitConfig()
+        self._buckets: Dict[Tuple[str, str, str], _Bucket] = {}
+        self._notified: Dict[Tuple[str, str, str], float] = {}  # 已提示的范围 -> 冷却结束时间
+        self._last_evict = time.monotonic()
+
+    def check(self, feature: str, user_id: str, group_id: Optional[str] = None) -> Decision:
+        """检查并消耗一次请求的令牌"""
+        limits = self.config.features.get(feature)
+        if not self.config.enabled or limits is None:
+            return ALLOWED
+
+        now = time.monotonic()
+        if now - self._last_evict >= self.config.evict_interval:
+            self.evict(now)
+
+        scopes = (
+            ("user", user_id, limits.user),
+            ("group", group_id, limits.group),
+            ("global", "", limits.global_),
+        )
+        taken = []
+        for scope, key, bucket_config in scopes:
+            if bucket_config is None or key is None:
+                continue
+            bucket_key = (feature, scope, key)
+            bucket = self._refill(bucket_key, bucket_config, now)
+            if bucket.tokens < 1:
+                retry_after = (1 - bucket.tokens) / bucket_config.rate
+                _rejected.labels(feature, scope).inc()
+                return Decision(False, retry_after, scope, self._should_notify(bucket_key, now, retry_after))
+            taken.append(bucket)
+
+        for bucket in taken:
+            bucket.tokens -= 1
+        return ALLOWED
+
+    def _refill(self, key: Tuple[str, str, str], config: BucketConfig, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(config.burst, now)
+        else:
+            bucket.tokens = min(config.burst, bucket.tokens + (now - bucket.updated) * config.rate)
+            bucket.updated = now
+        return bucket
+
+    def _should_notify(self, key: Tuple[str, str, str], now: float, retry_after: float) -> bool:
+        """同一范围在冷却结束前只提示一次，避免刷屏时机器人也跟着刷屏"""
+        if self._notified.get(key, 0.0) > now:
+            return False
+        self._notified[key] = now + retry_after
+        return True
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """清理已补满的令牌桶和过期的提示记录，返回清理的桶数"""
+        now = time.monotonic() if now is None else now
+        self._last_evict = now
+        idle = []
+        for key, bucket in self._buckets.items():
+            limits = self.config.features.get(key[0])
+            bucket_config = limits and getattr(limits, "global_" if key[1] == "global" else key[1])
+            if bucket_config is None or bucket.tokens + (now - bucket.updated) * bucket_config.rate >= bucket_config.burst:
+                idle.append(key)
+        for key in idle:
+            del self._buckets[key]
+        for key in [key for key, until in self._notified.items() if until <= now]:
+            del self._notified[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+_rejected = metrics.counter("rate_limited_total", "被限流拒绝的请求数", ("feature", "scope"))
+
+# 全局实例
+rate_limiter = RateLimiter(RateLimitConfig(**config_manager.get_feature_config("ratelimit")))
+
+metrics.gauge("rate_limit_buckets", "内存中的令牌桶数", collect=lambda: {(): len(rate_limiter)})
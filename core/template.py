@@ -3,6 +3,8 @@ from typing import Dict, Any, Optional, Union
 import shutil
 from pydantic import BaseModel
 
+from .executor import default_executor
+
 # dsds
 class TemplateConfig(BaseModel):
     """模板配置"""
@@ -110,7 +112,29 @@ class TemplateManager:
         if not template:
             return None
             
-        content = template.content
+        return self.render_content(template.content, variables)
+
+    async def render_template_async(self, name: str, variables: Dict[str, Any]) -> Optional[str]:
+        """渲染模板，大模板在工作池中替换以免阻塞事件循环"""
+        template = self.get_template(name)
+        if not template:
+            return None
+
+        return await self.render_content_async(template.content, variables)
+
+    @staticmethod
+    async def render_content_async(content: str, variables: Dict[str, Any]) -> str:
+        """对模板内容进行变量替换，大模板在工作池中执行"""
+        return await default_executor.run(
+            TemplateManager.render_content,
+            content,
+            variables,
+            size=len(content)
+        )
+
+    @staticmethod
+    def render_content(content: str, variables: Dict[str, Any]) -> str:
+        """对模板内容进行变量替换"""
         for key, value in variables.items():
             # 支持两种变量格式：${key} 和 {key}
             content = content.replace(f"${{{key}}}", str(value))
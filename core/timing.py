@@ -0,0 +1,98 @@
+"""Per-stage latency timing and histograms for the rendering pipelines."""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+# 直方图桶上界（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+class StageTimer:
+    """记录一次请求中各阶段的耗时（秒）
+
+    同名阶段多次计时时累加，如多页并行编译时为各页耗时之和。
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """对代码块计时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """累加阶段耗时"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, stages: Mapping[str, float], prefix: str = "") -> None:
+        """合并其他计时结果，如编译器返回的耗时"""
+        for name, seconds in stages.items():
+            self.add(f"{prefix}{name}", seconds)
+
+    def elapsed(self) -> float:
+        """自创建以来的总耗时"""
+        return time.perf_counter() - self.started
+
+class Histogram:
+    """固定桶的耗时直方图"""
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class TimingRegistry:
+    """按流水线和阶段汇总耗时直方图"""
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, pipeline: str, timer: StageTimer, total: Optional[float] = None) -> None:
+        """记录一次请求的各阶段耗时和总耗时"""
+        stages = dict(timer.stages)
+        stages["total"] = timer.elapsed() if total is None else total
+        for stage, seconds in stages.items():
+            histogram = self.histograms.get((pipeline, stage))
+            if histogram is None:
+                histogram = self.histograms[(pipeline, stage)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """导出各阶段的计数、总和与分位数"""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (pipeline, stage), histogram in sorted(self.histograms.items()):
+            result.setdefault(pipeline, {})[stage] = {
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+            }
+        return result
+
+# 全局实例
+timing_registry = TimingRegistry()
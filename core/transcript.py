@@ -0,0 +1,201 @@
+"""Chat transcript encoders used to build LLM prompts."""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+# CQ码形式的富媒体，如 [CQ:image,file=xxx.image]
+CQ_PATTERN = re.compile(r"\[CQ:(\w+)[^\]]*\]")
+
+# 富媒体在紧凑格式中的简写
+MEDIA_ALIASES = {
+    "image": "图",
+    "face": "表情",
+    "mface": "表情",
+    "record": "语音",
+    "video": "视频",
+    "file": "文件",
+    "forward": "转发",
+    "json": "卡片",
+    "xml": "卡片",
+}
+
+class TranscriptConfig(BaseModel):
+    """紧凑聊天记录编码配置"""
+    merge_window: int = 120        # 同一发送者连续消息的合并窗口（秒）
+    max_code_chars: int = 600      # 超过该长度的代码粘贴将被截断
+    code_head_lines: int = 8       # 截断后保留的代码行数
+    drop_at: bool = True           # 去掉@成员CQ码
+
+def encode_json(records: Iterable[Any]) -> str:
+    """按话题分组的JSON格式（原始格式，便于对比）"""
+    messages = []
+    current_topic = None
+    topic_messages = []
+
+    for record in records:
+        if record.topic_id != current_topic:
+            if topic_messages:
+                messages.append({
+                    "topic_id": current_topic,
+                    "messages": topic_messages
+                })
+            current_topic = record.topic_id
+            topic_messages = []
+
+        topic_messages.append({
+            "sender": record.sender_name,
+            "content": record.content,
+            "time": record.timestamp.strftime("%H:%M:%S")
+        })
+
+    if topic_messages:
+        messages.append({
+            "topic_id": current_topic,
+            "messages": topic_messages
+        })
+
+    return json.dumps(messages, ensure_ascii=False, indent=2)
+
+class TranscriptEncoder:
+    """紧凑聊天记录编码器
+
+    输出格式：
+        成员: A=张三 B=李四
+        起始 09:00，[+分钟] 为相对起始时间
+        # 话题 xxx
+        [+0] A: 你好 / 第二条合并的消息
+        [+3] B: [图]x3
+        [+5] C: 666 (x3 +A +B)
+    """
+    def __init__(self, config: Optional[TranscriptConfig] = None):
+        self.config = config or TranscriptConfig()
+
+    @staticmethod
+    def _alias(index: int) -> str:
+        """生成发送者简称：A..Z, AA..ZZ, ..."""
+        alias = ""
+        index += 1
+        while index:
+            index, rem = divmod(index - 1, 26)
+            alias = chr(ord("A") + rem) + alias
+        return alias
+
+    def _compact_media(self, content: str) -> str:
+        """将CQ码替换为简写并合并连续的重复富媒体"""
+        def replace(match: re.Match) -> str:
+            kind = match.group(1)
+            if kind == "at" and self.config.drop_at:
+                return ""
+            if kind == "reply":
+                return ""
+            return f"[{MEDIA_ALIASES.get(kind, kind)}]"
+
+        content = CQ_PATTERN.sub(replace, content)
+        # [图][图][图] -> [图]x3
+        return re.sub(
+            r"(\[[^\[\]]+\])(?:\s*\1)+",
+            lambda m: f"{m.group(1)}x{m.group(0).count(m.group(1))}",
+            content
+        ).strip()
+
+    def _truncate_code(self, content: str, seen_code: Dict[str, int]) -> str:
+        """截断超长代码粘贴，重复粘贴仅保留哈希引用"""
+        if len(content) <= self.config.max_code_chars:
+            return content
+
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:8]
+        if digest in seen_code:
+            return f"<同上代码#{digest}>"
+        seen_code[digest] = 1
+
+        lines = content.splitlines()
+        head = lines[:self.config.code_head_lines]
+        head_text = "\n".join(head)
+        if len(lines) <= self.config.code_head_lines or len(head_text) > self.config.max_code_chars:
+            # 单行长文本或开头几行超长（如压缩后的脚本、base64）时按字符截断
+            return f"{content[:self.config.max_code_chars]}…<#{digest} 共{len(content)}字>"
+        return head_text + f"\n…<#{digest} 省略{len(lines) - len(head)}行>"
+
+    def encode(self, records: Iterable[Any]) -> str:
+        """编码聊天记录"""
+        records = list(records)
+        if not records:
+            return ""
+
+        aliases: Dict[str, str] = {}
+        names: List[Tuple[str, str]] = []
+        seen_code: Dict[str, int] = {}
+        start: datetime = records[0].timestamp
+        lines: List[str] = []
+
+        current_topic: Any = object()
+        last_sender: Optional[str] = None
+        last_time: Optional[datetime] = None
+        last_content: Optional[str] = None
+        # 正在累计的复读：(复读前的行, 次数, 跟读的成员)
+        repeat: Optional[Tuple[str, int, List[str]]] = None
+
+        for record in records:
+            if record.topic_id != current_topic:
+                current_topic = record.topic_id
+                if current_topic is not None:
+                    lines.append(f"# 话题 {current_topic}")
+                last_sender = None
+                last_content = None
+                repeat = None
+
+            sender_key = record.sender_id
+            if sender_key not in aliases:
+                aliases[sender_key] = self._alias(len(aliases))
+                names.append((aliases[sender_key], record.sender_name))
+            alias = aliases[sender_key]
+
+            content = self._compact_media(record.content)
+            if not content:
+                continue
+            content = self._truncate_code(content, seen_code)
+
+            # 复读：与上一条内容完全相同，其他成员的复读记录其简称
+            if content == last_content and lines:
+                base, count, repeaters = repeat or (lines[-1], 1, [])
+                if alias != last_sender and alias not in repeaters:
+                    repeaters = repeaters + [alias]
+                repeat = (base, count + 1, repeaters)
+                lines[-1] = f"{base} (x{count + 1}{''.join(f' +{r}' for r in repeaters)})"
+                continue
+            repeat = None
+
+            # 同一发送者在合并窗口内的连续消息
+            if (
+                alias == last_sender
+                and last_time is not None
+                and (record.timestamp - last_time).total_seconds() <= self.config.merge_window
+                and lines
+            ):
+                lines[-1] += f" / {content}"
+            else:
+                offset = int((record.timestamp - start).total_seconds() // 60)
+                lines.append(f"[+{offset}] {alias}: {content}")
+
+            last_sender = alias
+            last_time = record.timestamp
+            last_content = content
+
+        header = [
+            "成员: " + " ".join(f"{alias}={name}" for alias, name in names),
+            f"起始 {start.strftime('%H:%M')}，[+分钟] 为相对起始时间",
+        ]
+        return "\n".join(header + lines)
+
+    @staticmethod
+    def describe() -> str:
+        """向模型说明编码格式"""
+        return (
+            "聊天记录为紧凑格式：首行为成员简称表，"
+            "每行为 [+相对分钟] 简称: 内容，同一人连续发言以 / 连接，"
+            "(xN) 表示重复N次，其后的 +简称 为跟着复读的成员，[图]等为媒体占位，<#哈希> 为已截断的代码。"
+        )
@@ -0,0 +1,6 @@
+#import "@preview/cmarker:0.1.1"
+
+#set page(width: 600pt, height: auto, margin: 1.5em)
+#set text(font: ("Libertinus Serif", "Noto Serif CJK SC"), size: 11pt, lang: "zh")
+
+#cmarker.render("{markdown}")
@@ -6,6 +6,6 @@
 
 #(
   {
-    script
+    {script}
   }
 )
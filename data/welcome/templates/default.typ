@@ -45,6 +45,19 @@
   place(bottom + right, dx: 4.57em + common-x, dy: -1.5em, rotate(90deg, text(size: 1.5em)[*Welcome*]))
 }
 
+// 新成员头像：右侧色条中部
+#place(
+  top + left,
+  dx: 230pt - bar-window * 1.5 - 15pt - 20pt,
+  dy: 45pt,
+  box(
+    clip: true,
+    radius: 50%,
+    stroke: 1.5pt + white,
+    image("{avatar}", width: 30pt, height: 30pt, fit: "cover"),
+  ),
+)
+
 #{
   show: strong
 
@@ -0,0 +1,110 @@
+#let usernames = {nickname_list}
+
+#set text(font: ("Libertinus Serif", "Noto Serif CJK SC"), size: 20pt, lang: "zh")
+#show strong: set text(weight: "bold")
+#let watermark(c) = text(fill: black.transparentize(94%), weight: "bold", c)
+
+#let typst-guy = "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"no\"?><svg version=\"1.1\" id=\"svg1\" width=\"204.09332\" height=\"204.09332\" viewBox=\"0 0 204.09332 204.09332\" sodipodi:docname=\"profile-picture.svg\" xmlns:inkscape=\"http://www.inkscape.org/namespaces/inkscape\" xmlns:sodipodi=\"http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd\" xmlns=\"http://www.w3.org/2000/svg\" xmlns:svg=\"http://www.w3.org/2000/svg\"><defs id=\"defs1\"/><sodipodi:namedview id=\"namedview1\" pagecolor=\"#ffffff\" bordercolor=\"#000000\" borderopacity=\"0.25\" inkscape:showpageshadow=\"2\" inkscape:pageopacity=\"0.0\" inkscape:pagecheckerboard=\"0\" inkscape:deskcolor=\"#d1d1d1\" showgrid=\"false\" inkscape:zoom=\"1.547856\" inkscape:cx=\"100.46154\" inkscape:cy=\"93.354937\" inkscape:window-width=\"1128\" inkscape:window-height=\"728\" inkscape:window-x=\"0\" inkscape:window-y=\"0\" inkscape:window-maximized=\"0\" inkscape:current-layer=\"g10\"><inkscape:page x=\"0\" y=\"0\" width=\"204.09332\" height=\"204.09332\" margin=\"0\" bleed=\"0\"/></sodipodi:namedview><g id=\"g1\" inkscape:groupmode=\"layer\" inkscape:label=\"1\"><g id=\"g10\" transform=\"matrix(0.96432712,0,0,0.96432712,1.3686551,3.5883375)\"><g id=\"g2\"><path id=\"path2\" d=\"m 117.8088,146.78546 c 0,6.7292 0.9792,11.24534 2.93653,13.548 1.95773,2.30107 5.5172,3.452 10.67867,3.452 5.33866,0 12.19066,-2.65613 20.55466,-7.96813 l 5.33867,8.76667 c -15.66,12.92653 -28.5632,19.39213 -38.70747,19.39213 -10.14426,0 -18.15253,-2.39213 -24.025462,-7.1724 -5.872934,-4.95987 -8.809333,-13.63693 -8.809333,-26.0344 V 81.169866 h -13.348 L 70.291732,71.3412 85.775065,66.56 V 53.542667 L 117.8088,38.932001 v 29.221332 l 31.50053,-2.390666 -2.936,17.266666 L 117.8088,81.9668 v 64.81866\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path3\" d=\"m 37.522399,44.438667 h 4 c 0.0016,-1.766666 0.380667,-3.446666 1.126533,-5.038666 1.1204,-2.381333 3.087467,-4.592 6.002667,-6.349333 2.9104,-1.754667 6.769733,-3.032 11.530133,-3.428 l -0.331733,-3.986667 v 4 c 2.475066,0.0013 4.389599,0.429333 5.894799,1.102667 1.130667,0.506666 2.0464,1.152 2.838534,1.948 1.1812,1.189333 2.101066,2.754666 2.7432,4.742666 0.6396,1.98 0.976533,4.366667 0.975066,7.009333 -0.0016,2.126667 -0.4084,3.976 -1.124,5.590667 -1.080266,2.414666 -2.8552,4.348 -5.342133,5.768 -2.483333,1.410666 -5.700533,2.268 -9.510933,2.268 C 51.379199,58.048 47.809332,56.392 45.345332,53.948 c -2.452133,-2.456 -3.8172,-5.805333 -3.822933,-9.509333 h -4 -4 c -0.0052,5.696 2.154667,11.16 6.166133,15.166667 3.998934,4.018666 9.830267,6.475999 16.636,6.459999 6.663466,0.0027 12.65,-2.007999 17.029066,-5.837333 2.183867,-1.908 3.943733,-4.265333 5.1344,-6.949333 1.193733,-2.682666 1.815067,-5.678666 1.8136,-8.84 -0.0011,-2.94 -0.323467,-5.788 -1.062533,-8.465333 -0.5552,-2.008 -1.347867,-3.922666 -2.4292,-5.674666 -1.612934,-2.629334 -3.9156,-4.881334 -6.814,-6.386667 -2.897467,-1.514666 -6.321867,-2.278666 -10.145866,-2.276 h -0.166667 l -0.1656,0.01467 c -7.748933,0.645333 -14.1828,3.253333 -18.769866,7.305333 -2.289067,2.024 -4.104667,4.410667 -5.340534,7.044 -1.237066,2.629333 -1.886533,5.504 -1.884933,8.438666 h 4\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path4\" d=\"m 46.259866,27.240001 -4.431734,-4.432 c -1.562,-1.562666 -4.0948,-1.562666 -5.6568,0 -1.562,1.561333 -1.562,4.094667 0,5.657333 l 4.431734,4.430667 c 1.562533,1.562667 4.0948,1.562667 5.6568,0 1.562533,-1.561333 1.562533,-4.094667 0,-5.656\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path5\" d=\"m 55.201065,45.850667 c 1.518267,1.808 2.1156,5.504 2.2244,7.125333 1.469867,-1.233333 4.690667,-4.709333 5.8172,-8.738666 1.408933,-5.037333 -2.2244,-7.125333 -5.6948,-6.782667 -2.775466,0.276 -6.3,4.434667 -7.715066,6.478667 1.1568,-0.113333 3.849466,0.108 5.368266,1.917333\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path6\" d=\"m 146.65066,39.918667 c 1.59067,1.894667 2.216,5.766667 2.33067,7.465334 1.53867,-1.293334 4.91333,-4.933334 6.09333,-9.154667 1.476,-5.277333 -2.33066,-7.466666 -5.96533,-7.105333 -2.908,0.288 -6.6,4.644 -8.08267,6.786666 1.212,-0.12 4.03334,0.113334 5.624,2.008\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path7\" d=\"m 167.52533,38.996001 h 4 c 0,-3.470667 -0.54,-6.592 -1.552,-9.329333 -1.51067,-4.106667 -4.124,-7.312 -7.27067,-9.390667 -3.14666,-2.088 -6.772,-3.072 -10.344,-3.072 -3.87333,0.0013 -7.39333,0.464 -10.54666,1.408 -4.71734,1.404 -8.64694,3.968 -11.29374,7.553333 -1.32346,1.782667 -2.31666,3.796 -2.9652,5.953334 -0.6504,2.158666 -0.96093,4.457333 -0.96093,6.851999 0,0.854667 0.0396,1.722667 0.11773,2.601334 0.30947,3.509333 1.18907,6.532 2.6256,9.048 1.0724,1.885333 2.45574,3.461333 4.0152,4.693333 2.34667,1.857333 5.03067,2.937333 7.71334,3.557333 2.692,0.62 5.416,0.801333 8.04533,0.804 2.508,-0.0013 5.09733,-0.318667 7.63067,-1.04 3.78533,-1.077333 7.50266,-3.094667 10.3,-6.408 1.39466,-1.649333 2.536,-3.612 3.30666,-5.837333 0.77334,-2.225333 1.17867,-4.702667 1.17867,-7.393333 h -4 -4 c -0.004,2.529333 -0.49467,4.457333 -1.24933,6.002666 -0.57067,1.158667 -1.3,2.116 -2.18,2.942667 -1.31467,1.236 -2.996,2.176 -4.90667,2.804 -1.90667,0.626666 -4.02667,0.930666 -6.08,0.929333 -1.996,0.0013 -3.916,-0.132 -5.61467,-0.465333 -1.276,-0.248 -2.42133,-0.606667 -3.404,-1.074667 -1.48,-0.714666 -2.59466,-1.618666 -3.51066,-2.996 -0.90534,-1.38 -1.63867,-3.337333 -1.90134,-6.272 -0.0587,-0.656 -0.0867,-1.288 -0.0867,-1.896 0.001,-2.274666 0.39066,-4.198666 1.08133,-5.815999 0.52,-1.214667 1.208,-2.266667 2.09067,-3.204 1.32266,-1.398667 3.108,-2.562667 5.52133,-3.408 2.40667,-0.842667 5.43467,-1.34 9.07333,-1.338667 1.408,0 2.79867,0.258667 4.08134,0.773333 1.924,0.778667 3.60666,2.089334 4.89466,4.136 1.28,2.049334 2.18534,4.908 2.19067,8.882667 h 4\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path8\" d=\"m 59.681732,107.76053 c -1.694267,-2.42026 -1.693733,-2.4208 -1.6932,-2.42133 l 0.0011,-5.3e-4 0.0016,-10e-4 9.33e-4,-0.001 -0.0057,0.004 -0.04267,0.0292 -0.2036,0.1344 c -0.186533,0.1208 -0.471867,0.30106 -0.843733,0.5208 -0.7448,0.4412 -1.825067,1.0344 -3.139067,1.6276 -2.667733,1.2052 -6.11,2.32346 -9.587066,2.32346 v 5.90934 c 4.647999,0 8.961999,-1.46667 12.018799,-2.8468 1.547867,-0.69947 2.8224,-1.3984 3.716134,-1.92707 0.447866,-0.2652 0.803199,-0.48907 1.052133,-0.65053 0.1244,-0.0808 0.222933,-0.1464 0.2932,-0.19374 l 0.0844,-0.0579 0.026,-0.0177 0.0093,-0.007 0.0032,-0.002 0.0016,-0.001 c 4e-4,-5.4e-4 9.33e-4,-0.001 -1.693333,-2.42134 z m 0.498533,-2.91253 -15.511466,-2.65253 -0.9964,5.8244 15.511466,2.65266 z m -0.498533,2.91253 c 1.898,-2.26453 1.898,-2.26453 1.898,-2.26453 v 0 l -5.34e-4,-5.3e-4 -5.33e-4,-5.4e-4 -0.0041,-0.003 -0.01573,-0.0129 -0.06093,-0.0516 -0.2364,-0.19787 c -0.206267,-0.17293 -0.5052,-0.424 -0.8792,-0.73706 -0.747333,-0.62654 -1.792133,-1.502 -2.980666,-2.4984 -2.3776,-1.99267 -5.332267,-4.468804 -7.640134,-6.403204 l -3.795866,4.529204 c 2.307866,1.93386 5.262533,4.4104 7.640133,6.4032 1.189067,0.99626 2.233333,1.87186 2.980667,2.49786 0.374,0.3136 0.673466,0.56454 0.8792,0.73694 l 0.236533,0.19853 0.06147,0.0509 0.0156,0.0131 0.0036,0.003 0.0011,9.3e-4 h 5.34e-4 c 0,0 0,5.4e-4 1.897333,-2.264 z m 2.954666,0 V 93.726133 h -5.908799 v 14.034397 z m 90.854262,-1.4776 c -2.04266,2.13534 -2.04266,2.13587 -2.04133,2.1364 l 0.001,0.001 0.003,0.003 0.008,0.007 0.0227,0.0219 0.076,0.0709 0.268,0.24426 c 0.22666,0.20414 0.552,0.48907 0.96,0.82814 0.81333,0.6744 1.96933,1.57546 3.34933,2.4812 2.64267,1.736 6.57733,3.8088 10.64933,3.8088 v -5.90934 c -2.27466,0 -4.988,-1.25053 -7.40666,-2.83853 -1.15067,-0.75627 -2.128,-1.5172 -2.81734,-2.08907 -0.34266,-0.2844 -0.61066,-0.5188 -0.78666,-0.67813 l -0.196,-0.17813 -0.0427,-0.0401 -0.007,-0.007 v 0 9.3e-4 l 0.001,5.3e-4 c 0,5.4e-4 0,10e-4 -2.04134,2.136 z m 0,2.95467 h 16.25067 v -5.9088 h -16.25067 z m 0,-2.95467 c 2.30667,1.84587 2.30667,1.8468 2.30534,1.84734 v 0.001 l -0.001,0.002 -10e-4,0.002 0.003,-0.005 0.032,-0.038 0.15866,-0.1848 c 0.14534,-0.16773 0.37067,-0.41826 0.66667,-0.72453 0.59467,-0.61507 1.456,-1.43547 2.516,-2.25053 2.18933,-1.68334 4.876,-3.08067 7.61733,-3.08067 v -5.909467 c -4.64666,0 -8.60666,2.295866 -11.22,4.306267 -1.34,1.03133 -2.41733,2.05787 -3.16133,2.8276 -0.37467,0.38653 -0.668,0.71307 -0.87467,0.94893 l -0.24133,0.28387 -0.0707,0.0855 -0.0227,0.0271 -0.007,0.009 -0.004,0.004 -0.001,0.001 c 0,5.3e-4 -0.001,10e-4 2.30666,1.84693 z m 0,0 c 2.94267,0.25827 2.94267,0.2588 2.94267,0.25934 v 0.001 0.002 5.3e-4 -0.007 l 0.005,-0.048 0.0253,-0.22333 c 0.024,-0.20374 0.0653,-0.50947 0.128,-0.89334 0.12533,-0.7724 0.33333,-1.84106 0.66533,-3.0208 0.69333,-2.460931 1.80267,-4.960931 3.41733,-6.466131 l -4.028,-4.323466 c -2.816,2.624533 -4.292,6.402666 -5.07733,9.187997 -0.40667,1.44387 -0.65867,2.7396 -0.81067,3.6772 -0.076,0.47027 -0.128,0.8552 -0.16133,1.12854 -0.016,0.13706 -0.028,0.2464 -0.036,0.3256 l -0.009,0.0948 -0.004,0.0296 v 0.01 l -10e-4,0.004 v 0.002 c 0,9.3e-4 0,10e-4 2.944,0.25933 z M 92.765064,118.5584 C 75.471331,114.23493 66.531198,109.89547 61.644798,105.55213 l -3.925466,4.41667 c 5.992133,5.32667 16.095199,9.94333 33.612399,14.3224 z m 20.256266,4.00573 c 9.2328,-0.3848 19.7708,-3.88173 27.81333,-7.15146 4.06134,-1.6516 7.56534,-3.27814 10.056,-4.49334 1.24667,-0.60773 2.24134,-1.114 2.928,-1.46973 0.344,-0.17813 0.61067,-0.3188 0.79334,-0.4156 l 0.21066,-0.112 0.056,-0.0308 0.016,-0.008 0.004,-0.003 0.001,-5.4e-4 c 10e-4,-4e-4 10e-4,-9.3e-4 -1.40934,-2.5968 C 152.08,103.68707 152.08,103.68707 152.08,103.68707 v 0 l -0.001,10e-4 -0.0107,0.005 -0.044,0.024 -0.184,0.0989 c -0.16534,0.088 -0.41467,0.2188 -0.73867,0.38694 -0.64933,0.336 -1.60133,0.8204 -2.80133,1.40573 -2.4,1.17093 -5.78,2.74013 -9.692,4.33027 -7.90227,3.21293 -17.66014,6.38066 -25.83254,6.72133 z m -68.851064,-12.588 c -1.631734,0 -2.954667,1.32294 -2.954667,2.95467 0,1.63187 1.322933,2.95467 2.954667,2.95467 z m 0.498533,-7.78066 c -1.608933,-0.2756 -3.136,0.80573 -3.410933,2.414 -0.275067,1.6084 0.806133,3.13546 2.414533,3.4104 z m 5.092666,-6.604804 c -1.250533,-1.047867 -3.114133,-0.883733 -4.162533,0.366667 -1.047866,1.250533 -0.883866,3.114133 0.366667,4.162537 z m 12.874933,-1.864533 c 0,-1.631734 -1.3224,-2.954667 -2.954666,-2.954667 -1.631733,0 -2.954133,1.322933 -2.954133,2.954667 z M 166.78666,115.88547 c 1.632,0 2.95467,-1.3228 2.95467,-2.95467 0,-1.63173 -1.32267,-2.95467 -2.95467,-2.95467 z m 2.95467,-6.64787 c 1.632,0 2.95333,-1.32293 2.95333,-2.95467 0,-1.63133 -1.32133,-2.95413 -2.95333,-2.95413 z m -2.95467,-7.3864 c 1.632,0 2.95467,-1.32293 2.95467,-2.954801 0,-1.631733 -1.32267,-2.954666 -2.95467,-2.954666 z m -6.112,-5.963601 c 1.19467,-1.112533 1.26,-2.981733 0.148,-4.175466 -1.11333,-1.193867 -2.98133,-1.26 -4.176,-0.148 l 4.028,4.323466\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path id=\"path10\" d=\"m 59.681732,107.76053 c -1.694267,-2.42026 -1.693733,-2.4208 -1.6932,-2.42133 l 0.0011,-5.3e-4 0.0016,-10e-4 9.33e-4,-0.001 -0.0057,0.004 -0.04267,0.0292 -0.2036,0.1344 c -0.186533,0.1208 -0.471867,0.30106 -0.843733,0.5208 -0.7448,0.4412 -1.825067,1.0344 -3.139067,1.6276 -2.667733,1.2052 -6.11,2.32346 -9.587066,2.32346 v 5.90934 c 4.647999,0 8.961999,-1.46667 12.018799,-2.8468 1.547867,-0.69947 2.8224,-1.3984 3.716134,-1.92707 0.447866,-0.2652 0.803199,-0.48907 1.052133,-0.65053 0.1244,-0.0808 0.222933,-0.1464 0.2932,-0.19374 l 0.0844,-0.0579 0.026,-0.0177 0.0093,-0.007 0.0032,-0.002 0.0016,-0.001 c 4e-4,-5.4e-4 9.33e-4,-0.001 -1.693333,-2.42134 z m 0.498533,-2.91253 -15.511466,-2.65253 -0.9964,5.8244 15.511466,2.65266 z m -0.498533,2.91253 c 1.898,-2.26453 1.898,-2.26453 1.898,-2.26453 v 0 l -5.34e-4,-5.3e-4 -5.33e-4,-5.4e-4 -0.0041,-0.003 -0.01573,-0.0129 -0.06093,-0.0516 -0.2364,-0.19787 c -0.206267,-0.17293 -0.5052,-0.424 -0.8792,-0.73706 -0.747333,-0.62654 -1.792133,-1.502 -2.980666,-2.4984 -2.3776,-1.99267 -5.332267,-4.468804 -7.640134,-6.403204 l -3.795866,4.529204 c 2.307866,1.93386 5.262533,4.4104 7.640133,6.4032 1.189067,0.99626 2.233333,1.87186 2.980667,2.49786 0.374,0.3136 0.673466,0.56454 0.8792,0.73694 l 0.236533,0.19853 0.06147,0.0509 0.0156,0.0131 0.0036,0.003 0.0011,9.3e-4 h 5.34e-4 c 0,0 0,5.4e-4 1.897333,-2.264 z m 2.954666,0 V 93.726133 h -5.908799 v 14.034397 z m 90.854262,-1.4776 c -2.04266,2.13534 -2.04266,2.13587 -2.04133,2.1364 l 0.001,0.001 0.003,0.003 0.008,0.007 0.0227,0.0219 0.076,0.0709 0.268,0.24426 c 0.22666,0.20414 0.552,0.48907 0.96,0.82814 0.81333,0.6744 1.96933,1.57546 3.34933,2.4812 2.64267,1.736 6.57733,3.8088 10.64933,3.8088 v -5.90934 c -2.27466,0 -4.988,-1.25053 -7.40666,-2.83853 -1.15067,-0.75627 -2.128,-1.5172 -2.81734,-2.08907 -0.34266,-0.2844 -0.61066,-0.5188 -0.78666,-0.67813 l -0.196,-0.17813 -0.0427,-0.0401 -0.007,-0.007 v 0 9.3e-4 l 0.001,5.3e-4 c 0,5.4e-4 0,10e-4 -2.04134,2.136 z m 0,2.95467 h 16.25067 v -5.9088 h -16.25067 z m 0,-2.95467 c 2.30667,1.84587 2.30667,1.8468 2.30534,1.84734 v 0.001 l -0.001,0.002 -10e-4,0.002 0.003,-0.005 0.032,-0.038 0.15866,-0.1848 c 0.14534,-0.16773 0.37067,-0.41826 0.66667,-0.72453 0.59467,-0.61507 1.456,-1.43547 2.516,-2.25053 2.18933,-1.68334 4.876,-3.08067 7.61733,-3.08067 v -5.909467 c -4.64666,0 -8.60666,2.295866 -11.22,4.306267 -1.34,1.03133 -2.41733,2.05787 -3.16133,2.8276 -0.37467,0.38653 -0.668,0.71307 -0.87467,0.94893 l -0.24133,0.28387 -0.0707,0.0855 -0.0227,0.0271 -0.007,0.009 -0.004,0.004 -0.001,0.001 c 0,5.3e-4 -0.001,10e-4 2.30666,1.84693 z m 0,0 c 2.94267,0.25827 2.94267,0.2588 2.94267,0.25934 v 0.001 0.002 5.3e-4 -0.007 l 0.005,-0.048 0.0253,-0.22333 c 0.024,-0.20374 0.0653,-0.50947 0.128,-0.89334 0.12533,-0.7724 0.33333,-1.84106 0.66533,-3.0208 0.69333,-2.460931 1.80267,-4.960931 3.41733,-6.466131 l -4.028,-4.323466 c -2.816,2.624533 -4.292,6.402666 -5.07733,9.187997 -0.40667,1.44387 -0.65867,2.7396 -0.81067,3.6772 -0.076,0.47027 -0.128,0.8552 -0.16133,1.12854 -0.016,0.13706 -0.028,0.2464 -0.036,0.3256 l -0.009,0.0948 -0.004,0.0296 v 0.01 l -10e-4,0.004 v 0.002 c 0,9.3e-4 0,10e-4 2.944,0.25933 z M 92.765064,118.5584 C 75.471331,114.23493 66.531198,109.89547 61.644798,105.55213 l -3.925466,4.41667 c 5.992133,5.32667 16.095199,9.94333 33.612399,14.3224 z m 20.256266,4.00573 c 9.2328,-0.3848 19.7708,-3.88173 27.81333,-7.15146 4.06134,-1.6516 7.56534,-3.27814 10.056,-4.49334 1.24667,-0.60773 2.24134,-1.114 2.928,-1.46973 0.344,-0.17813 0.61067,-0.3188 0.79334,-0.4156 l 0.21066,-0.112 0.056,-0.0308 0.016,-0.008 0.004,-0.003 0.001,-5.4e-4 c 10e-4,-4e-4 10e-4,-9.3e-4 -1.40934,-2.5968 C 152.08,103.68707 152.08,103.68707 152.08,103.68707 v 0 l -0.001,10e-4 -0.0107,0.005 -0.044,0.024 -0.184,0.0989 c -0.16534,0.088 -0.41467,0.2188 -0.73867,0.38694 -0.64933,0.336 -1.60133,0.8204 -2.80133,1.40573 -2.4,1.17093 -5.78,2.74013 -9.692,4.33027 -7.90227,3.21293 -17.66014,6.38066 -25.83254,6.72133 z m -68.851064,-12.588 c -1.631734,0 -2.954667,1.32294 -2.954667,2.95467 0,1.63187 1.322933,2.95467 2.954667,2.95467 z m 0.498533,-7.78066 c -1.608933,-0.2756 -3.136,0.80573 -3.410933,2.414 -0.275067,1.6084 0.806133,3.13546 2.414533,3.4104 z m 5.092666,-6.604804 c -1.250533,-1.047867 -3.114133,-0.883733 -4.162533,0.366667 -1.047866,1.250533 -0.883866,3.114133 0.366667,4.162537 z m 12.874933,-1.864533 c 0,-1.631734 -1.3224,-2.954667 -2.954666,-2.954667 -1.631733,0 -2.954133,1.322933 -2.954133,2.954667 z M 166.78666,115.88547 c 1.632,0 2.95467,-1.3228 2.95467,-2.95467 0,-1.63173 -1.32267,-2.95467 -2.95467,-2.95467 z m 2.95467,-6.64787 c 1.632,0 2.95333,-1.32293 2.95333,-2.95467 0,-1.63133 -1.32133,-2.95413 -2.95333,-2.95413 z m -2.95467,-7.3864 c 1.632,0 2.95467,-1.32293 2.95467,-2.954801 0,-1.631733 -1.32267,-2.954666 -2.95467,-2.954666 z m -6.112,-5.963601 c 1.19467,-1.112533 1.26,-2.981733 0.148,-4.175466 -1.11333,-1.193867 -2.98133,-1.26 -4.176,-0.148 l 4.028,4.323466\" style=\"fill:#42a2ac;fill-opacity:1;fill-rule:nonzero;stroke:none;stroke-width:0.133333\"/><path style=\"fill:none;fill-opacity:1;stroke:none;stroke-width:7.83869;paint-order:stroke fill markers\" d=\"M 164.26613,39.391516 186.66249,23.040448\" id=\"path13\"/></g></g><g id=\"g11\" transform=\"matrix(1.3432915,-0.7879499,0.7879499,1.3432915,-106.2073,4.448628)\" style=\"fill:#2c747c;fill-opacity:1\"><text xml:space=\"preserve\" style=\"font-style:normal;font-variant:normal;font-weight:bold;font-stretch:normal;font-size:33.4637px;line-height:1.2;font-family:'JuliaMono Nerd Font Mono';-inkscape-font-specification:'JuliaMono Nerd Font Mono, Bold';font-variant-ligatures:normal;font-variant-caps:normal;font-variant-numeric:normal;font-variant-east-asian:normal;letter-spacing:-5.0176px;fill:#2c747c;fill-opacity:1;stroke:none;stroke-width:4.58396;paint-order:stroke fill markers\" x=\"22.59214\" y=\"108.29921\" id=\"text12\" transform=\"rotate(-0.65289011)\"><tspan sodipodi:role=\"line\" id=\"tspan12\" x=\"22.59214\" y=\"108.29921\" style=\"font-style:normal;font-variant:normal;font-weight:bold;font-stretch:normal;font-size:33.4637px;font-family:'JuliaMono Nerd Font Mono';-inkscape-font-specification:'JuliaMono Nerd Font Mono, Bold';font-variant-ligatures:normal;font-variant-caps:normal;font-variant-numeric:normal;font-variant-east-asian:normal;letter-spacing:-5.0176px;fill:#2c747c;fill-opacity:1;stroke-width:4.58396\" dx=\"0\" rotate=\"0 0 0 0\">&lt;/&gt;</tspan></text></g><g id=\"g12\" transform=\"matrix(0.83189947,0.66586596,-0.66586596,0.83189947,84.18704,56.779475)\" style=\"fill:#2c747c;fill-opacity:1\"><path style=\"color:#000000;fill:#2c747c;fill-opacity:1;-inkscape-stroke:none;paint-order:stroke fill markers\" d=\"m 59.625,-50.986328 v 45.3828124 h 45.38281 V -50.986328 Z m 7.558594,7.558594 h 30.265625 v 30.265625 H 67.183594 Z\" id=\"rect11\"/><text xml:space=\"preserve\" style=\"font-style:normal;font-variant:normal;font-weight:normal;font-stretch:normal;font-size:41.6634px;line-height:1.2;font-family:'JuliaMono Nerd Font';-inkscape-font-specification:'JuliaMono Nerd Font';letter-spacing:0px;fill:#2c747c;fill-opacity:1;stroke:none;stroke-width:5.70716;paint-order:stroke fill markers\" x=\"75.754074\" y=\"-16.546463\" id=\"text11\"><tspan sodipodi:role=\"line\" id=\"tspan11\" x=\"75.754074\" y=\"-16.546463\" style=\"font-style:normal;font-variant:normal;font-weight:normal;font-stretch:normal;font-family:Mignon;-inkscape-font-specification:Mignon;fill:#2c747c;fill-opacity:1;stroke:none;stroke-width:5.70716\">t</tspan></text></g></g></svg>
+"
+#let bar-w = 80pt
+#let bar-window = 40pt
+
+#set page(
+  width: 230pt - bar-window,
+  height: auto,
+  margin: (top: 20pt, bottom: 20pt, left: 20pt),
+  background: (
+    place(
+      right + top,
+      dx: bar-window,
+      rect(
+        fill: gradient.linear(
+          rgb(50, 143, 195),
+          rgb(42, 170, 165),
+          rgb(30, 179, 180),
+        ),
+        height: 100%,
+        width: bar-w,
+      ),
+    )
+  ),
+)
+
+#let typst(size: 1.5em) = text(
+  font: "Buenard",
+  fill: rgb("3D96A9"),
+  weight: "bold",
+  size: size,
+  "typst",
+)
+
+#{
+  set text(size: 20pt, fill: white)
+  let common-x = -bar-w + bar-window + 2pt
+  place(top + right, dx: 3.057em + common-x, dy: -0.17em, rotate(90deg, text(size: 1.5em)[*囯内*]))
+  place(bottom + right, dx: 4.57em + common-x, dy: -1.5em, rotate(90deg, text(size: 1.5em)[*Welcome*]))
+}
+
+#{
+  show: strong
+
+  place(
+    bottom + center,
+    dx: bar-window - 17pt,
+    dy: -30pt,
+    rotate(
+      -30deg,
+      image.decode(typst-guy, width: 50pt),
+    ),
+  )
+
+  let fit-name(username) = context {
+    let r = page.width - bar-w + bar-window - page.margin.left * 2
+    let w = measure(username).width
+    if (w > r) {
+      box(
+        scale(
+          x: r / w * 100%,
+          origin: left,
+          username,
+        ),
+      )
+    } else {
+      username
+    }
+  }
+
+  let cname = {
+    set text(size: if usernames.len() > 3 { 0.7em } else { 1em })
+    usernames.map(fit-name).join(linebreak())
+  }
+
+  [
+    #cname \
+    欢迎加入
+    #v(-0.7em)
+    #typst()
+    #box(text(size: 0.35em, "非官方".clusters().map(x => [#x #v(-0.9em)]).join()) + v(0.06em))
+    #v(-0.44em)
+    中文交流群
+  ]
+}
+
+#v(2em)
+
+#{
+  set text(size: 0.3em)
+  set enum(numbering: x => {
+    let t = numbering("1.", x)
+    text(baseline: 0.1em, t)
+  })
+  [
+    = 入群须知
+    教程和常见问题见群公告
+
+    = #typst(size: 1.2em) Bot说明书
+    + `typ <code>`：渲染代码图片（标记模式）
+    + `teq <code>`：渲染公式图片
+    + `typc <code>`：渲染代码图片（脚本模式）
+  ]
+}
@@ -0,0 +1,50 @@
+// 动态文字层：叠加在 default_background 预渲染的图片上
+#let username = "{nickname}"
+
+#set text(font: ("Libertinus Serif", "Noto Serif CJK SC"), size: 20pt, lang: "zh")
+#show strong: set text(weight: "bold")
+
+#let bar-w = 80pt
+#let bar-window = 40pt
+
+#set page(
+  width: {background_width},
+  height: {background_height},
+  margin: (top: 20pt, bottom: 20pt, left: 20pt),
+  background: image("{background}", width: 100%, height: 100%),
+)
+
+// 新成员头像：右侧色条中部
+#place(
+  top + left,
+  dx: 230pt - bar-window * 1.5 - 15pt - 20pt,
+  dy: 45pt,
+  box(
+    clip: true,
+    radius: 50%,
+    stroke: 1.5pt + white,
+    image("{avatar}", width: 30pt, height: 30pt, fit: "cover"),
+  ),
+)
+
+#{
+  show: strong
+
+  let cname = context {
+    let r = page.width - bar-w + bar-window - page.margin.left * 2
+    let w = measure(username).width
+    if (w > r) {
+      box(
+        scale(
+          x: r / w * 100%,
+          origin: left,
+          username,
+        ),
+      )
+    } else {
+      username
+    }
+  }
+
+  cname
+}
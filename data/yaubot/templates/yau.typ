@@ -26,7 +26,5 @@
 
 #oc.chat(
   oc.datetime(date),
-  oc.message(left, name: [丘成桐（囯內）], profile: default-profile)[
-    {text}
-  ],
+{messages}
 )
@@ -3,9 +3,37 @@
 from .admin import AdminFeature, admin_feature
 from .render import RenderFeature, render_feature
 from .welcome import WelcomeFeature, welcome_feature
-from .daily import DailySummaryFeature, daily_summary_feature
+from .daily import daily_summary_feature
 from .yau import YauFeature, yau_feature
 
+async def preload_features() -> None:
+    """在线程中逐个创建已启用的功能实例
+
+    功能实例延迟创建，但由首条消息触发时，数据库、模板目录和转换词典等的初始化
+    会阻塞事件循环。启动时先在线程中创建，开始接收消息前即已完成。
+    """
+    from . import daily, render, welcome, yau
+
+    for module, feature in (
+        (render, render_feature),
+        (welcome, welcome_feature),
+        (daily, daily_summary_feature),
+        (yau, yau_feature),
+    ):
+        if not module.config.enabled:
+            continue
+        try:
+            await feature.resolve_async()
+        except Exception as e:
+            print(f"预加载功能 {module.__name__.rsplit('.', 1)[-1]} 失败: {e}")
+
+def __getattr__(name: str):
+    # 每日总结的实现模块依赖SQLAlchemy等，访问类时才导入
+    if name == "DailySummaryFeature":
+        from .daily import DailySummaryFeature
+        return DailySummaryFeature
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "AdminFeature",
     "admin_feature",
@@ -17,4 +45,5 @@ __all__ = [
     "daily_summary_feature",
     "YauFeature",
     "yau_feature",
+    "preload_features",
 ]
@@ -4,11 +4,12 @@ import json
 from pathlib import Path
 from typing import Optional
 from nonebot import on_command
+from nonebot.params import CommandArg
 from nonebot.plugin import PluginMetadata
-from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageEvent
+from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, Message, MessageEvent
 from nonebot.permission import SUPERUSER
 
-from ..core import default_sender
+from ..core import circuit_breakers, default_sender, loop_monitor, profiler
 from ..models import AdminConfig, FeatureType
 
 # 插件元数据
@@ -20,6 +21,7 @@ __plugin_meta__ = PluginMetadata(
     /enable <功能名> - 启用功能
     /disable <功能名> - 禁用功能
     /status - 查看功能状态
+    /profile [秒数] - 对事件循环采样分析（仅超级管理员）
     /add_admin <QQ号> - 添加管理员
     /remove_admin <QQ号> - 移除管理员
     
@@ -110,6 +112,15 @@ class AdminFeature:
             enabled = self.is_feature_enabled(group_id, feature)
             status = "启用" if enabled else "禁用"
             status_lines.append(f"- {feature.value}: {status}")
+
+        stats = loop_monitor.stats()
+        status_lines.append(
+            f"事件循环阻塞: {stats['blocked_count']} 次, "
+            f"共 {stats['blocked_seconds'] * 1000:.0f} ms, "
+            f"最长 {stats['max_lag'] * 1000:.0f} ms"
+        )
+        if breakers := circuit_breakers.describe():
+            status_lines.append(f"后端服务: {breakers}")
         return "\n".join(status_lines)
 
 # 创建功能实例
@@ -119,6 +130,7 @@ admin_feature = AdminFeature(Path("data/admin/config.json"))
 enable_cmd = on_command("enable", permission=SUPERUSER, priority=1)
 disable_cmd = on_command("disable", permission=SUPERUSER, priority=1)
 status_cmd = on_command("status", priority=1)
+profile_cmd = on_command("profile", permission=SUPERUSER, priority=1)
 add_admin_cmd = on_command("add_admin", permission=SUPERUSER, priority=1)
 remove_admin_cmd = on_command("remove_admin", permission=SUPERUSER, priority=1)
 
@@ -198,6 +210,35 @@ async def handle_status(bot: Bot, event: GroupMessageEvent):
     status = admin_feature.get_feature_status(str(event.group_id))
     await default_sender.send_message(bot, event, status)
 
+@profile_cmd.handle()
+async def handle_profile(bot: Bot, event: MessageEvent, args: Message = CommandArg()):
+    """处理采样分析命令"""
+    arg = args.extract_plain_text().strip()
+    try:
+        seconds = float(arg) if arg else 10.0
+    except ValueError:
+        await default_sender.send_message(
+            bot, event,
+            f"用法: /profile [秒数]，最长 {profiler.config.max_duration} 秒",
+            at_sender=True
+        )
+        return
+
+    if profiler.running:
+        await default_sender.send_message(bot, event, "已有分析正在进行，请稍后再试", at_sender=True)
+        return
+
+    await default_sender.send_message(
+        bot, event,
+        f"开始采样 {min(seconds, profiler.config.max_duration):g} 秒…"
+    )
+    try:
+        result = await profiler.profile(seconds)
+    except Exception as e:
+        await default_sender.send_message(bot, event, f"分析失败: {e}", at_sender=True)
+        return
+    await default_sender.send_message(bot, event, result.summary())
+
 @add_admin_cmd.handle()
 async def handle_add_admin(bot: Bot, event: MessageEvent):
     """处理添加管理员命令"""
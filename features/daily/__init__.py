@@ -0,0 +1,349 @@
+"""Daily summary feature for the Typst bot."""
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+from nonebot import on_command, on_message, require, get_driver, get_bot
+from nonebot.params import CommandArg
+from nonebot.plugin import PluginMetadata
+from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, Message, MessageSegment
+from nonebot.permission import SUPERUSER
+
+# 声明依赖
+require("nonebot_plugin_apscheduler")
+from nonebot_plugin_apscheduler import scheduler
+
+from ...models import DailySummaryConfig, MessageRecord, FeatureType
+from ...core import lifecycle, metrics
+from ...core.lazy import LazyProxy
+from ...models.daily import DatabaseError
+from ..admin import admin_feature
+
+if TYPE_CHECKING:
+    from .feature import DailySummaryFeature
+
+# 插件元数据
+__plugin_meta__ = PluginMetadata(
+    name="每日总结",
+    description="自动生成群聊技术讨论日报",
+    usage="""
+    被动功能：
+    - 自动记录群聊消息
+    - 每日23:00自动生成技术讨论总结
+    
+    主动命令：
+    /summary - 手动触发生成今日总结
+    /summary_template [模板名] - 切换总结模板
+    /search <关键词> [天数] - 搜索本群历史消息（默认30天）
+    可用模板: concise(简洁版), technical(技术详细版), community(社区互动版)
+    
+    环境变量配置：
+    - OPENAI_API_KEY: OpenAI API密钥
+    - OPENAI_BASE_URL: OpenAI API基础URL（可选）
+    - DAILY_SUMMARY_MODEL: 使用的模型名称（默认：gpt-4-turbo）
+    - DAILY_SUMMARY_TIME: 每日总结时间（默认：23:00）
+    """,
+    type="application",
+    supported_adapters={"~onebot.v11"},
+    extra={
+        "author": "Your Name",
+        "version": "0.1.0",
+        "priority": 5,
+        "required_envs": ["OPENAI_API_KEY"],
+        "optional_envs": ["OPENAI_BASE_URL", "DAILY_SUMMARY_MODEL", "DAILY_SUMMARY_TIME"],
+    },
+)
+
+# 获取全局驱动器
+driver = get_driver()
+
+# 确保数据目录存在
+DATA_DIR = Path("src/plugins/typst_bot/data/daily_summary")
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+# 从配置文件加载配置
+from ...core.config import config_manager
+
+feature_config = config_manager.get_feature_config("daily_summary")
+config = DailySummaryConfig(**feature_config)
+
+def _create_feature() -> "DailySummaryFeature":
+    from .feature import DailySummaryFeature
+    return DailySummaryFeature(config)
+
+# 创建功能实例：数据库和模板环境在首次使用时才初始化
+daily_summary_feature: "DailySummaryFeature" = LazyProxy(_create_feature)
+
+metrics.gauge(
+    "pending_messages",
+    "等待写入数据库的消息数",
+    collect=lambda: {(): len(daily_summary_feature._pending) if daily_summary_feature.loaded else 0}
+)
+metrics.gauge(
+    "db_write_lag_seconds",
+    "缓冲中最早的消息等待写入的时间",
+    collect=lambda: {(): daily_summary_feature.write_lag() if daily_summary_feature.loaded else 0.0}
+)
+
+# 手动触发总结命令
+manual_summary = on_command("summary", permission=SUPERUSER)
+change_template = on_command("summary_template", permission=SUPERUSER)
+search_cmd = on_command("search", permission=SUPERUSER)
+
+# 消息记录器，不阻断其他处理器
+recorder = on_message(priority=1, block=False)
+
+@recorder.handle()
+@lifecycle.tracked
+async def handle_record(bot: Bot, event: GroupMessageEvent):
+    """记录群聊消息"""
+    group_id = str(event.group_id)
+    if not admin_feature.is_feature_enabled(group_id, FeatureType.DAILY_SUMMARY):
+        return
+    if not daily_summary_feature.loaded:
+        # 启动时未能预加载，在线程中创建，避免初始化数据库时阻塞事件循环
+        await daily_summary_feature.resolve_async()
+
+    message = event.get_message()
+    msg_type = next(
+        (segment.type for segment in message if segment.type != "text"),
+        "text"
+    )
+    pending = daily_summary_feature.enqueue_message(MessageRecord(
+        msg_id=str(event.message_id),
+        group_id=group_id,
+        sender_id=str(event.user_id),
+        sender_name=event.sender.card or event.sender.nickname or str(event.user_id),
+        content=str(message),
+        msg_type=msg_type,
+        timestamp=datetime.fromtimestamp(event.time),
+        reference_id=str(event.reply.message_id) if event.reply else None
+    ))
+
+    if pending >= config.flush_size:
+        try:
+            await daily_summary_feature.flush_pending()
+        except DatabaseError as e:
+            print(f"写入消息失败: {e}")
+
+@search_cmd.handle()
+@lifecycle.tracked
+async def handle_search(bot: Bot, event: GroupMessageEvent, arg: Message = CommandArg()):
+    """搜索本群历史消息"""
+    args = arg.extract_plain_text().split()
+    if not args:
+        await search_cmd.finish("用法: /search <关键词> [天数]")
+        return
+
+    days = 30
+    if len(args) > 1 and args[-1].isdigit():
+        days = int(args.pop())
+
+    try:
+        await daily_summary_feature.flush_pending()
+        results = await asyncio.to_thread(
+            daily_summary_feature.search_messages,
+            str(event.group_id),
+            " ".join(args),
+            datetime.now() - timedelta(days=days),
+            None,
+            config.search_limit
+        )
+    except DatabaseError as e:
+        await search_cmd.finish(f"搜索失败: {e}")
+        return
+
+    if not results:
+        await search_cmd.finish("没有找到相关消息")
+        return
+
+    lines = [f"找到 {len(results)} 条相关消息："]
+    for record in results:
+        content = record.content.replace("\n", " ")
+        if len(content) > 60:
+            content = content[:60] + "…"
+        lines.append(f"[{record.timestamp.strftime('%m-%d %H:%M')}] {record.sender_name}: {content}")
+    await search_cmd.finish("\n".join(lines))
+
+@manual_summary.handle()
+@lifecycle.tracked
+async def handle_manual_summary(bot: Bot, event: GroupMessageEvent):
+    """手动触发生成总结"""
+    # 检查功能是否启用
+    if not admin_feature.is_feature_enabled(str(event.group_id), FeatureType.DAILY_SUMMARY):
+        await manual_summary.finish("该群未启用每日总结功能")
+        return
+
+    # 生成总结前写入缓冲中的消息
+    try:
+        await daily_summary_feature.flush_pending()
+    except DatabaseError as e:
+        print(f"写入消息失败: {e}")
+
+    # 生成总结
+    result = await daily_summary_feature.generate_summary(
+        str(event.group_id),
+        config.template.current
+    )
+    
+    # 发送结果
+    if result.success and result.image_data:
+        await manual_summary.finish(MessageSegment.image(f"base64://{result.image_data}"))
+    elif result.success:
+        await manual_summary.finish(result.content)
+    else:
+        await manual_summary.finish(f"生成总结失败: {result.error}")
+
+@change_template.handle()
+@lifecycle.tracked
+async def handle_change_template(bot: Bot, event: GroupMessageEvent):
+    """切换总结模板"""
+    # 检查功能是否启用
+    if not admin_feature.is_feature_enabled(str(event.group_id), FeatureType.DAILY_SUMMARY):
+        await change_template.finish("该群未启用每日总结功能")
+        return
+
+    msg = str(event.get_message()).strip()
+    template_name = msg.split()[-1] if msg else "technical"
+    
+    if template_name not in ["concise", "technical", "community"]:
+        await change_template.finish(
+            "无效的模板名称。可用模板: concise, technical, community"
+        )
+        return
+    
+    config.template.current = template_name
+    await change_template.finish(f"已切换到{template_name}模板")
+
+# 解析调度时间
+schedule_hour, schedule_minute = map(int, config.schedule_time.split(":"))
+
+@scheduler.scheduled_job("cron", hour=schedule_hour, minute=schedule_minute)
+@lifecycle.tracked
+async def generate_daily_summary():
+    """定时生成每日总结"""
+    try:
+        await daily_summary_feature.flush_pending()
+
+        # 获取所有活跃群组（按消息数降序）
+        active_groups = daily_summary_feature.get_active_groups()
+        
+        # 获取Bot实例
+        try:
+            bot = get_bot()
+        except ValueError as e:
+            print(f"获取Bot实例失败: {e}")
+            return
+        
+        summarized = 0
+        for group_id, message_count in active_groups.items():
+            # 检查功能是否启用
+            if not admin_feature.is_feature_enabled(group_id, FeatureType.DAILY_SUMMARY):
+                continue
+
+            # 可选：跳过消息过少的群组
+            if message_count < config.min_messages:
+                continue
+
+            # 单次调度的群组数上限
+            if config.max_groups and summarized >= config.max_groups:
+                print(f"已达到单次总结群组上限 {config.max_groups}，跳过剩余群组")
+                break
+            summarized += 1
+
+            try:
+                result = await daily_summary_feature.generate_summary(
+                    group_id,
+                    config.template.current
+                )
+                
+                if result.success:
+                    await bot.send_group_msg(
+                        group_id=int(group_id),
+                        message=(
+                            MessageSegment.image(f"base64://{result.image_data}")
+                            if result.image_data else result.content
+                        )
+                    )
+                else:
+                    print(f"为群组 {group_id} 生成总结失败: {result.error}")
+            except Exception as e:
+                print(f"处理群组 {group_id} 失败: {e}")
+                continue
+    except Exception as e:
+        print(f"生成每日总结失败: {e}")
+
+def _parse_interval(value: str) -> int:
+    """解析间隔字符串（如 30m、24h、7d）为秒数"""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd]?)\s*", value)
+    if not match:
+        raise ValueError(f"无效的时间间隔: {value}")
+    amount, unit = match.groups()
+    return int(amount) * {"s": 1, "m": 60, "h": 3600, "d": 86400, "": 1}[unit]
+
+@scheduler.scheduled_job("cron", hour=4, minute=30)
+async def maintain_database():
+    """定时清理过期消息并回收空间"""
+    if not daily_summary_feature.loaded:
+        # 尚未使用过的功能没有需要维护的数据，不为此在事件循环中初始化数据库
+        return
+    try:
+        removed = await asyncio.to_thread(daily_summary_feature.purge_expired)
+        await asyncio.to_thread(daily_summary_feature.compact)
+        if removed:
+            print(f"已清理 {removed} 条过期消息")
+    except Exception as e:
+        print(f"数据库维护失败: {e}")
+
+async def flush_messages():
+    """定时写入缓冲中的消息"""
+    if not daily_summary_feature.loaded:
+        return
+    try:
+        await daily_summary_feature.flush_pending()
+    except DatabaseError as e:
+        print(f"写入消息失败: {e}")
+
+# 关闭前写入缓冲中的消息
+lifecycle.on_shutdown(flush_messages)
+
+scheduler.add_job(
+    flush_messages,
+    "interval",
+    seconds=config.flush_interval,
+    id="daily_summary_flush",
+    replace_existing=True
+)
+
+async def backup_database():
+    """定时备份数据库"""
+    if not daily_summary_feature.loaded:
+        return
+    try:
+        path = await asyncio.to_thread(daily_summary_feature.backup)
+        print(f"数据库已备份到 {path}")
+    except Exception as e:
+        print(f"数据库备份失败: {e}")
+
+scheduler.add_job(
+    backup_database,
+    "interval",
+    seconds=_parse_interval(config.backup_interval),
+    id="daily_summary_backup",
+    replace_existing=True
+)
+
+# 启动时检查配置
+@driver.on_startup
+async def check_config():
+    if not config.model.api_key:
+        raise ValueError("未设置 daily_summary.model.api_key 配置")
+
+def __getattr__(name: str):
+    """按需导出实现模块中的类，避免导入本包时加载数据库等依赖"""
+    if name in ("DailySummaryFeature", "MessageTable", "SummaryCacheTable"):
+        from . import feature
+        return getattr(feature, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
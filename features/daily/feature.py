@@ -0,0 +1,1011 @@
+"""Daily summary implementation: message storage, LLM analysis and rendering.
+
+本模块导入 SQLAlchemy、Jinja2 和 httpx，仅在功能首次使用时由 daily 包加载。
+"""
+
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import httpx
+from sqlalchemy import create_engine, event, text, insert, Column, String, Text, DateTime, select, func, delete
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from ...models import (
+    DailySummaryConfig,
+    MessageRecord,
+    ModelConfig,
+    TemplateConfig,
+    SummaryResult,
+    FeatureType
+)
+from ...core import TypstCompiler, CompilerConfig, TemplateManager, StageTimer, circuit_breakers, metrics, requests_total, timing_registry
+from ...core.transcript import CQ_PATTERN, TranscriptEncoder, encode_json
+from ...models.daily import DatabaseError, TemplateError, SummaryError
+
+# 运行指标
+_summary_requests = {
+    status: requests_total.labels(FeatureType.DAILY_SUMMARY.value, status)
+    for status in ("success", "error")
+}
+_messages_recorded = metrics.counter("messages_recorded_total", "记录的群聊消息数")
+_flush_seconds = metrics.histogram("db_flush_seconds", "消息缓冲写入数据库的耗时")
+_llm_seconds = metrics.histogram("llm_request_seconds", "语言模型调用耗时")
+_llm_errors = metrics.counter("llm_errors_total", "语言模型调用失败次数")
+
+# SQLAlchemy基类
+Base = declarative_base()
+
+class MessageTable(Base):
+    """消息数据表"""
+    __tablename__ = "messages"
+
+    msg_id = Column(String, primary_key=True)
+    group_id = Column(String, nullable=False, index=True)
+    sender_id = Column(String, nullable=False)
+    sender_name = Column(String, nullable=False)
+    content = Column(String, nullable=False)
+    msg_type = Column(String, default="text")
+    timestamp = Column(DateTime, default=datetime.now, index=True)
+    reference_id = Column(String, nullable=True)
+    topic_id = Column(String, nullable=True, index=True)
+
+    def to_model(self) -> MessageRecord:
+        """转换为Pydantic模型"""
+        return MessageRecord(
+            msg_id=self.msg_id,
+            group_id=self.group_id,
+            sender_id=self.sender_id,
+            sender_name=self.sender_name,
+            content=self.content,
+            msg_type=self.msg_type,
+            timestamp=self.timestamp,
+            reference_id=self.reference_id,
+            topic_id=self.topic_id
+        )
+
+class SummaryCacheTable(Base):
+    """总结缓存数据表"""
+    __tablename__ = "summary_cache"
+
+    group_id = Column(String, primary_key=True)
+    date = Column(String, primary_key=True)
+    template_name = Column(String, primary_key=True)
+    watermark = Column(String, nullable=False)
+    analysis = Column(Text, nullable=False)     # 模型分析结果（JSON）
+    content = Column(Text, nullable=False)      # 渲染后的Markdown
+    image_data = Column(Text, nullable=True)    # base64编码的总结图片
+    updated_at = Column(DateTime, default=datetime.now)
+
+# 检索往日相关讨论时使用的关键词：英文标识符、包名等
+CONTEXT_TERM_PATTERN = re.compile(r"[A-Za-z_][\w.+#-]{2,}")
+
+# 全文索引同步触发器
+FTS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+)
+
+class DailySummaryFeature:
+    """每日总结功能"""
+    def __init__(self, config: DailySummaryConfig):
+        self.config = config
+        
+        # 初始化数据库
+        self.db_path = Path(config.storage_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{config.storage_path}")
+        event.listen(self.engine, "connect", self._on_connect)
+        self._vacuumed = False
+        self._enable_incremental_vacuum()
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.fts_enabled = self._init_fts()
+
+        # 待写入的消息缓冲
+        self._pending: List[MessageRecord] = []
+
+        # 初始化聊天记录编码器
+        self.transcript_encoder = TranscriptEncoder()
+
+        # 初始化总结图片编译器
+        self.compiler = TypstCompiler(
+            CompilerConfig(
+                timeout=config.image_timeout,
+                ppi=config.image_ppi,
+                fallback_size=0  # 总结结果已缓存在数据库中
+            ),
+            name="daily"
+        )
+        self.image_templates = TemplateManager(config.image_template_dir)
+
+        # 语言模型熔断器，熔断期间直接发送统计总结
+        self.llm_breaker = circuit_breakers.get("llm")
+        
+        # 初始化模板环境
+        self.template_dir = Path("src/plugins/typst_bot/features/daily/templates")
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            autoescape=select_autoescape(['html', 'xml']),
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self._init_default_templates()
+
+    def _init_default_templates(self) -> None:
+        """初始化默认模板"""
+        templates = {
+            "concise.md.jinja": """# {{ date }} 技术社区日报 - 简洁版
+
+## 今日概览
+活跃用户数：{{ active_users }}
+消息总数：{{ total_messages }}
+
+## 🎯 热点话题
+{% for topic in topics %}
+{{ loop.index }}. {{ topic.name }} (热度: {{ "★" * topic.heat }})
+   - {{ topic.summary }}
+{% endfor %}
+
+## ⚠️ 待解决问题
+{% for issue in issues %}
+- {{ issue.title }} (由 {{ issue.raised_by }} 提出)
+{% endfor %}
+
+🤖 由 {{ bot_name }} 生成
+""",
+
+            "technical.md.jinja": """# {{ date }} 技术社区日报 - 技术详细版
+
+## 📊 数据统计
+- 活跃讨论者：{{ active_users }}人
+- 技术话题数：{{ topics|length }}个
+- 代码分享数：{{ code_snippets|length }}段
+- 总消息量：{{ total_messages }}条
+
+## 🎯 技术话题榜
+{% for topic in topics %}
+### {{ loop.index }}. {{ topic.name }} (热度: {{ "★" * topic.heat }})
+{{ topic.summary }}
+{% if topic.key_points %}
+关键点：
+{% for point in topic.key_points %}
+- {{ point }}
+{% endfor %}
+{% endif %}
+{% endfor %}
+
+## 💻 代码分析
+{% for snippet in code_snippets %}
+### 代码片段 {{ loop.index }}
+```{{ snippet.language }}
+{{ snippet.code }}
+```
+**分析**: {{ snippet.analysis }}
+{% endfor %}
+
+## ⚠️ 技术难题追踪
+{% for issue in issues %}
+### {{ issue.title }}
+- 提出者：{{ issue.raised_by }}
+- 状态：{{ issue.status }}
+- 描述：{{ issue.description }}
+{% endfor %}
+
+## 📚 学习资源
+{% for resource in resources %}
+- [{{ resource.title }}]({{ resource.url }}) - {{ resource.description }}
+{% endfor %}
+
+🤖 由 {{ bot_name }} 基于 {{ total_messages }} 条消息生成
+""",
+
+            "community.md.jinja": """# {{ date }} 技术社区日报 - 社区互动版
+
+## 👥 今日社区数据
+活跃成员：{{ active_users }}
+消息总量：{{ total_messages }}
+互动最多话题数：{{ topics|length }}
+
+## 🌟 精彩讨论
+{% for discussion in top_discussions %}
+### {{ loop.index }}. {{ discussion.title }}
+参与者：{{ discussion.participants|join(", ") }}
+热度：{{ "🔥" * discussion.heat }}
+
+{{ discussion.summary }}
+
+{% if discussion.highlights %}
+精彩观点：
+{% for point in discussion.highlights %}
+> {{ point.content }} —— {{ point.author }}
+{% endfor %}
+{% endif %}
+{% endfor %}
+
+## 💡 创新想法墙
+{% for idea in innovative_ideas %}
+- {{ idea.author }}: {{ idea.content }}
+{% endfor %}
+
+## 👏 今日贡献者
+{% for contributor in top_contributors %}
+- {{ contributor.name }}: {{ contributor.contribution }}
+{% endfor %}
+
+🤖 由 {{ bot_name }} 用 ❤️ 生成
+""",
+
+            "stats.md.jinja": """# {{ date }} 技术社区日报 - 统计版
+
+## 今日概览
+活跃用户数：{{ active_users }}
+消息总数：{{ total_messages }}
+
+## 💬 发言最多
+{% for sender in top_senders %}
+{{ loop.index }}. {{ sender.name }}：{{ sender.count }} 条
+{% endfor %}
+
+## 🕒 时段分布
+{% for hour in hours %}
+- {{ "%02d"|format(hour.hour) }}:00 {{ "▇" * hour.bar }} {{ hour.count }}
+{% endfor %}
+
+*分析服务暂时不可用，本期仅包含消息统计*
+
+🤖 由 {{ bot_name }} 生成
+"""
+        }
+
+        for name, content in templates.items():
+            template_path = self.template_dir / name
+            if not template_path.exists():
+                template_path.write_text(content, encoding='utf-8')
+
+        # 总结图片模板（Markdown交给cmarker渲染）
+        if not self.image_templates.get_template("summary"):
+            self.image_templates.save_template(
+                "summary",
+                """#import "@preview/cmarker:0.1.1"
+
+#set page(width: 600pt, height: auto, margin: 1.5em)
+#set text(font: ("Libertinus Serif", "Noto Serif CJK SC"), size: 11pt, lang: "zh")
+
+#cmarker.render("{markdown}")
+""",
+                "每日总结图片模板"
+            )
+
+    @staticmethod
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        """为每个连接启用WAL，读写互不阻塞"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def _enable_incremental_vacuum(self) -> None:
+        """启用增量VACUUM，已有数据库需要一次完整VACUUM才能切换"""
+        try:
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+                if mode != 2:
+                    conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                    conn.exec_driver_sql("VACUUM")
+                    # VACUUM可能重排rowid，全文索引需要重建
+                    self._vacuumed = True
+        except Exception as e:
+            print(f"启用增量VACUUM失败: {e}")
+
+    def _init_fts(self) -> bool:
+        """创建全文索引并用触发器与消息表保持同步
+
+        优先使用trigram分词（中文无需分词词典），旧版SQLite退回unicode61。
+        """
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+                ).first()
+                if not exists:
+                    for tokenizer in ("trigram", "unicode61"):
+                        try:
+                            conn.exec_driver_sql(
+                                "CREATE VIRTUAL TABLE messages_fts USING fts5("
+                                "content, content='messages', content_rowid='rowid', "
+                                f"tokenize='{tokenizer}')"
+                            )
+                            break
+                        except Exception as e:
+                            print(f"创建全文索引（{tokenizer}）失败: {e}")
+                    else:
+                        return False
+
+                for statement in FTS_TRIGGERS:
+                    conn.exec_driver_sql(statement)
+
+                if not exists or self._vacuumed:
+                    conn.exec_driver_sql("INSERT INTO messages_fts(messages_fts) VALUES('rebuild')")
+            return True
+        except Exception as e:
+            print(f"初始化全文索引失败: {e}")
+            return False
+
+    def search_messages(
+        self,
+        group_id: str,
+        keyword: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        match_any: bool = False
+    ) -> List[MessageRecord]:
+        """按相关度搜索群组历史消息
+
+        长度不少于3个字符的关键词走全文索引并按bm25排序，
+        较短的关键词只能退回LIKE过滤，按时间倒序返回。
+        match_any 为True时只要命中任一关键词即可，此时只使用全文索引。
+        """
+        terms = keyword.split()
+        if not terms:
+            return []
+
+        match_terms = [t for t in terms if len(t) >= 3] if self.fts_enabled else []
+        like_terms = [t for t in terms if t not in match_terms]
+        if match_any:
+            if not match_terms:
+                return []
+            like_terms = []
+
+        conditions = ["m.group_id = :group_id"]
+        params: Dict[str, Any] = {"group_id": group_id, "limit": limit}
+        if since:
+            conditions.append("m.timestamp >= :since")
+            params["since"] = since
+        if until:
+            conditions.append("m.timestamp < :until")
+            params["until"] = until
+        for i, term in enumerate(like_terms):
+            conditions.append(f"m.content LIKE :like{i} ESCAPE '\\'")
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params[f"like{i}"] = f"%{escaped}%"
+
+        columns = (
+            "m.msg_id, m.group_id, m.sender_id, m.sender_name, m.content, "
+            "m.msg_type, m.timestamp, m.reference_id, m.topic_id"
+        )
+        if match_terms:
+            params["query"] = (" OR " if match_any else " AND ").join(
+                '"' + term.replace('"', '""') + '"' for term in match_terms
+            )
+            sql = (
+                f"SELECT {columns} FROM messages_fts "
+                "JOIN messages m ON m.rowid = messages_fts.rowid "
+                f"WHERE messages_fts MATCH :query AND {' AND '.join(conditions)} "
+                "ORDER BY bm25(messages_fts) LIMIT :limit"
+            )
+        else:
+            sql = (
+                f"SELECT {columns} FROM messages m "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY m.timestamp DESC LIMIT :limit"
+            )
+
+        try:
+            with self.Session() as session:
+                rows = session.execute(
+                    select(MessageTable).from_statement(text(sql)),
+                    params
+                ).scalars().all()
+                return [row.to_model() for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"搜索消息失败: {e}")
+
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """删除超过保留期的消息和总结缓存，返回删除的消息数"""
+        if not self.config.retention_days:
+            return 0
+
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=self.config.retention_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        removed = 0
+        try:
+            # 分批删除，避免长时间持有写锁
+            while True:
+                with self.engine.begin() as conn:
+                    deleted = conn.execute(
+                        text(
+                            "DELETE FROM messages WHERE rowid IN ("
+                            "SELECT rowid FROM messages WHERE timestamp < :cutoff LIMIT :batch)"
+                        ),
+                        {"cutoff": cutoff, "batch": self.config.purge_batch_size}
+                    ).rowcount
+                removed += deleted
+                if deleted < self.config.purge_batch_size:
+                    break
+
+            with self.Session() as session:
+                session.execute(
+                    delete(SummaryCacheTable).where(
+                        SummaryCacheTable.date < cutoff.strftime("%Y-%m-%d")
+                    )
+                )
+                session.commit()
+            return removed
+        except Exception as e:
+            raise DatabaseError(f"清理过期消息失败: {e}")
+
+    def compact(self) -> None:
+        """回收空闲页，每次最多回收 vacuum_pages 页"""
+        try:
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(self.config.vacuum_pages)})")
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            raise DatabaseError(f"压缩数据库失败: {e}")
+
+    def backup(self) -> Path:
+        """使用SQLite在线备份API备份数据库，并清理旧备份"""
+        backup_dir = Path(self.config.backup_dir)
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        target = backup_dir / f"messages-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+
+        try:
+            source = sqlite3.connect(self.db_path)
+            dest = sqlite3.connect(target)
+            try:
+                # 分步复制，期间不阻塞写入
+                source.backup(dest, pages=1024, sleep=0.01)
+            finally:
+                dest.close()
+                source.close()
+        except Exception as e:
+            target.unlink(missing_ok=True)
+            raise DatabaseError(f"备份数据库失败: {e}")
+
+        backups = sorted(backup_dir.glob("messages-*.db"))
+        for old in backups[:-self.config.backup_keep or None]:
+            old.unlink(missing_ok=True)
+        return target
+
+    def save_message(self, message: MessageRecord) -> None:
+        """保存消息记录"""
+        try:
+            with self.Session() as session:
+                db_message = MessageTable(
+                    msg_id=message.msg_id,
+                    group_id=message.group_id,
+                    sender_id=message.sender_id,
+                    sender_name=message.sender_name,
+                    content=message.content,
+                    msg_type=message.msg_type,
+                    timestamp=message.timestamp,
+                    reference_id=message.reference_id,
+                    topic_id=message.topic_id
+                )
+                session.add(db_message)
+                session.commit()
+        except Exception as e:
+            raise DatabaseError(f"保存消息失败: {e}")
+
+    def save_messages(self, messages: List[MessageRecord]) -> int:
+        """批量保存消息记录，重复的消息ID会被忽略"""
+        if not messages:
+            return 0
+        try:
+            with self.engine.begin() as conn:
+                result = conn.execute(
+                    insert(MessageTable.__table__).prefix_with("OR IGNORE"),
+                    [message.model_dump() for message in messages]
+                )
+                return result.rowcount
+        except Exception as e:
+            raise DatabaseError(f"批量保存消息失败: {e}")
+
+    def enqueue_message(self, message: MessageRecord) -> int:
+        """将消息加入写入缓冲，返回缓冲中的消息数"""
+        self._pending.append(message)
+        _messages_recorded.inc()
+        return len(self._pending)
+
+    def write_lag(self) -> float:
+        """缓冲中最早的消息等待写入的时间（秒）"""
+        if not self._pending:
+            return 0.0
+        return max(time.time() - self._pending[0].timestamp.timestamp(), 0.0)
+
+    async def flush_pending(self) -> int:
+        """将缓冲中的消息写入数据库"""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            started = time.perf_counter()
+            written = await asyncio.to_thread(self.save_messages, batch)
+            _flush_seconds.observe(time.perf_counter() - started)
+            return written
+        except DatabaseError:
+            # 写入失败时放回缓冲，等待下次重试
+            self._pending[:0] = batch
+            raise
+
+    def get_today_messages(self, group_id: str) -> List[MessageRecord]:
+        """获取今日消息记录"""
+        try:
+            today_start = datetime.now().replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            with self.Session() as session:
+                query = select(MessageTable).where(
+                    MessageTable.group_id == group_id,
+                    MessageTable.timestamp >= today_start
+                )
+                results = session.execute(query).scalars().all()
+                return [msg.to_model() for msg in results]
+        except Exception as e:
+            raise DatabaseError(f"获取消息失败: {e}")
+
+    def get_related_context(self, group_id: str, messages: List[MessageRecord]) -> List[MessageRecord]:
+        """检索往日与今日话题相关的消息，供总结时参考
+
+        取今日被最多成员提到的关键词，在过去 context_days 天的消息中按bm25检索，
+        按时间顺序返回；未开启或检索失败时返回空列表。
+        """
+        if not self.config.context_days or not self.fts_enabled:
+            return []
+
+        # 同一成员反复提到的关键词只计一次
+        by_sender: Dict[str, set] = {}
+        for message in messages:
+            content = CQ_PATTERN.sub(" ", message.content)
+            by_sender.setdefault(message.sender_id, set()).update(
+                term.lower() for term in CONTEXT_TERM_PATTERN.findall(content)
+            )
+        mentions = Counter(term for terms in by_sender.values() for term in terms)
+        terms = [term for term, _ in mentions.most_common(self.config.context_terms)]
+        if not terms:
+            return []
+
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        try:
+            results = self.search_messages(
+                group_id,
+                " ".join(terms),
+                today_start - timedelta(days=self.config.context_days),
+                today_start,
+                self.config.context_limit,
+                match_any=True
+            )
+        except DatabaseError as e:
+            print(f"检索往日相关讨论失败: {e}")
+            return []
+        return sorted(results, key=lambda record: record.timestamp)
+
+    def get_message_stats(self, group_id: str, top_n: int = 10) -> Dict[str, Any]:
+        """按发送者和小时统计今日消息数，不读取消息内容"""
+        try:
+            today_start = datetime.now().replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            where = (MessageTable.group_id == group_id, MessageTable.timestamp >= today_start)
+            with self.Session() as session:
+                senders = session.execute(
+                    select(MessageTable.sender_id, func.max(MessageTable.sender_name), func.count())
+                    .where(*where)
+                    .group_by(MessageTable.sender_id)
+                    .order_by(func.count().desc())
+                ).all()
+                hours = session.execute(
+                    select(func.strftime("%H", MessageTable.timestamp), func.count())
+                    .where(*where)
+                    .group_by(func.strftime("%H", MessageTable.timestamp))
+                ).all()
+        except Exception as e:
+            raise DatabaseError(f"统计消息失败: {e}")
+
+        hourly = Counter({int(hour): count for hour, count in hours})
+        peak = max(hourly.values(), default=0)
+        return {
+            "total_messages": sum(count for _, _, count in senders),
+            "active_users": len(senders),
+            "top_senders": [
+                {"name": name or sender_id, "count": count}
+                for sender_id, name, count in senders[:top_n]
+            ],
+            "hours": [
+                {"hour": hour, "count": hourly[hour], "bar": math.ceil(hourly[hour] * 20 / peak)}
+                for hour in sorted(hourly)
+            ],
+        }
+
+    def get_active_groups(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """获取活跃群组及其消息数
+
+        只在时间索引上做聚合，不读取消息内容，按消息数降序返回。
+        """
+        try:
+            if since is None:
+                since = datetime.now().replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                )
+            message_count = func.count(MessageTable.msg_id)
+            with self.Session() as session:
+                query = (
+                    select(MessageTable.group_id, message_count)
+                    .where(MessageTable.timestamp >= since)
+                    .group_by(MessageTable.group_id)
+                    .order_by(message_count.desc())
+                )
+                return {group_id: count for group_id, count in session.execute(query)}
+        except Exception as e:
+            raise DatabaseError(f"获取活跃群组失败: {e}")
+
+    def get_watermark(self, group_id: str, since: Optional[datetime] = None) -> Optional[str]:
+        """获取群组消息水位（消息数与最后一条消息时间），无消息时返回None"""
+        try:
+            if since is None:
+                since = datetime.now().replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                )
+            with self.Session() as session:
+                count, latest = session.execute(
+                    select(func.count(MessageTable.msg_id), func.max(MessageTable.timestamp))
+                    .where(
+                        MessageTable.group_id == group_id,
+                        MessageTable.timestamp >= since
+                    )
+                ).one()
+            if not count:
+                return None
+            return f"{count}@{latest.isoformat()}"
+        except Exception as e:
+            raise DatabaseError(f"获取消息水位失败: {e}")
+
+    def _get_cached_summary(
+        self,
+        group_id: str,
+        date: str,
+        watermark: str
+    ) -> Dict[str, SummaryCacheTable]:
+        """获取与当前水位一致的缓存，按模板名索引"""
+        try:
+            with self.Session() as session:
+                query = select(SummaryCacheTable).where(
+                    SummaryCacheTable.group_id == group_id,
+                    SummaryCacheTable.date == date,
+                    SummaryCacheTable.watermark == watermark
+                )
+                rows = session.execute(query).scalars().all()
+                session.expunge_all()
+                return {row.template_name: row for row in rows}
+        except Exception as e:
+            print(f"读取总结缓存失败: {e}")
+            return {}
+
+    def _save_cached_summary(self, entry: SummaryCacheTable) -> None:
+        """保存总结缓存，同一群组同一天只保留最新水位"""
+        try:
+            with self.Session() as session:
+                session.execute(
+                    delete(SummaryCacheTable).where(
+                        SummaryCacheTable.group_id == entry.group_id,
+                        SummaryCacheTable.date == entry.date,
+                        SummaryCacheTable.watermark != entry.watermark
+                    )
+                )
+                session.merge(entry)
+                session.commit()
+        except Exception as e:
+            print(f"保存总结缓存失败: {e}")
+
+    async def _render_image(self, content: str, timer: Optional[StageTimer] = None) -> Optional[str]:
+        """将总结渲染为图片，失败时返回None"""
+        timer = timer or StageTimer()
+        # 转义为Typst字符串字面量
+        markdown = content.replace("\\", "\\\\").replace('"', '\\"')
+        with timer.stage("image_template"):
+            rendered = await self.image_templates.render_template_async(
+                self.config.image_template,
+                {"markdown": markdown}
+            )
+        if not rendered:
+            print(f"未找到总结图片模板: {self.config.image_template}")
+            return None
+
+        result = await self.compiler.compile(rendered)
+        timer.merge(result.timings)
+        if not result.success:
+            print(f"渲染总结图片失败: {result.error}")
+            return None
+        return result.content
+
+    async def _call_llm(self, messages: List[Dict[str, str]]) -> str:
+        """调用语言模型，经熔断器保护：接口持续失败时直接抛出 CircuitOpenError"""
+        with self.llm_breaker.guard():
+            return await self._request_llm(messages)
+
+    async def _request_llm(self, messages: List[Dict[str, str]]) -> str:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.config.model.api_key.get_secret_value()}"
+        }
+        
+        url = str(self.config.model.base_url or "https://api.openai.com/v1/chat/completions")
+        
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            try:
+                response = await client.post(
+                    url,
+                    headers=headers,
+                    json={
+                        "model": self.config.model.model_name,
+                        "messages": messages,
+                        "temperature": self.config.model.temperature,
+                        "max_tokens": self.config.model.max_tokens
+                    },
+                    timeout=30.0
+                )
+            except httpx.HTTPError:
+                _llm_errors.inc()
+                raise
+            finally:
+                _llm_seconds.observe(time.perf_counter() - started)
+            
+            if response.status_code != 200:
+                _llm_errors.inc()
+                raise SummaryError(f"API调用失败: {response.text}")
+                
+            return response.json()["choices"][0]["message"]["content"]
+
+    def _prepare_messages(self, records: List[MessageRecord]) -> str:
+        """准备消息格式"""
+        if self.config.prompt_format == "json":
+            return encode_json(records)
+        return self.transcript_encoder.encode(records)
+
+    def _describe_format(self) -> str:
+        """聊天记录格式说明"""
+        if self.config.prompt_format == "json":
+            return "聊天记录按话题分组，每组包含发送者、内容和时间信息。"
+        return self.transcript_encoder.describe()
+
+    async def analyze_messages(
+        self,
+        messages: List[MessageRecord],
+        context: Optional[List[MessageRecord]] = None
+    ) -> Dict[str, Any]:
+        """分析消息内容
+
+        Args:
+            context: 往日相关讨论，只作为背景，不计入今日总结
+        """
+        if not messages:
+            return {}
+
+        background = ""
+        if context:
+            background = f"""
+往日相关讨论（仅供理解今日话题的背景，不要写入今日总结）:
+{self._prepare_messages(context)}
+"""
+
+        prompt = f"""请分析以下技术社区的聊天记录，生成一份结构化的分析报告。
+{self._describe_format()}
+{background}
+聊天记录:
+{self._prepare_messages(messages)}
+
+请提供以下信息（JSON格式）：
+1. topics: 主要讨论的技术话题列表，每个话题包含:
+   - name: 话题名称
+   - heat: 热度值(1-5)
+   - summary: 讨论要点总结
+   - key_points: 关键论点列表
+2. code_snippets: 代码片段分析，包含:
+   - language: 编程语言
+   - code: 代码内容
+   - analysis: 代码功能分析
+3. issues: 技术难题列表，包含:
+   - title: 问题标题
+   - raised_by: 提出者
+   - status: 状态(unsolved/in_progress/solved)
+   - description: 问题描述
+4. resources: 相关学习资源，包含:
+   - title: 资源标题
+   - url: 资源链接
+   - description: 资源描述
+5. innovative_ideas: 创新想法列表，包含:
+   - author: 提出者
+   - content: 想法内容
+6. top_contributors: 主要贡献者列表，包含:
+   - name: 贡献者名称
+   - contribution: 贡献内容描述
+
+请确保输出为有效的JSON格式。"""
+
+        try:
+            response = await self._call_llm([
+                {"role": "system", "content": "你是一个技术社区聊天记录分析专家"},
+                {"role": "user", "content": prompt}
+            ])
+            return json.loads(response)
+        except Exception as e:
+            raise SummaryError(f"分析消息失败: {e}")
+
+    async def generate_summary(
+        self,
+        group_id: str,
+        template_name: str = "technical"
+    ) -> SummaryResult:
+        """生成每日总结
+
+        结果按 (群组, 日期, 模板, 消息水位) 缓存，没有新消息时直接返回缓存；
+        切换模板时复用已有的模型分析结果，只重新渲染模板。
+        各阶段耗时记录在 metadata["timings"]。
+        """
+        timer = StageTimer()
+        result = await self._generate_summary(group_id, template_name, timer)
+        _summary_requests["success" if result.success else "error"].inc()
+        timing_registry.observe("daily_summary", timer)
+        return result
+
+    async def _generate_summary(
+        self,
+        group_id: str,
+        template_name: str,
+        timer: StageTimer
+    ) -> SummaryResult:
+        date = datetime.now().strftime("%Y-%m-%d")
+        try:
+            with timer.stage("query"):
+                watermark = self.get_watermark(group_id)
+            if watermark is None:
+                return SummaryResult(
+                    success=False,
+                    error="今日无消息记录",
+                    group_id=group_id,
+                    date=date
+                )
+
+            with timer.stage("query"):
+                cached = self._get_cached_summary(group_id, date, watermark)
+            hit = cached.get(template_name)
+            if hit and (hit.image_data or not self.config.render_image):
+                return SummaryResult(
+                    success=True,
+                    content=hit.content,
+                    image_data=hit.image_data,
+                    group_id=group_id,
+                    date=date,
+                    metadata={"cached": True, "timings": timer.stages}
+                )
+
+            # 获取今日消息
+            with timer.stage("query"):
+                messages = self.get_today_messages(group_id)
+            if not messages:
+                return SummaryResult(
+                    success=False,
+                    error="今日无消息记录",
+                    group_id=group_id,
+                    date=date
+                )
+
+            # 分析消息（其他模板已分析过时直接复用）
+            if cached:
+                analysis = json.loads(next(iter(cached.values())).analysis)
+            else:
+                with timer.stage("query"):
+                    context = self.get_related_context(group_id, messages)
+                try:
+                    with timer.stage("llm"):
+                        analysis = await self.analyze_messages(messages, context)
+                except SummaryError as e:
+                    if not self.config.stats_fallback:
+                        raise
+                    print(f"群组 {group_id} 模型分析失败，改为发送统计总结: {e}")
+                    return await self._generate_stats_summary(group_id, date, timer)
+            
+            # 渲染模板
+            with timer.stage("template"):
+                template = self.env.get_template(f"{template_name}.md.jinja")
+                content = template.render(
+                    date=date,
+                    active_users=len({msg.sender_id for msg in messages}),
+                    total_messages=len(messages),
+                    topics=analysis.get("topics", []),
+                    code_snippets=analysis.get("code_snippets", []),
+                    issues=analysis.get("issues", []),
+                    resources=analysis.get("resources", []),
+                    top_discussions=[],  # 从topics中转换
+                    innovative_ideas=analysis.get("innovative_ideas", []),
+                    top_contributors=analysis.get("top_contributors", []),
+                    bot_name="TypstBot"
+                )
+
+            # 渲染图片
+            image_data = None
+            if self.config.render_image:
+                image_data = await self._render_image(content, timer)
+
+            self._save_cached_summary(SummaryCacheTable(
+                group_id=group_id,
+                date=date,
+                template_name=template_name,
+                watermark=watermark,
+                analysis=json.dumps(analysis, ensure_ascii=False),
+                content=content,
+                image_data=image_data,
+                updated_at=datetime.now()
+            ))
+            
+            return SummaryResult(
+                success=True,
+                content=content,
+                image_data=image_data,
+                group_id=group_id,
+                date=date,
+                metadata={"cached": False, "timings": timer.stages}
+            )
+            
+        except Exception as e:
+            return SummaryResult(
+                success=False,
+                error=str(e),
+                group_id=group_id,
+                date=date,
+                metadata={"timings": timer.stages}
+            )
+
+    async def _generate_stats_summary(
+        self,
+        group_id: str,
+        date: str,
+        timer: StageTimer
+    ) -> SummaryResult:
+        """不经语言模型，只根据消息统计生成总结
+
+        统计总结不写入缓存，模型恢复后再次请求即可得到完整总结。
+        """
+        with timer.stage("query"):
+            stats = self.get_message_stats(group_id)
+        with timer.stage("template"):
+            content = self.env.get_template("stats.md.jinja").render(
+                date=date,
+                bot_name="TypstBot",
+                **stats
+            )
+
+        image_data = None
+        if self.config.render_image:
+            image_data = await self._render_image(content, timer)
+
+        return SummaryResult(
+            success=True,
+            content=content,
+            image_data=image_data,
+            group_id=group_id,
+            date=date,
+            metadata={"cached": False, "degraded": "stats", "timings": timer.stages}
+        )
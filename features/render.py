@@ -1,12 +1,16 @@
 """Render feature for the Typst bot."""
 
+import asyncio
 from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
 from nonebot import on_message
 from nonebot.plugin import PluginMetadata
 from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageEvent
+from nonebot.rule import Rule
 
-from ..core import TypstCompiler, CompilerConfig, TemplateManager, default_sender
+from ..core import TypstCompiler, CompilerConfig, TemplateManager, StageTimer, default_sender, lifecycle, rate_limiter, requests_total, timing_registry
 from ..models import RenderConfig, RenderRequest, RenderResult, FeatureType
+from ..core.lazy import LazyProxy
 from .admin import admin_feature
 
 # 插件元数据
@@ -33,6 +37,9 @@ __plugin_meta__ = PluginMetadata(
     },
 )
 
+# 命令前缀
+COMMAND_PREFIXES = ("typ ", "teq ", "typc ")
+
 class RenderFeature:
     """渲染功能"""
     def __init__(self, config: RenderConfig):
@@ -42,8 +49,11 @@ class RenderFeature:
         self.compiler = TypstCompiler(
             CompilerConfig(
                 timeout=config.timeout,
-                ppi=config.ppi
-            )
+                ppi=config.ppi,
+                max_pixels=config.max_pixels,
+                max_pages=config.max_pages
+            ),
+            name="render"
         )
         
         # 初始化模板管理器
@@ -97,7 +107,7 @@ $ {equation} $
         msg = msg.strip()
         
         # 解析命令和内容
-        if msg.startswith(("typ ", "teq ", "typc ")):
+        if msg.startswith(COMMAND_PREFIXES):
             parts = msg.split(maxsplit=1)
             if len(parts) != 2:
                 return None
@@ -120,8 +130,29 @@ $ {equation} $
         
         return None
 
-    async def render(self, request: RenderRequest) -> RenderResult:
-        """渲染内容"""
+    def should_paginate(self, request: RenderRequest) -> bool:
+        """判断是否分页渲染，仅typ的标记内容可以跨页排版"""
+        return (
+            request.template_type == "typ"
+            and self.config.paginate_threshold > 0
+            and len(request.content) > self.config.paginate_threshold
+        )
+
+    def should_preview(self, request: RenderRequest) -> bool:
+        """判断是否先发送低分辨率预览"""
+        return (
+            request.template_type == "typ"
+            and self.config.preview_threshold > 0
+            and len(request.content) > self.config.preview_threshold
+        )
+
+    async def render(self, request: RenderRequest, ppi: Optional[int] = None) -> RenderResult:
+        """渲染内容，各阶段耗时记录在 metadata["timings"]
+
+        Args:
+            ppi: 覆盖配置中的输出分辨率
+        """
+        timer = StageTimer()
         try:
             # 获取模板
             template = self.template_manager.get_template(request.template_type)
@@ -131,15 +162,22 @@ $ {equation} $
                     error=f"未找到模板: {request.template_type}"
                 )
             
+            # 超长的typ内容按固定页高分页，避免生成超高的单张图片
+            paginate = self.should_paginate(request)
+            code = request.content
+            if paginate:
+                code = f"#set page(height: {self.config.page_height})\n{code}"
+
             # 渲染模板
-            rendered_content = self.template_manager.render_template(
-                request.template_type,
-                {
-                    "code": request.content,
-                    "equation": request.content,
-                    "script": request.content
-                }
-            )
+            with timer.stage("template"):
+                rendered_content = await self.template_manager.render_template_async(
+                    request.template_type,
+                    {
+                        "code": code,
+                        "equation": request.content,
+                        "script": request.content
+                    }
+                )
             if not rendered_content:
                 return RenderResult(
                     success=False,
@@ -147,16 +185,24 @@ $ {equation} $
                 )
             
             # 编译文档
-            result = await self.compiler.compile(rendered_content)
+            result = await self.compiler.compile(rendered_content, paginate=paginate, ppi=ppi)
+            timer.merge(result.timings)
             if not result.success:
                 return RenderResult(
                     success=False,
-                    error=f"编译错误: {result.error}"
+                    error=result.error if result.unavailable else f"编译错误: {result.error}",
+                    metadata={"timings": timer.stages}
                 )
             
             return RenderResult(
                 success=True,
-                image_data=result.content
+                image_data=result.content,
+                pages=result.pages,
+                metadata={
+                    "timings": timer.stages,
+                    "degraded": result.degraded,
+                    "truncated": result.truncated
+                }
             )
             
         except Exception as e:
@@ -165,6 +211,36 @@ $ {equation} $
                 error=f"渲染失败: {str(e)}"
             )
 
+    async def render_with_preview(
+        self,
+        request: RenderRequest,
+        send_preview: Callable[[str], Awaitable[Optional[str]]]
+    ) -> Tuple[RenderResult, Optional[str]]:
+        """先发送低分辨率预览，再返回完整结果
+
+        完整图片与预览同时编译；完整图片在 preview_delay 秒内完成时不发送预览。
+
+        Args:
+            send_preview: 发送预览图片的回调，返回预览消息ID
+
+        Returns:
+            完整渲染结果和已发送预览的消息ID（未发送时为None）
+        """
+        full_task = asyncio.create_task(self.render(request))
+        preview_task = asyncio.create_task(self.render(request, ppi=self.config.preview_ppi))
+        try:
+            done, _ = await asyncio.wait({full_task}, timeout=self.config.preview_delay)
+            if done:
+                return full_task.result(), None
+
+            preview = await preview_task
+            preview_id = None
+            if preview.success and preview.image_data and not full_task.done():
+                preview_id = await send_preview(preview.image_data)
+            return await full_task, preview_id
+        finally:
+            preview_task.cancel()
+
 # 确保数据目录存在
 DATA_DIR = Path("src/plugins/typst_bot/data/render")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -175,13 +251,24 @@ from ..core.config import config_manager
 feature_config = config_manager.get_feature_config("render")
 config = RenderConfig(**feature_config)
 
-# 创建功能实例
-render_feature = RenderFeature(config)
+# 创建功能实例：模板目录在首次处理请求时才扫描
+render_feature: RenderFeature = LazyProxy(lambda: RenderFeature(config))
+
+# 请求计数
+_requests = {
+    status: requests_total.labels(FeatureType.RENDER.value, status)
+    for status in ("success", "error")
+}
+
+async def _is_render_request(event: MessageEvent) -> bool:
+    """只有以命令前缀开头的消息才交给处理器，其他消息不会触发功能初始化"""
+    return event.get_plaintext().lstrip().startswith(COMMAND_PREFIXES)
 
 # 消息处理器
-render_handler = on_message(priority=5)
+render_handler = on_message(rule=Rule(_is_render_request), priority=5)
 
 @render_handler.handle()
+@lifecycle.tracked
 async def handle_render(bot: Bot, event: MessageEvent):
     """处理渲染请求"""
     # 检查群组权限
@@ -190,16 +277,44 @@ async def handle_render(bot: Bot, event: MessageEvent):
             return
     
     # 解析消息
-    msg = event.get_plaintext()
-    request = render_feature.parse_message(msg)
+    timer = StageTimer()
+    with timer.stage("parse"):
+        msg = event.get_plaintext()
+        request = render_feature.parse_message(msg)
     if not request:
         return
+
+    # 限流：在启动编译进程之前拒绝
+    group_id = str(event.group_id) if isinstance(event, GroupMessageEvent) else None
+    decision = rate_limiter.check(FeatureType.RENDER.value, str(event.user_id), group_id)
+    if not decision.allowed:
+        if decision.notify:
+            await default_sender.send_message(bot, event, decision.message(), at_sender=True)
+        return
     
-    # 渲染内容
-    result = await render_feature.render(request)
+    # 渲染内容，耗时较长的文档先发送预览
+    preview_id = None
+    if render_feature.should_preview(request):
+        async def send_preview(image: str) -> Optional[str]:
+            sent = await default_sender.send_image(bot, event, image, "发送预览失败")
+            return sent.message_id
+
+        result, preview_id = await render_feature.render_with_preview(request, send_preview)
+    else:
+        result = await render_feature.render(request)
+    timer.merge(result.metadata.get("timings", {}))
+    _requests["success" if result.success else "error"].inc()
     
-    # 发送结果
-    if result.success and result.image_data:
+    # 发送结果，多页时打包为合并转发
+    send_started = timer.elapsed()
+    if result.success and len(result.pages) > 1:
+        await default_sender.send_forward_images(
+            bot,
+            event,
+            result.pages,
+            error_msg="发送渲染结果失败"
+        )
+    elif result.success and result.image_data:
         await default_sender.send_image(
             bot,
             event,
@@ -213,3 +328,18 @@ async def handle_render(bot: Bot, event: MessageEvent):
             result.error or "渲染失败",
             at_sender=True
         )
+
+    if result.success and result.metadata.get("truncated"):
+        await default_sender.send_message(
+            bot,
+            event,
+            f"内容过长，仅显示前 {len(result.pages)} 页",
+            at_sender=True
+        )
+
+    timer.add("send", timer.elapsed() - send_started)
+
+    # 完整结果发出后撤回预览
+    if preview_id:
+        await default_sender.recall_message(bot, preview_id)
+    timing_registry.observe("render", timer)
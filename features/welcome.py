@@ -1,17 +1,44 @@
 """Welcome feature for the Typst bot."""
 
-import aiohttp
+import asyncio
+import base64
+import hashlib
+import os
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from nonebot import on_notice, on_command
 from nonebot.plugin import PluginMetadata
 from nonebot.adapters.onebot.v11 import (
     Bot,
     GroupMessageEvent,
-    GroupIncreaseNoticeEvent
+    GroupIncreaseNoticeEvent,
+    GroupDecreaseNoticeEvent,
+    MessageSegment
 )
 
-from ..core import TypstCompiler, CompilerConfig, TemplateManager, default_sender
+from ..core import (
+    AvatarCache,
+    AvatarConfig,
+    TypstCompiler,
+    CompilerConfig,
+    TemplateManager,
+    CachedFetcher,
+    FetchConfig,
+    LRUCache,
+    TTLCache,
+    StageTimer,
+    close_session,
+    default_sender,
+    image_format,
+    lifecycle,
+    metrics,
+    rate_limiter,
+    png_dimensions,
+    requests_total,
+    timing_registry
+)
+from ..core.lazy import LazyProxy
 from ..models import WelcomeConfig, WelcomeContext, WelcomeResult, FeatureType
 from ..models.welcome import TemplateError, RenderError
 from .admin import admin_feature
@@ -31,6 +58,7 @@ __plugin_meta__ = PluginMetadata(
     - 支持群组自定义模板
     - 支持从URL加载模板
     - 支持自定义渲染参数
+    - 模板中可使用 {avatar}（多人模板为 {avatar_list}）引用新成员头像
     
     环境变量：
     WELCOME_TIMEOUT: 渲染超时时间（默认30秒）
@@ -45,6 +73,11 @@ __plugin_meta__ = PluginMetadata(
     },
 )
 
+# 群信息缓存命中统计
+_group_cache_requests = metrics.counter("cache_requests_total", "缓存查询次数", ("cache", "result"))
+_group_cache_hits = _group_cache_requests.labels("welcome_group_info", "hit")
+_group_cache_misses = _group_cache_requests.labels("welcome_group_info", "miss")
+
 class WelcomeFeature:
     """欢迎功能"""
     def __init__(self, config: WelcomeConfig):
@@ -54,14 +87,51 @@ class WelcomeFeature:
         self.compiler = TypstCompiler(
             CompilerConfig(
                 timeout=config.timeout,
-                ppi=config.ppi
-            )
+                ppi=config.ppi,
+                fallback_size=0  # 欢迎图片含成员数等变化内容，不会重复
+            ),
+            name="welcome"
         )
         
         # 初始化模板管理器
         self.template_manager = TemplateManager(config.template_dir)
         self._init_default_templates()
 
+        # 远程模板缓存
+        self.fetcher = CachedFetcher(
+            FetchConfig(
+                ttl=config.template_cache_ttl,
+                stale_ttl=config.template_stale_ttl,
+                cache_dir=config.template_cache_dir
+            )
+        )
+
+        # 正在收集的入群批次：群号 -> (新成员列表, 批次已满事件)
+        self._join_batches: Dict[int, Tuple[List[int], asyncio.Event]] = {}
+
+        # 新成员头像（仅在模板使用 {avatar}/{avatar_list} 时获取）
+        self.avatars = AvatarCache(
+            AvatarConfig(
+                url_template=config.avatar_url,
+                cache_dir=config.avatar_cache_dir,
+                ttl=config.avatar_ttl,
+                max_bytes=config.avatar_cache_max_bytes,
+                size=config.avatar_size
+            )
+        )
+
+        # 预渲染的背景图片：内容哈希 -> PNG数据
+        self._backgrounds: LRUCache[bytes] = LRUCache(maxsize=config.background_cache_size)
+        self._background_lock = asyncio.Lock()
+        if config.prerender_background:
+            Path(config.background_cache_dir).mkdir(parents=True, exist_ok=True)
+
+        # 群组信息缓存，入群/退群事件增量更新成员数
+        self.group_cache: TTLCache[dict] = TTLCache(
+            ttl=config.group_info_ttl,
+            maxsize=config.group_info_cache_size
+        )
+
     def _init_default_templates(self) -> None:
         """初始化默认模板"""
         default_template = """
@@ -94,37 +164,178 @@ class WelcomeFeature:
     async def _fetch_template(self, url: str) -> str:
         """从URL获取模板"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    raise TemplateError(f"获取模板失败: HTTP {response.status}")
+            return await self.fetcher.fetch(url)
         except Exception as e:
             raise TemplateError(f"获取模板失败: {e}")
 
-    async def _get_template(self, group_id: str) -> str:
-        """获取群组模板"""
+    async def _get_template(self, group_id: str, batch: bool = False) -> Tuple[str, bool]:
+        """获取群组模板
+
+        Returns:
+            模板内容，以及是否为多人模板。多人模板为本地的 `<模板名>_batch`，
+            不存在时退回单人模板。
+        """
         # 尝试从URL获取
         if group_id in self.config.template_urls:
             try:
-                return await self._fetch_template(str(self.config.template_urls[group_id]))
+                return await self._fetch_template(str(self.config.template_urls[group_id])), False
             except Exception as e:
                 print(f"从URL获取模板失败: {e}")
         
         # 使用本地模板
         template_name = self.config.group_templates.get(group_id, self.config.default_template)
+        if batch:
+            batch_template = self.template_manager.get_template(f"{template_name}_batch")
+            if batch_template:
+                return batch_template.content, True
+
         template = self.template_manager.get_template(template_name)
         if not template:
             raise TemplateError(f"模板不存在: {template_name}")
         
-        return template.content
+        return template.content, False
+
+    def _get_layers(self, group_id: str) -> Optional[Tuple[str, str]]:
+        """获取分层模板（静态背景层、动态文字层），未提供时返回None"""
+        if not self.config.prerender_background or group_id in self.config.template_urls:
+            return None
+
+        template_name = self.config.group_templates.get(group_id, self.config.default_template)
+        background = self.template_manager.get_template(f"{template_name}_background")
+        overlay = self.template_manager.get_template(f"{template_name}_overlay")
+        if background and overlay:
+            return background.content, overlay.content
+        return None
+
+    async def _get_background(self, content: str) -> bytes:
+        """获取预渲染的背景图片，按内容哈希缓存在内存和磁盘中
+
+        磁盘缓存按最近使用时间（文件修改时间）保留 background_cache_size 个，
+        模板修改后不再使用的旧背景会被淘汰。
+        """
+        key = hashlib.sha1(f"{self.config.ppi}:{content}".encode("utf-8")).hexdigest()
+        data = self._backgrounds.get(key)
+        if data is not None:
+            return data
+
+        async with self._background_lock:
+            data = self._backgrounds.get(key)
+            if data is not None:
+                return data
+
+            cache_file = Path(self.config.background_cache_dir) / f"{key}.png"
+            data = await asyncio.to_thread(self._read_background, cache_file)
+            if data is None:
+                result = await self.compiler.compile(content)
+                if not result.success:
+                    raise RenderError(f"背景渲染失败: {result.error}")
+                data = base64.b64decode(result.content)
+                await asyncio.to_thread(self._write_background, cache_file, data)
+
+            self._backgrounds.set(key, data)
+            return data
+
+    @staticmethod
+    def _read_background(path: Path) -> Optional[bytes]:
+        """读取磁盘上的背景并更新其使用时间"""
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write_background(self, path: Path, data: bytes) -> None:
+        """写入背景，并删除超出数量的最久未使用的背景"""
+        try:
+            path.write_bytes(data)
+            files = sorted(path.parent.glob("*.png"), key=lambda f: f.stat().st_mtime, reverse=True)
+            for old in files[self.config.background_cache_size:]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"写入背景缓存失败: {e}")
+
+    async def _avatar_assets(
+        self,
+        content: str,
+        user_ids: List[int]
+    ) -> Tuple[Dict[str, str], Dict[str, bytes]]:
+        """为使用头像的模板准备变量和图片文件"""
+        if "{avatar" not in content:
+            return {}, {}
+
+        avatars = await asyncio.gather(*(self.avatars.get(user_id) for user_id in user_ids))
+        assets = {
+            f"avatar-{user_id}.{image_format(data)}": data
+            for user_id, data in zip(user_ids, avatars)
+        }
+        names = list(assets)
+        variables = {
+            "avatar": names[0],
+            "avatar_list": "(" + "".join(f'"{name}",' for name in names) + ")"
+        }
+        return variables, assets
+
+    async def _render_layers(
+        self,
+        layers: Tuple[str, str],
+        context: WelcomeContext,
+        timer: StageTimer
+    ) -> str:
+        """将动态文字层叠加到预渲染背景上编译，返回base64编码的图片"""
+        background_template, overlay_template = layers
+        with timer.stage("background"):
+            background = await self._get_background(
+                await self.template_manager.render_content_async(
+                    background_template,
+                    {"group_id": context.group_id, "group_name": context.group_name}
+                )
+            )
+
+        width, height = png_dimensions(background)
+        with timer.stage("avatars"):
+            avatar_variables, assets = await self._avatar_assets(
+                overlay_template,
+                [int(context.user_id)]
+            )
+        variables = context.model_dump()
+        variables.update(
+            avatar_variables,
+            background="background.png",
+            background_width=f"{width * 72 / self.config.ppi}pt",
+            background_height=f"{height * 72 / self.config.ppi}pt"
+        )
+        assets["background.png"] = background
+        with timer.stage("template"):
+            rendered_content = await self.template_manager.render_content_async(overlay_template, variables)
+        result = await self.compiler.compile(rendered_content, assets=assets)
+        timer.merge(result.timings)
+        if not result.success:
+            raise RenderError(result.error or "编译失败")
+        return result.content
 
     async def _get_group_info(self, bot: Bot, group_id: int) -> dict:
-        """获取群组信息"""
+        """获取群组信息，优先使用缓存"""
+        cached = self.group_cache.get(group_id)
+        if cached is not None:
+            _group_cache_hits.inc()
+            return cached
+        _group_cache_misses.inc()
         try:
-            return await bot.get_group_info(group_id=group_id)
+            group_info = await bot.get_group_info(group_id=group_id)
         except Exception as e:
             raise RenderError(f"获取群组信息失败: {e}")
+        self.group_cache.set(group_id, group_info)
+        return group_info
+
+    def update_member_count(self, group_id: int, delta: int) -> None:
+        """根据入群/退群事件更新缓存中的成员数"""
+        cached = self.group_cache.get(group_id)
+        if cached is not None:
+            self.group_cache.update(group_id, {
+                **cached,
+                "member_count": max(cached.get("member_count", 0) + delta, 0)
+            })
 
     async def _get_member_info(self, bot: Bot, group_id: int, user_id: int) -> dict:
         """获取成员信息"""
@@ -136,6 +347,41 @@ class WelcomeFeature:
         except Exception as e:
             raise RenderError(f"获取成员信息失败: {e}")
 
+    async def collect_join(self, group_id: int, user_id: int) -> List[int]:
+        """收集短时间内的入群事件
+
+        每个群的第一个入群事件会等待 join_batch_window 秒（或直到批次已满），
+        然后返回这段时间内入群的所有成员；其余事件返回空列表，无需处理。
+        """
+        if self.config.join_batch_window <= 0:
+            return [user_id]
+
+        batch = self._join_batches.get(group_id)
+        if batch is not None:
+            user_ids, full = batch
+            user_ids.append(user_id)
+            if len(user_ids) >= self.config.join_batch_max:
+                # 批次已满，之后的入群事件开启新批次
+                del self._join_batches[group_id]
+                full.set()
+            return []
+
+        user_ids, full = [user_id], asyncio.Event()
+        self._join_batches[group_id] = (user_ids, full)
+        try:
+            await asyncio.wait_for(full.wait(), timeout=self.config.join_batch_window)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if self._join_batches.get(group_id, (None,))[0] is user_ids:
+                del self._join_batches[group_id]
+        return user_ids
+
+    @staticmethod
+    def _typst_string(value: str) -> str:
+        """转换为Typst字符串字面量"""
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
     async def generate_welcome(
         self,
         bot: Bot,
@@ -143,56 +389,93 @@ class WelcomeFeature:
         user_id: int
     ) -> WelcomeResult:
         """生成欢迎消息"""
+        return await self.generate_batch_welcome(bot, group_id, [user_id])
+
+    async def generate_batch_welcome(
+        self,
+        bot: Bot,
+        group_id: int,
+        user_ids: List[int]
+    ) -> WelcomeResult:
+        """为一批新成员生成一张欢迎图片，各阶段耗时记录在 metadata["timings"]"""
+        timer = StageTimer()
         try:
             # 获取群组和成员信息
-            group_info = await self._get_group_info(bot, group_id)
-            member_info = await self._get_member_info(bot, group_id, user_id)
+            with timer.stage("member_info"):
+                group_info, *member_infos = await asyncio.gather(
+                    self._get_group_info(bot, group_id),
+                    *(self._get_member_info(bot, group_id, user_id) for user_id in user_ids)
+                )
+            nicknames = [
+                info.get('nickname', str(user_id))
+                for user_id, info in zip(user_ids, member_infos)
+            ]
             
             # 准备上下文
             context = WelcomeContext(
                 group_id=str(group_id),
                 group_name=group_info['group_name'],
-                user_id=str(user_id),
-                nickname=member_info.get('nickname', str(user_id)),
+                user_id="、".join(str(user_id) for user_id in user_ids),
+                nickname="、".join(nicknames),
+                nickname_list="(" + "".join(f"{self._typst_string(n)}," for n in nicknames) + ")",
+                count=len(user_ids),
                 join_time=datetime.fromtimestamp(
-                    member_info.get('join_time', datetime.now().timestamp())
+                    member_infos[-1].get('join_time', datetime.now().timestamp())
                 ).strftime("%Y-%m-%d %H:%M:%S"),
                 member_count=group_info.get('member_count', 0)
             )
             
+            # 单人欢迎优先使用预渲染背景 + 文字层
+            layers = self._get_layers(str(group_id)) if len(user_ids) == 1 else None
+            if layers:
+                return WelcomeResult(
+                    success=True,
+                    image_data=await self._render_layers(layers, context, timer),
+                    metadata={"timings": timer.stages}
+                )
+
             # 获取并渲染模板
-            template_content = await self._get_template(str(group_id))
-            rendered_content = self.template_manager.render_template(
-                "default",  # 模板名不重要，因为我们直接传入内容
-                context.model_dump()
-            )
+            with timer.stage("template"):
+                template_content, _ = await self._get_template(str(group_id), batch=len(user_ids) > 1)
+            with timer.stage("avatars"):
+                avatar_variables, assets = await self._avatar_assets(template_content, user_ids)
+            with timer.stage("template"):
+                rendered_content = await self.template_manager.render_content_async(
+                    template_content,
+                    {**context.model_dump(), **avatar_variables}
+                )
             if not rendered_content:
                 raise TemplateError("模板渲染失败")
             
             # 编译文档
-            result = await self.compiler.compile(rendered_content)
+            result = await self.compiler.compile(rendered_content, assets=assets)
+            timer.merge(result.timings)
             if not result.success:
                 raise RenderError(result.error or "编译失败")
             
             return WelcomeResult(
                 success=True,
-                image_data=result.content
+                image_data=result.content,
+                metadata={"timings": timer.stages}
             )
             
         except TemplateError as e:
             return WelcomeResult(
                 success=False,
-                error=f"模板错误: {str(e)}"
+                error=f"模板错误: {str(e)}",
+                metadata={"timings": timer.stages}
             )
         except RenderError as e:
             return WelcomeResult(
                 success=False,
-                error=f"渲染错误: {str(e)}"
+                error=f"渲染错误: {str(e)}",
+                metadata={"timings": timer.stages}
             )
         except Exception as e:
             return WelcomeResult(
                 success=False,
-                error=f"生成欢迎消息失败: {str(e)}"
+                error=f"生成欢迎消息失败: {str(e)}",
+                metadata={"timings": timer.stages}
             )
 
 # 确保数据目录存在
@@ -205,49 +488,88 @@ from ..core.config import config_manager
 feature_config = config_manager.get_feature_config("welcome")
 config = WelcomeConfig(**feature_config)
 
-# 创建功能实例
-welcome_feature = WelcomeFeature(config)
+# 创建功能实例：模板、远程模板缓存和头像缓存在首次使用时才初始化
+welcome_feature: WelcomeFeature = LazyProxy(lambda: WelcomeFeature(config))
+
+# 请求计数
+_requests = {
+    status: requests_total.labels(FeatureType.WELCOME.value, status)
+    for status in ("success", "error")
+}
+
+# 关闭共享的HTTP会话
+lifecycle.on_shutdown(close_session)
 
 # 消息处理器
 welcome = on_notice()
 welcome_cmd = on_command("welcome")
 
 @welcome.handle()
+@lifecycle.tracked
 async def handle_group_increase(bot: Bot, event: GroupIncreaseNoticeEvent):
     """处理新成员入群事件"""
+    if welcome_feature.loaded:
+        welcome_feature.update_member_count(event.group_id, 1)
+
     # 检查功能是否启用
     if not admin_feature.is_feature_enabled(str(event.group_id), FeatureType.WELCOME):
         return
     
+    # 合并短时间内的入群事件，由批次中第一个事件统一发送
+    user_ids = await welcome_feature.collect_join(event.group_id, event.user_id)
+    if not user_ids:
+        return
+
     # 生成欢迎消息
-    result = await welcome_feature.generate_welcome(
+    timer = StageTimer()
+    result = await welcome_feature.generate_batch_welcome(
         bot,
         event.group_id,
-        event.user_id
+        user_ids
     )
+    timer.merge(result.metadata.get("timings", {}))
+    _requests["success" if result.success else "error"].inc()
     
     # 发送结果
-    if result.success and result.image_data:
-        await default_sender.send_image(
-            bot,
-            event,
-            result.image_data,
-            "发送欢迎消息失败"
-        )
-    else:
-        await default_sender.send_message(
-            bot,
-            event,
-            result.error or "生成欢迎消息失败"
-        )
+    with timer.stage("send"):
+        if result.success and result.image_data:
+            sent = await default_sender.send_group_message(
+                bot,
+                event.group_id,
+                MessageSegment.image(f"base64://{result.image_data}")
+            )
+            if not sent.success:
+                print(f"发送欢迎消息失败: {sent.error}")
+        else:
+            await default_sender.send_group_message(
+                bot,
+                event.group_id,
+                result.error or "生成欢迎消息失败"
+            )
+    timing_registry.observe("welcome", timer)
+
+@welcome.handle()
+async def handle_group_decrease(event: GroupDecreaseNoticeEvent):
+    """处理成员退群事件"""
+    # 尚未初始化时没有缓存的群信息，无需更新
+    if welcome_feature.loaded:
+        welcome_feature.update_member_count(event.group_id, -1)
 
 @welcome_cmd.handle()
+@lifecycle.tracked
 async def handle_welcome_command(bot: Bot, event: GroupMessageEvent):
     """处理欢迎命令"""
     # 检查功能是否启用
     if not admin_feature.is_feature_enabled(str(event.group_id), FeatureType.WELCOME):
         await welcome_cmd.finish("该群未启用欢迎功能")
         return
+
+    # 限流：在获取成员信息和编译之前拒绝
+    decision = rate_limiter.check(FeatureType.WELCOME.value, str(event.user_id), str(event.group_id))
+    if not decision.allowed:
+        if decision.notify:
+            await default_sender.send_message(bot, event, decision.message(), at_sender=True)
+        return
     
     # 确定目标用户
     target_user_id = event.user_id
@@ -1,15 +1,20 @@
 """Yau feature for the Typst bot."""
 
-import opencc
+import asyncio
+import re
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from nonebot import on_message
 from nonebot.plugin import PluginMetadata
 from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageEvent
+from nonebot.rule import Rule
 
-from ..core import TypstCompiler, CompilerConfig, TemplateManager, default_sender
+from ..core import TypstCompiler, CompilerConfig, TemplateManager, LRUCache, StageTimer, default_sender, lifecycle, metrics, rate_limiter, requests_total, timing_registry
+from ..core.executor import default_executor
+from ..core.lazy import LazyProxy
 from ..models import YauBotConfig, YauBotRequest, YauBotResult, FeatureType
-from ..models.yau import TemplateError, ConversionError, RenderError
+from ..models.yau import YauMessage, TemplateError, ConversionError, RenderError
 from .admin import admin_feature
 
 # 插件元数据
@@ -22,6 +27,11 @@ __plugin_meta__ = PluginMetadata(
     
     示例：
     yau 你好世界
+
+    多行输入时每行生成一条对话气泡，可用“发言人：”前缀指定发言人，
+    默认发言人显示在左侧，其他发言人显示在右侧：
+    yau 你们国内的学生
+    学生：老师好
     
     配置说明：
     - 支持自定义模板
@@ -42,6 +52,138 @@ __plugin_meta__ = PluginMetadata(
     },
 )
 
+# 切分点：标点和换行之后
+SEGMENT_PATTERN = re.compile(r"(?<=[，。！？；：、,.!?;:\n])")
+
+# 以下关键字开头的代码表达式延续到行尾
+CODE_LINE_KEYWORDS = frozenset({"let", "set", "show", "import", "include", "if", "for", "while", "context"})
+
+BRACKET_PAIRS = {")": "(", "]": "[", "}": "{"}
+RAW_PATTERN = re.compile(r"`+")
+# #表达式开头：标识符及其字段访问，或直接跟括号
+CODE_PATTERN = re.compile(r"#(?:([A-Za-z_][\w-]*)(?:\.[A-Za-z_][\w-]*)*|(?=[(\[{]))")
+# 标签和引用
+REFERENCE_PATTERN = re.compile(r"<[\w:.-]+>|@[\w:.-]+")
+# 汉字、假名和谚文
+CJK_PATTERN = re.compile(r"[\u1100-\u11ff\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\U00020000-\U0003ffff]")
+
+# 行中切开后会在新气泡开头变成标题或列表的内容
+BLOCK_MARKER_PATTERN = re.compile(r"[ \t]*(?:[-+=/]|\d+\.)[ \t]")
+
+# 形似“发言人：”的行首，但实为网址、盘符路径或时间
+NON_SPEAKER_PATTERN = re.compile(r"^(?:[A-Za-z][A-Za-z0-9+.-]*://|[A-Za-z]:[\\/]|\d+[:：]\d)")
+
+# 常用作正文标签而非发言人的词
+NON_SPEAKER_LABELS = frozenset({
+    "注意", "注", "例如", "比如", "例", "提示", "说明", "备注", "补充", "原因",
+    "结论", "总结", "答案", "问题", "解答", "原文", "译文", "来源", "链接", "地址",
+    "note", "ps", "tip", "eg", "e.g", "example", "q", "a",
+})
+
+# 命令前缀
+COMMAND_PREFIX = "yau "
+
+# 工作池中按配置名复用的转换器（进程池中每个进程各自持有一份）
+_worker_converters: Dict[str, Any] = {}
+
+def convert_chinese(opencc_config: str, segments: List[str]) -> List[str]:
+    """在工作池中执行的OpenCC转换，逐段转换后按原顺序返回，参数均可被pickle"""
+    converter = _worker_converters.get(opencc_config)
+    if converter is None:
+        import opencc
+        converter = _worker_converters.setdefault(opencc_config, opencc.OpenCC(opencc_config))
+    return [converter.convert(segment) for segment in segments]
+
+def _is_word_char(char: str) -> bool:
+    """与Typst一致：字母和数字组成单词，但汉字、假名和谚文不算"""
+    return char.isalnum() and not CJK_PATTERN.match(char)
+
+def markup_breaks(text: str) -> List[bool]:
+    """标记Typst标记文本中可以切分的位置
+
+    返回长度为 len(text)+1 的列表，第i项表示在 text[i] 之前切开后两段仍是完整的
+    标记：不在括号、数学公式、代码、原始文本、注释、加粗或强调之中，也不会拆开
+    #函数调用、标签、引用和转义字符。无法确定的位置一律视为不可切分。
+    """
+    n = len(text)
+    safe = [True] * (n + 1)
+    stack: List[str] = []   # 未闭合的括号，圆括号和花括号只在代码中计入
+    math = strong = emph = code_line = False
+    call_end = -1           # 此处紧跟的括号为函数调用参数
+    i = 0
+    while i < n:
+        start = i
+        char = text[i]
+        code = bool(stack) and stack[-1] != "["
+        if char == "\\":
+            i += 2
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif text.startswith("//", i) and (code or i == 0 or text[i - 1] != ":"):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        elif char == '"' and code:
+            i += 1
+            while i < n and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+            i += 1
+        elif code:
+            if char in "([{":
+                stack.append(char)
+            elif char in ")]}" and stack[-1] == BRACKET_PAIRS[char]:
+                stack.pop()
+            i += 1
+        elif char == "`":
+            run = RAW_PATTERN.match(text, i).end() - i
+            end = text.find("`" * run, i + run)
+            i = n if end < 0 else end + run
+        elif char == "$":
+            math = not math
+            i += 1
+        elif math:
+            i += 1
+        elif char == "[" or (char in "({" and i == call_end):
+            stack.append(char)
+            i += 1
+        elif char == "]" and stack and stack[-1] == "[":
+            stack.pop()
+            i += 1
+            call_end = i
+        elif char == "#" and (match := CODE_PATTERN.match(text, i)):
+            i = match.end()
+            call_end = i
+            code_line = code_line or match.group(1) in CODE_LINE_KEYWORDS
+        elif char in "<@" and (match := REFERENCE_PATTERN.match(text, i)):
+            i = match.end()
+        elif char in "*_" and not stack and not (
+            0 < i < n - 1 and _is_word_char(text[i - 1]) and _is_word_char(text[i + 1])
+        ):
+            # 单词内部的 * 和 _ 是普通字符，汉字和假名除外
+            if char == "*":
+                strong = not strong
+            else:
+                emph = not emph
+            i += 1
+        else:
+            i += 1
+        if char == ")" and code and not (stack and stack[-1] != "["):
+            call_end = i
+        if char == "\n" and not stack:
+            code_line = False
+        # 跳过的多字符结构内部不可切分
+        for j in range(start + 1, min(i, n)):
+            safe[j] = False
+        if i < n and (stack or math or strong or emph or code_line):
+            safe[i] = False
+    for j in range(1, n):
+        # 不拆开紧跟的调用参数，也不在行中切出标题或列表
+        if text[j] in "([{." and not text[j - 1].isspace():
+            safe[j] = False
+        elif text[j - 1] != "\n" and BLOCK_MARKER_PATTERN.match(text, j):
+            safe[j] = False
+    return safe
+
 class YauFeature:
     """YauBot功能"""
     def __init__(self, config: YauBotConfig):
@@ -51,8 +193,10 @@ class YauFeature:
         self.compiler = TypstCompiler(
             CompilerConfig(
                 timeout=config.timeout,
-                ppi=config.ppi
-            )
+                ppi=config.ppi,
+                max_pixels=config.max_pixels
+            ),
+            name="yau"
         )
         
         # 初始化模板管理器
@@ -61,10 +205,20 @@ class YauFeature:
         
         # 初始化OpenCC转换器
         try:
+            import opencc
             self.converter = opencc.OpenCC(config.opencc_config)
         except Exception as e:
             raise ConversionError(f"初始化OpenCC失败: {e}")
 
+        # 多行对话中的“发言人：”前缀
+        self._speaker_pattern = re.compile(
+            rf"^([^:：\s][^:：]{{0,{config.speaker_max_length - 1}}})[:：]\s*(\S.*)$"
+        )
+
+        # 转换结果缓存：整句与按标点切分的片段
+        self._text_cache: LRUCache[str] = LRUCache(config.text_cache_size)
+        self._segment_cache: LRUCache[str] = LRUCache(config.segment_cache_size)
+
     def _init_default_templates(self) -> None:
         """初始化默认模板"""
         default_template = """
@@ -92,81 +246,282 @@ class YauFeature:
                 "YauBot默认模板"
             )
 
+    def _convert_segment(self, segment: str) -> str:
+        """转换单个片段，命中缓存时跳过OpenCC"""
+        converted = self._segment_cache.get(segment)
+        if converted is None:
+            converted = self.converter.convert(segment)
+            self._segment_cache.set(segment, converted)
+        return converted
+
     def _convert_text(self, text: str) -> str:
-        """转换文本为香港繁体中文"""
+        """转换文本为香港繁体中文
+
+        OpenCC的词组匹配不会跨越标点，因此长文本按标点切分后逐段转换，
+        重复出现的片段可以直接复用缓存。
+        """
+        text = text.strip()
+        converted = self._text_cache.get(text)
+        if converted is not None:
+            return converted
+
         try:
-            return self.converter.convert(text.strip())
+            if len(text) <= self.config.segment_min_length:
+                converted = self.converter.convert(text)
+            else:
+                converted = "".join(
+                    self._convert_segment(segment)
+                    for segment in SEGMENT_PATTERN.split(text)
+                    if segment
+                )
         except Exception as e:
             raise ConversionError(f"文本转换失败: {e}")
 
-    @staticmethod
-    def parse_message(msg: str) -> YauBotRequest | None:
-        """解析消息内容"""
+        self._text_cache.set(text, converted)
+        return converted
+
+    async def convert_text(self, text: str) -> str:
+        """转换文本，长文本中未命中缓存的片段提交到工作池以免阻塞事件循环"""
+        text = text.strip()
+        if not default_executor.offloads(len(text)):
+            return self._convert_text(text)
+
+        converted = self._text_cache.get(text)
+        if converted is not None:
+            return converted
+
+        segments = [segment for segment in SEGMENT_PATTERN.split(text) if segment]
+        results = {segment: self._segment_cache.get(segment) for segment in dict.fromkeys(segments)}
+        misses = [segment for segment, result in results.items() if result is None]
+        if misses:
+            size = sum(map(len, misses))
+            try:
+                if default_executor.offloads(size):
+                    converted_misses = await default_executor.run(
+                        convert_chinese,
+                        self.config.opencc_config,
+                        misses,
+                        size=size
+                    )
+                else:
+                    converted_misses = [self.converter.convert(segment) for segment in misses]
+            except Exception as e:
+                raise ConversionError(f"文本转换失败: {e}")
+            for segment, result in zip(misses, converted_misses):
+                self._segment_cache.set(segment, result)
+                results[segment] = result
+
+        converted = "".join(results[segment] for segment in segments)
+        self._text_cache.set(text, converted)
+        return converted
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """转换缓存统计"""
+        return {
+            "text": self._text_cache.stats(),
+            "segment": self._segment_cache.stats(),
+        }
+
+    def parse_message(self, msg: str) -> YauBotRequest | None:
+        """解析消息内容
+
+        多行输入时每个非空行为一条气泡，行首可用“发言人：”指定发言人；
+        网址、路径、时间以及“注意：”“例如：”等常见标签不视为发言人。
+        单行输入保持原样，不解析发言人前缀。
+        """
         msg = msg.strip()
         
-        if msg.startswith("yau "):
-            content = msg[4:].strip()
+        if msg.startswith(COMMAND_PREFIX):
+            content = msg[len(COMMAND_PREFIX):].strip()
             if not content:
                 return None
+
+            lines = [line.strip() for line in content.splitlines() if line.strip()]
+            messages = []
+            if len(lines) > 1:
+                for line in lines:
+                    prefix = self._split_speaker(line)
+                    if prefix:
+                        messages.append(YauMessage(speaker=prefix[0], content=prefix[1]))
+                    else:
+                        messages.append(YauMessage(content=line))
             
             return YauBotRequest(
                 content=content,
+                messages=messages,
                 timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             )
         
         return None
 
+    def _split_speaker(self, line: str) -> Optional[Tuple[str, str]]:
+        """拆分行首的“发言人：”前缀，不像发言人时返回None"""
+        if NON_SPEAKER_PATTERN.match(line):
+            return None
+        match = self._speaker_pattern.match(line)
+        if match is None:
+            return None
+        speaker = match.group(1).strip()
+        if speaker.lower() in NON_SPEAKER_LABELS:
+            return None
+        return speaker, match.group(2)
+
+    @staticmethod
+    def _typst_string(value: str) -> str:
+        """转换为Typst字符串字面量"""
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    def _render_messages(self, messages: List[YauMessage], texts: List[str]) -> str:
+        """生成对话气泡的Typst代码，默认发言人在左侧，其他发言人在右侧"""
+        bubbles = []
+        for message, text in zip(messages, texts):
+            speaker = message.speaker or self.config.default_speaker
+            side = "left" if speaker == self.config.default_speaker else "right"
+            bubbles.append(
+                f"  oc.message({side}, name: [#{self._typst_string(speaker)}], profile: default-profile)[\n"
+                f"    {text}\n"
+                f"  ],"
+            )
+        return "\n".join(bubbles)
+
+    def _split_text(self, text: str) -> List[str]:
+        """将超过单页字数的文本切分为多段
+
+        优先在标点和换行之后切分，没有合适的标点时在任意位置切分，但都只切在
+        markup_breaks 允许的位置；找不到时该段超出单页字数，以保证每段都是完整的标记。
+        """
+        limit = self.config.page_chars
+        if len(text) <= limit:
+            return [text]
+
+        safe = markup_breaks(text)
+        punctuation = {match.start() for match in SEGMENT_PATTERN.finditer(text)}
+        chunks, start = [], 0
+        while len(text) - start > limit:
+            window = range(start + limit, start, -1)
+            end = (
+                next((i for i in window if i in punctuation and safe[i]), None)
+                or next((i for i in window if safe[i]), None)
+                or next(i for i in range(start + limit + 1, len(text) + 1) if safe[i])
+            )
+            chunks.append(text[start:end])
+            start = end
+        if start < len(text):
+            chunks.append(text[start:])
+        return chunks
+
+    def _paginate(
+        self,
+        messages: List[YauMessage],
+        texts: List[str]
+    ) -> List[Tuple[List[YauMessage], List[str]]]:
+        """按每页字数将气泡分页，过长的气泡拆分为同一发言人的多条气泡"""
+        pages: List[Tuple[List[YauMessage], List[str]]] = []
+        page_messages: List[YauMessage] = []
+        page_texts: List[str] = []
+        size = 0
+        for message, text in zip(messages, texts):
+            for chunk in self._split_text(text):
+                if page_texts and size + len(chunk) > self.config.page_chars:
+                    pages.append((page_messages, page_texts))
+                    page_messages, page_texts, size = [], [], 0
+                page_messages.append(message)
+                page_texts.append(chunk)
+                size += len(chunk)
+        if page_texts:
+            pages.append((page_messages, page_texts))
+        return pages
+
+    async def _render_page(
+        self,
+        messages: List[YauMessage],
+        texts: List[str],
+        timestamp: str,
+        timer: StageTimer
+    ) -> str:
+        """渲染并编译一页对话，返回base64编码的图片"""
+        with timer.stage("template"):
+            rendered_content = await self.template_manager.render_template_async(
+                self.config.template_name,
+                {
+                    "messages": self._render_messages(messages, texts),
+                    "text": "\n\n".join(texts),
+                    "datetime_now": timestamp
+                }
+            )
+        if not rendered_content:
+            raise TemplateError("模板渲染失败")
+
+        result = await self.compiler.compile(rendered_content)
+        timer.merge(result.timings)
+        if not result.success:
+            raise RenderError(result.error or "编译失败")
+        return result.content
+
     async def process(self, request: YauBotRequest) -> YauBotResult:
-        """处理YauBot请求"""
+        """处理YauBot请求，各阶段耗时记录在 metadata["timings"]
+
+        多页并行编译时，编译各阶段的耗时为各页之和。
+        """
+        timer = StageTimer()
         try:
-            # 转换文本
-            converted_text = self._convert_text(request.content)
+            # 转换文本，每条气泡分别转换以复用缓存
+            messages = request.messages or [YauMessage(content=request.content)]
+            if len(messages) > self.config.max_messages:
+                return YauBotResult(
+                    success=False,
+                    error=f"对话最多 {self.config.max_messages} 条"
+                )
+            with timer.stage("convert"):
+                texts = [await self.convert_text(message.content) for message in messages]
             
             # 获取模板
             template = self.template_manager.get_template(self.config.template_name)
             if not template:
                 raise TemplateError(f"未找到模板: {self.config.template_name}")
-            
-            # 渲染模板
-            rendered_content = self.template_manager.render_template(
-                self.config.template_name,
-                {
-                    "text": converted_text,
-                    "datetime_now": request.timestamp
-                }
-            )
-            if not rendered_content:
-                raise TemplateError("模板渲染失败")
-            
-            # 编译文档
-            result = await self.compiler.compile(rendered_content)
-            if not result.success:
-                raise RenderError(result.error or "编译失败")
+
+            # 超长内容按字数分页，各页并行编译
+            pages = self._paginate(messages, texts)
+            if len(pages) > self.config.max_pages:
+                return YauBotResult(
+                    success=False,
+                    error=f"内容过长，最多 {self.config.max_pages} 页"
+                )
+            images = await asyncio.gather(*(
+                self._render_page(page_messages, page_texts, request.timestamp, timer)
+                for page_messages, page_texts in pages
+            ))
             
             return YauBotResult(
                 success=True,
-                image_data=result.content
+                image_data=images[0],
+                pages=list(images) if len(images) > 1 else [],
+                metadata={"timings": timer.stages}
             )
             
         except TemplateError as e:
             return YauBotResult(
                 success=False,
-                error=f"模板错误: {str(e)}"
+                error=f"模板错误: {str(e)}",
+                metadata={"timings": timer.stages}
             )
         except ConversionError as e:
             return YauBotResult(
                 success=False,
-                error=f"转换错误: {str(e)}"
+                error=f"转换错误: {str(e)}",
+                metadata={"timings": timer.stages}
             )
         except RenderError as e:
             return YauBotResult(
                 success=False,
-                error=f"渲染错误: {str(e)}"
+                error=f"渲染错误: {str(e)}",
+                metadata={"timings": timer.stages}
             )
         except Exception as e:
             return YauBotResult(
                 success=False,
-                error=f"处理失败: {str(e)}"
+                error=f"处理失败: {str(e)}",
+                metadata={"timings": timer.stages}
             )
 
 # 确保数据目录存在
@@ -179,13 +534,40 @@ from ..core.config import config_manager
 feature_config = config_manager.get_feature_config("yau")
 config = YauBotConfig(**feature_config)
 
-# 创建功能实例
-yau_feature = YauFeature(config)
+# 创建功能实例：模板和OpenCC词典在首次处理请求时才加载
+yau_feature: YauFeature = LazyProxy(lambda: YauFeature(config))
+
+# 请求计数与转换缓存状态
+_requests = {
+    status: requests_total.labels(FeatureType.YAU.value, status)
+    for status in ("success", "error")
+}
+metrics.gauge(
+    "cache_entries",
+    "缓存条目数",
+    ("cache",),
+    collect=lambda: {
+        (f"yau_{name}",): stats["size"] for name, stats in yau_feature.cache_stats().items()
+    } if yau_feature.loaded else {}
+)
+metrics.gauge(
+    "cache_hit_rate",
+    "缓存命中率",
+    ("cache",),
+    collect=lambda: {
+        (f"yau_{name}",): stats["hit_rate"] for name, stats in yau_feature.cache_stats().items()
+    } if yau_feature.loaded else {}
+)
+
+async def _is_yau_request(event: MessageEvent) -> bool:
+    """只有以命令前缀开头的消息才交给处理器，其他消息不会触发功能初始化"""
+    return event.get_plaintext().lstrip().startswith(COMMAND_PREFIX)
 
 # 消息处理器
-yaubot = on_message(priority=5)
+yaubot = on_message(rule=Rule(_is_yau_request), priority=5)
 
 @yaubot.handle()
+@lifecycle.tracked
 async def handle_yaubot(bot: Bot, event: MessageEvent):
     """处理YauBot请求"""
     # 检查群组权限
@@ -194,16 +576,36 @@ async def handle_yaubot(bot: Bot, event: MessageEvent):
             return
     
     # 解析消息
-    msg = event.get_plaintext()
-    request = yau_feature.parse_message(msg)
+    timer = StageTimer()
+    with timer.stage("parse"):
+        msg = event.get_plaintext()
+        request = yau_feature.parse_message(msg)
     if not request:
         return
+
+    # 限流：在转换和编译之前拒绝
+    group_id = str(event.group_id) if isinstance(event, GroupMessageEvent) else None
+    decision = rate_limiter.check(FeatureType.YAU.value, str(event.user_id), group_id)
+    if not decision.allowed:
+        if decision.notify:
+            await default_sender.send_message(bot, event, decision.message(), at_sender=True)
+        return
     
     # 处理请求
     result = await yau_feature.process(request)
+    timer.merge(result.metadata.get("timings", {}))
+    _requests["success" if result.success else "error"].inc()
     
-    # 发送结果
-    if result.success and result.image_data:
+    # 发送结果，多页时打包为合并转发
+    send_started = timer.elapsed()
+    if result.success and result.pages:
+        await default_sender.send_forward_images(
+            bot,
+            event,
+            result.pages,
+            error_msg="发送结果失败"
+        )
+    elif result.success and result.image_data:
         await default_sender.send_image(
             bot,
             event,
@@ -217,3 +619,5 @@ async def handle_yaubot(bot: Bot, event: MessageEvent):
             result.error or "处理失败",
             at_sender=True
         )
+    timer.add("send", timer.elapsed() - send_started)
+    timing_registry.observe("yau", timer)
@@ -1,7 +1,8 @@
 """Daily summary feature models."""
 
 from datetime import datetime
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Literal, Optional
 from pydantic import Field, HttpUrl, SecretStr
 
 from .common import BaseModel, BaseConfig, BaseResult
@@ -52,10 +53,103 @@ class DailySummaryConfig(BaseConfig):
         default="24h",
         description="备份间隔"
     )
+    flush_size: int = Field(
+        default=50,
+        gt=0,
+        description="缓冲达到该消息数时立即写入数据库"
+    )
+    flush_interval: int = Field(
+        default=5,
+        gt=0,
+        description="消息缓冲定时写入间隔（秒）"
+    )
+    search_limit: int = Field(
+        default=10,
+        gt=0,
+        description="搜索命令返回的最大结果数"
+    )
+    backup_dir: str = Field(
+        default="data/daily_summary/backups",
+        description="备份目录"
+    )
+    backup_keep: int = Field(
+        default=7,
+        ge=1,
+        description="保留的备份份数"
+    )
+    retention_days: int = Field(
+        default=0,
+        ge=0,
+        description="消息保留天数（0为永久保留）；设置后会删除更早的历史消息，请先确认备份"
+    )
+    purge_batch_size: int = Field(
+        default=5000,
+        gt=0,
+        description="清理过期消息时每批删除的行数"
+    )
+    vacuum_pages: int = Field(
+        default=2000,
+        gt=0,
+        description="每次增量VACUUM回收的最大页数"
+    )
+    render_image: bool = Field(
+        default=False,
+        description="是否将总结渲染为图片发送"
+    )
+    image_template: str = Field(
+        default="summary",
+        description="总结图片模板名称"
+    )
+    image_template_dir: Path = Field(
+        default=Path("src/plugins/typst_bot/data/daily_summary/templates"),
+        description="总结图片模板目录"
+    )
+    image_timeout: int = Field(
+        default=60,
+        description="图片渲染超时时间（秒）"
+    )
+    image_ppi: int = Field(
+        default=200,
+        description="总结图片DPI"
+    )
+    prompt_format: Literal["compact", "json"] = Field(
+        default="compact",
+        description="聊天记录提示词格式"
+    )
+    min_messages: int = Field(
+        default=1,
+        ge=1,
+        description="生成定时总结所需的最少消息数（默认有消息即总结，调大可跳过冷清的群组）"
+    )
+    max_groups: int = Field(
+        default=0,
+        ge=0,
+        description="单次定时任务最多总结的群组数（0为不限制）"
+    )
+    context_days: int = Field(
+        default=0,
+        ge=0,
+        description="生成总结时从过去多少天检索相关讨论作为背景（0为不检索）"
+    )
+    context_terms: int = Field(
+        default=8,
+        gt=0,
+        description="检索往日讨论时使用的今日关键词数"
+    )
+    context_limit: int = Field(
+        default=20,
+        gt=0,
+        description="作为背景的往日消息条数上限"
+    )
+    stats_fallback: bool = Field(
+        default=True,
+        description="语言模型不可用时改为发送仅含消息统计的总结"
+    )
 
 class SummaryResult(BaseResult):
     """总结生成结果"""
     content: Optional[str] = None  # 总结内容
+    image_data: Optional[str] = None  # base64编码的总结图片
     group_id: Optional[str] = None  # 群组ID
     date: Optional[str] = None  # 总结日期
 
@@ -1,6 +1,6 @@
 """Render feature models."""
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from pydantic import Field
 
@@ -28,6 +28,35 @@ class RenderConfig(BaseConfig):
         default=300,
         description="输出图片DPI"
     )
+    paginate_threshold: int = Field(
+        default=3000,
+        description="typ内容超过该长度时按固定页高分页渲染，0表示不分页"
+    )
+    page_height: str = Field(
+        default="20cm",
+        description="分页渲染时的页高"
+    )
+    max_pages: int = Field(
+        default=10,
+        gt=0,
+        description="分页渲染时最多输出的页数"
+    )
+    max_pixels: int = Field(
+        default=40_000_000,
+        description="单张图片像素上限，0表示不限制"
+    )
+    preview_threshold: int = Field(
+        default=1000,
+        description="typ内容超过该长度时先发送低分辨率预览，0表示不预览"
+    )
+    preview_delay: float = Field(
+        default=1.5,
+        description="完整图片在该时间（秒）内完成时不发送预览"
+    )
+    preview_ppi: int = Field(
+        default=72,
+        description="预览图片DPI"
+    )
 
 class RenderRequest(BaseModel):
     """渲染请求"""
@@ -38,6 +67,7 @@ class RenderRequest(BaseModel):
 class RenderResult(BaseResult):
     """渲染结果"""
     image_data: Optional[str] = None  # base64编码的图片数据
+    pages: List[str] = []             # 分页渲染时每页的图片数据
 
 class RenderError(Exception):
     """渲染错误基类"""
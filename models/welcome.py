@@ -24,6 +24,68 @@ class WelcomeConfig(BaseConfig):
         default_factory=dict,
         description="模板URL配置"
     )
+    template_cache_ttl: int = Field(
+        default=600,
+        description="远程模板缓存有效期（秒）"
+    )
+    template_stale_ttl: int = Field(
+        default=86400,
+        description="远程模板过期后仍可先使用旧内容的时长（秒）"
+    )
+    template_cache_dir: Path = Field(
+        default=Path("src/plugins/typst_bot/data/welcome/cache"),
+        description="远程模板磁盘缓存目录"
+    )
+    group_info_ttl: int = Field(
+        default=3600,
+        description="群组信息缓存有效期（秒）"
+    )
+    group_info_cache_size: int = Field(
+        default=1024,
+        description="群组信息缓存容量"
+    )
+    prerender_background: bool = Field(
+        default=True,
+        description="存在 <模板>_background 与 <模板>_overlay 时，预渲染背景并只编译文字层"
+    )
+    background_cache_dir: Path = Field(
+        default=Path("src/plugins/typst_bot/data/welcome/backgrounds"),
+        description="预渲染背景缓存目录"
+    )
+    background_cache_size: int = Field(
+        default=16,
+        gt=0,
+        description="保留的预渲染背景数，超出时删除最久未使用的（模板修改后旧背景随之淘汰）"
+    )
+    avatar_url: str = Field(
+        default="https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=640",
+        description="头像地址模板"
+    )
+    avatar_cache_dir: Path = Field(
+        default=Path("src/plugins/typst_bot/data/welcome/avatars"),
+        description="头像缓存目录"
+    )
+    avatar_ttl: int = Field(
+        default=86400,
+        description="头像缓存有效期（秒）"
+    )
+    avatar_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="头像缓存容量上限（字节）"
+    )
+    avatar_size: int = Field(
+        default=160,
+        description="头像缩放后的边长（像素）"
+    )
+    join_batch_window: float = Field(
+        default=3.0,
+        description="合并入群事件的等待窗口（秒，0为不合并）"
+    )
+    join_batch_max: int = Field(
+        default=10,
+        gt=0,
+        description="单张欢迎图片最多包含的新成员数"
+    )
     timeout: int = Field(
         default=30,
         description="渲染超时时间（秒）"
@@ -41,6 +103,8 @@ class WelcomeContext(BaseModel):
     nickname: str
     join_time: str
     member_count: int
+    nickname_list: str = "()"  # Typst数组字面量，供多人模板使用
+    count: int = 1
 
 class WelcomeResult(BaseResult):
     """欢迎消息生成结果"""
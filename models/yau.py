@@ -1,6 +1,6 @@
 """Yau feature models."""
 
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 from pydantic import Field
 
@@ -28,10 +28,60 @@ class YauBotConfig(BaseConfig):
         default="s2hk",
         description="OpenCC转换配置"
     )
+    text_cache_size: int = Field(
+        default=1024,
+        gt=0,
+        description="整句转换结果缓存容量"
+    )
+    segment_cache_size: int = Field(
+        default=8192,
+        gt=0,
+        description="片段转换结果缓存容量"
+    )
+    segment_min_length: int = Field(
+        default=64,
+        description="超过该长度的文本按标点切分后逐段转换"
+    )
+    default_speaker: str = Field(
+        default="丘成桐（囯內）",
+        description="未指定发言人时的默认发言人，显示在左侧"
+    )
+    max_messages: int = Field(
+        default=20,
+        gt=0,
+        description="单次对话最多的气泡数"
+    )
+    speaker_max_length: int = Field(
+        default=16,
+        description="发言人前缀的最大长度，超过时整行视为正文"
+    )
+    page_chars: int = Field(
+        default=800,
+        gt=0,
+        description="每页图片的最大字数，超过时分页渲染"
+    )
+    max_pages: int = Field(
+        default=10,
+        gt=0,
+        description="分页渲染时最多输出的页数"
+    )
+    max_pixels: int = Field(
+        default=40_000_000,
+        description="单张图片像素上限，0表示不限制"
+    )
+
+class YauMessage(BaseModel):
+    """对话中的一条气泡"""
+    content: str
+    speaker: Optional[str] = None  # 为空时使用默认发言人
 
 class YauBotRequest(BaseModel):
     """YauBot请求"""
     content: str
+    messages: List[YauMessage] = Field(
+        default_factory=list,
+        description="按行拆分的对话气泡，为空时整段内容作为一条气泡"
+    )
     timestamp: str = Field(
         default_factory=lambda: "",
         description="处理时间"
@@ -40,6 +90,7 @@ class YauBotRequest(BaseModel):
 class YauBotResult(BaseResult):
     """YauBot处理结果"""
     image_data: Optional[str] = None  # base64编码的图片数据
+    pages: List[str] = []             # 分页渲染时每页的图片数据
 
 class YauBotError(Exception):
     """YauBot错误基类"""
@@ -0,0 +1,57 @@
+"""Local aiohttp stub server for tests that exercise HTTP fetching."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+
+from aiohttp import web
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+class StubServer:
+    """本地HTTP桩服务，记录收到的请求"""
+    def __init__(self, routes: Dict[str, Handler]):
+        self.routes = routes
+        self.requests: List[web.Request] = []
+        self.base_url = ""
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def count(self, path: str) -> int:
+        return sum(request.path == path for request in self.requests)
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(request)
+        handler = self.routes.get(request.path)
+        if handler is None:
+            return web.Response(status=404)
+        return await handler(request)
+
+@asynccontextmanager
+async def serve(routes: Dict[str, Handler]) -> AsyncIterator[StubServer]:
+    """在随机端口启动桩服务"""
+    stub = StubServer(routes)
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", stub._dispatch)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    stub.base_url = f"http://{host}:{port}"
+    try:
+        yield stub
+    finally:
+        await runner.cleanup()
+
+def run(coro: Awaitable) -> None:
+    """在新的事件循环中运行，结束时关闭共享HTTP会话（会话与事件循环绑定）"""
+    from typst_bot.core.http import close_session
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_session()
+    return asyncio.run(main())
@@ -0,0 +1,36 @@
+"""Test setup: expose the plugin as the ``typst_bot`` package.
+
+插件目录的 __init__ 会注册nonebot事件处理器和关闭钩子，这里只注册一个同名的
+空包，使 ``typst_bot.core`` 等子模块可以单独导入；运行目录切换到临时目录并复制
+配置文件，插件按相对路径创建的数据文件不会写入仓库。
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import nonebot
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_workdir = Path(tempfile.mkdtemp(prefix="typst_bot_test_"))
+(_workdir / "src/plugins/typst_bot/data").mkdir(parents=True)
+shutil.copy(ROOT / "data/config.json", _workdir / "src/plugins/typst_bot/data/config.json")
+os.chdir(_workdir)
+
+nonebot.init()
+
+if "typst_bot" not in sys.modules:
+    package = types.ModuleType("typst_bot")
+    package.__path__ = [str(ROOT)]
+    sys.modules["typst_bot"] = package
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """在独立的临时目录中运行"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,126 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from aiohttp import web
+
+from _stub import run, serve
+from typst_bot.core import avatar as avatar_module
+from typst_bot.core.avatar import PLACEHOLDER_PNG, AvatarCache, AvatarConfig, image_format
+
+Image = pytest.importorskip("PIL.Image")
+
+def _jpeg(color, size=640):
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+def _avatars(state):
+    """按用户ID返回头像，state["down"] 为真时模拟源站故障"""
+    async def handler(request):
+        if state.get("down"):
+            return web.Response(status=503)
+        user_id = int(request.path.rsplit("/", 1)[-1])
+        return web.Response(body=_jpeg((user_id % 256, 80, 60)), content_type="image/jpeg")
+    return handler
+
+def _cache(stub, tmp_path, **overrides):
+    return AvatarCache(AvatarConfig(
+        url_template=stub.url("/avatar/{user_id}"),
+        cache_dir=tmp_path / "avatars",
+        **overrides
+    ))
+
+def _routes(state, *user_ids):
+    handler = _avatars(state)
+    return {f"/avatar/{user_id}": handler for user_id in user_ids}
+
+def test_downloads_resizes_and_caches(tmp_path):
+    async def main():
+        async with serve(_routes({}, 1)) as stub:
+            cache = _cache(stub, tmp_path, size=64)
+            data = await cache.get(1)
+            assert image_format(data) == "png"
+            with Image.open(io.BytesIO(data)) as image:
+                assert image.size == (64, 64)
+            assert (tmp_path / "avatars/1.png").read_bytes() == data
+
+            # 有效期内命中缓存，不再请求源站
+            assert await cache.get("1") == data
+            assert stub.count("/avatar/1") == 1
+    run(main())
+
+def test_concurrent_requests_share_one_download(tmp_path):
+    async def main():
+        async with serve(_routes({}, 7)) as stub:
+            cache = _cache(stub, tmp_path)
+            results = await asyncio.gather(*(cache.get(7) for _ in range(5)))
+            assert len(set(results)) == 1
+            assert stub.count("/avatar/7") == 1
+    run(main())
+
+def test_expired_avatar_is_refetched_and_used_when_origin_fails(tmp_path):
+    async def main():
+        state = {}
+        async with serve(_routes(state, 2)) as stub:
+            cache = _cache(stub, tmp_path, ttl=60)
+            data = await cache.get(2)
+            path = tmp_path / "avatars/2.png"
+            old = time.time() - 120
+            os.utime(path, (old, old))
+
+            await cache.get(2)
+            assert stub.count("/avatar/2") == 2
+
+            # 源站故障时返回过期缓存
+            os.utime(path, (old, old))
+            state["down"] = True
+            assert await cache.get(2) == data
+    run(main())
+
+def test_placeholder_when_download_fails_without_cache(tmp_path):
+    async def main():
+        async with serve(_routes({"down": True}, 3)) as stub:
+            assert await _cache(stub, tmp_path).get(3) == PLACEHOLDER_PNG
+    run(main())
+
+def test_evicts_oldest_files_over_size_limit(tmp_path):
+    async def main():
+        async with serve(_routes({}, 11, 12, 13)) as stub:
+            cache = _cache(stub, tmp_path, size=32)
+            first = await cache.get(11)
+            cache.config.max_bytes = len(first) * 2 + len(first) // 2
+            for user_id in (12, 13):
+                await asyncio.sleep(0.01)  # 区分文件修改时间
+                await cache.get(user_id)
+
+            files = sorted(path.name for path in (tmp_path / "avatars").iterdir())
+            assert files == ["12.png", "13.png"]
+            assert cache._total_bytes == sum(path.stat().st_size for path in (tmp_path / "avatars").iterdir())
+            assert cache._total_bytes <= cache.config.max_bytes
+
+            # 新实例按磁盘文件统计已用容量
+            assert _cache(stub, tmp_path)._total_bytes == cache._total_bytes
+    run(main())
+
+def test_keeps_original_format_without_pillow(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_module, "Image", None)
+
+    async def main():
+        async with serve(_routes({}, 5)) as stub:
+            cache = _cache(stub, tmp_path)
+            data = await cache.get(5)
+            assert image_format(data) == "jpg"
+            assert sorted(path.name for path in (tmp_path / "avatars").iterdir()) == ["5.jpg"]
+            assert await cache.get(5) == data
+            assert stub.count("/avatar/5") == 1
+    run(main())
+
+def test_image_format():
+    assert image_format(PLACEHOLDER_PNG) == "png"
+    assert image_format(_jpeg((0, 0, 0), 8)) == "jpg"
+    assert image_format(b"GIF89a....") == "gif"
+    assert image_format(b"RIFF\0\0\0\0WEBPVP8 ") == "webp"
+    assert image_format(b"unknown") == "png"
@@ -0,0 +1,120 @@
+import pytest
+
+from typst_bot.core import breaker as breaker_module
+from typst_bot.core.breaker import CLOSED, HALF_OPEN, OPEN, BreakerConfig, CircuitBreaker, CircuitOpenError
+from typst_bot.core.compiler import CompileBackendError, CompileCrashError, CompileLimitError, _is_backend_failure
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", clock)
+    return clock
+
+def _breaker(**overrides):
+    config = BreakerConfig(**{"min_calls": 2, "failure_rate": 0.5, "open_seconds": 10, **overrides})
+    return CircuitBreaker("test", config)
+
+def _fail(breaker, times=1):
+    for _ in range(times):
+        breaker.record_failure(breaker.allow())
+
+def test_trips_on_failure_rate(clock):
+    breaker = _breaker(min_calls=4)
+    breaker.record_success(breaker.allow())
+    breaker.record_success(breaker.allow())
+    _fail(breaker)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+
+def test_open_rejects_with_retry_hint(clock):
+    breaker = _breaker()
+    _fail(breaker, 2)
+    clock.now += 3
+    assert breaker.allow() is None
+    with pytest.raises(CircuitOpenError, match="请 7 秒后再试"):
+        with breaker.guard():
+            pass
+
+def test_half_open_allows_one_probe(clock):
+    breaker = _breaker()
+    _fail(breaker, 2)
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    probe = breaker.allow()
+    assert probe is not None
+    assert breaker.allow() is None
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+
+def test_half_open_hint_does_not_say_zero_seconds(clock):
+    breaker = _breaker()
+    _fail(breaker, 2)
+    clock.now += 10
+    breaker.allow()
+    with pytest.raises(CircuitOpenError) as info:
+        with breaker.guard():
+            pass
+    assert "0 秒" not in str(info.value)
+    assert "正在恢复" in str(info.value)
+
+def test_calls_started_before_trip_are_not_probes(clock):
+    breaker = _breaker()
+    slow = breaker.allow()
+    _fail(breaker, 2)
+    clock.now += 10
+    probe = breaker.allow()
+
+    # 熔断前发起的调用在半开时才成功，不能据此恢复，也不占用探测名额
+    breaker.record_success(slow)
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure(slow)
+    assert breaker.state == HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+
+def test_probe_failure_doubles_open_time(clock):
+    breaker = _breaker(max_open_seconds=15)
+    _fail(breaker, 2)
+    clock.now += 10
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.retry_after == 15
+    clock.now += 15
+    _fail(breaker)
+    assert breaker.retry_after == 15
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = _breaker()
+    _fail(breaker, 2)
+    clock.now += 10
+    breaker.release(breaker.allow())
+    assert breaker.allow() is not None
+
+def test_guard_records_only_backend_failures(clock):
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            with breaker.guard(lambda e: not isinstance(e, ValueError)):
+                raise ValueError("用户输入错误")
+    assert breaker.state == CLOSED
+    for _ in range(2):
+        with pytest.raises(OSError):
+            with breaker.guard(lambda e: not isinstance(e, ValueError)):
+                raise OSError("后端不可用")
+    assert breaker.state == OPEN
+
+def test_document_dependent_compile_errors_are_not_backend_failures():
+    assert _is_backend_failure(CompileBackendError("包下载失败"))
+    assert _is_backend_failure(FileNotFoundError("typst"))
+    assert not _is_backend_failure(CompileLimitError("timeout", "编译超时"))
+    assert not _is_backend_failure(CompileLimitError("killed", "编译进程被终止"))
+    assert not _is_backend_failure(CompileCrashError("Typst编译器异常退出"))
+    assert not _is_backend_failure(RuntimeError("Typst编译错误"))
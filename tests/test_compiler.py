@@ -0,0 +1,97 @@
+import asyncio
+import shutil
+
+import pytest
+
+from typst_bot.core.compiler import CompilerConfig, TypstCompiler
+
+needs_typst = pytest.mark.skipif(shutil.which("typst") is None, reason="需要typst命令行")
+
+def _compiler(**overrides):
+    return TypstCompiler(CompilerConfig(ppi=144, fallback_size=0, **overrides), name="test")
+
+@needs_typst
+def test_oversized_page_is_rejected_before_rasterizing(monkeypatch):
+    compiler = _compiler(max_pixels=1_000_000)
+    monkeypatch.setattr(compiler, "_check_pixels", lambda data: pytest.fail("不应生成图片"))
+    result = asyncio.run(compiler.compile("#set page(width: 10cm, height: auto)\n#lorem(2000)"))
+    assert not result.success
+    assert result.error.startswith("图片尺寸 567x")
+    assert "超过上限（1000000 像素）" in result.error
+
+@needs_typst
+def test_pixel_probe_does_not_change_output():
+    document = "#set page(width: 6cm, height: auto)\n= 标题\n- 列表\n$x^2$"
+    plain = asyncio.run(_compiler().compile(document))
+    probed = asyncio.run(_compiler(max_pixels=10_000_000).compile(document))
+    assert plain.success and probed.success
+    assert probed.content == plain.content
+
+@needs_typst
+def test_error_position_excludes_probe_line():
+    result = asyncio.run(_compiler(max_pixels=10_000_000).compile("a\n\n#let x = "))
+    assert not result.success
+    assert "input.typ:3:" in result.error
+    assert "3 │ #let x =" in result.error
+
+def test_pages_beyond_limit_are_truncated(monkeypatch):
+    compiler = _compiler(max_pages=2)
+
+    async def run_compiler(input_file, output_file, paginate, ppi, timer, line_offset):
+        for page in range(1, 4):
+            output_file.with_name(f"output-{page}.png").write_bytes(b"page %d" % page)
+    monkeypatch.setattr(compiler, "_run_compiler", run_compiler)
+
+    result = asyncio.run(compiler.compile("#lorem(5000)", paginate=True))
+    assert result.success and result.truncated
+    assert len(result.pages) == 2
+
+    monkeypatch.setattr(compiler.config, "max_pages", 3)
+    result = asyncio.run(compiler.compile("#lorem(5000)", paginate=True))
+    assert result.success and not result.truncated
+    assert len(result.pages) == 3
+
+def test_memory_limit_is_off_by_default_and_uses_rlimit_data(monkeypatch):
+    from typst_bot.core import compiler as compiler_module
+
+    resource = pytest.importorskip("resource")
+    calls = []
+    monkeypatch.setattr(resource, "prlimit", lambda pid, limit, value: calls.append((limit, value)), raising=False)
+    monkeypatch.setattr(compiler_module, "resource", resource)
+
+    _compiler()._apply_limits(1)
+    assert all(limit != resource.RLIMIT_AS and limit != resource.RLIMIT_DATA for limit, _ in calls)
+
+    calls.clear()
+    _compiler(max_memory_mb=256)._apply_limits(1)
+    assert (resource.RLIMIT_DATA, (256 << 20, 256 << 20)) in calls
+    assert all(limit != resource.RLIMIT_AS for limit, _ in calls)
+
+@needs_typst
+def test_memory_limit_is_reported():
+    document = "#set page(width: 12cm, height: auto)\n" + "\n\n".join(["汉字排版测试" * 60] * 40)
+    result = asyncio.run(_compiler(max_memory_mb=20).compile(document))
+    assert not result.success
+    assert result.error == "编译内存超过上限（20 MB），请尝试简化代码"
+    assert asyncio.run(_compiler(max_memory_mb=512).compile(document)).success
+
+@pytest.mark.parametrize("canary_ok", [True, False])
+def test_timeout_counts_only_when_canary_fails(monkeypatch, canary_ok):
+    from typst_bot.core.breaker import BreakerConfig, CircuitBreaker
+    from typst_bot.core.compiler import CompileLimitError, _CANARY_DOCUMENT
+
+    compiler = _compiler()
+    compiler.breaker = CircuitBreaker("test", BreakerConfig(min_calls=2))
+
+    async def compile_document(content, *args):
+        if content == _CANARY_DOCUMENT and canary_ok:
+            return ["ok"], False
+        raise CompileLimitError("timeout", "编译超时")
+    monkeypatch.setattr(compiler, "_compile_document", compile_document)
+
+    async def run():
+        result = await compiler.compile("#while true {}")
+        assert result.error == "编译超时"
+        await compiler._canary
+    asyncio.run(run())
+    assert compiler.breaker.state == ("closed" if canary_ok else "open")
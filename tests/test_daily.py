@@ -0,0 +1,120 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import nonebot
+import pytest
+from nonebot.adapters.onebot.v11 import Adapter, Bot, GroupMessageEvent, Message
+from nonebot.message import check_and_run_matcher
+from nonebot.rule import TrieRule
+
+from typst_bot.core.lazy import LazyProxy
+from typst_bot.features import daily
+from typst_bot.features.daily.feature import DailySummaryFeature
+from typst_bot.models import DailySummaryConfig, MessageRecord
+
+SUPERUSER_ID = 42
+
+def _feature(tmp_path, **overrides):
+    return DailySummaryFeature(DailySummaryConfig(
+        model={"api_key": "sk-test"},
+        storage_path=str(tmp_path / "messages.db"),
+        **overrides
+    ))
+
+def _record(index, sender, content, timestamp):
+    return MessageRecord(
+        msg_id=str(index),
+        group_id="1",
+        sender_id=sender,
+        sender_name=f"用户{sender}",
+        content=content,
+        timestamp=timestamp
+    )
+
+def _event(text, message_id, user_id=SUPERUSER_ID):
+    message = Message(text)
+    return GroupMessageEvent.model_validate({
+        "time": int(time.time()),
+        "self_id": 10000,
+        "post_type": "message",
+        "sub_type": "normal",
+        "user_id": user_id,
+        "message_type": "group",
+        "message_id": message_id,
+        "message": message,
+        "original_message": message,
+        "raw_message": text,
+        "font": 0,
+        "sender": {"user_id": user_id, "nickname": f"用户{user_id}"},
+        "group_id": 1,
+        "to_me": False,
+    })
+
+def test_search_command_finds_recorded_message(workdir, monkeypatch):
+    feature = _feature(workdir)
+    monkeypatch.setattr(daily, "daily_summary_feature", LazyProxy(lambda: feature))
+    monkeypatch.setattr(daily.admin_feature, "is_feature_enabled", lambda group_id, feature_type: True)
+    monkeypatch.setattr(nonebot.get_driver().config, "superusers", {str(SUPERUSER_ID)})
+
+    bot = Bot(Adapter(nonebot.get_driver()), "10000")
+    replies = []
+
+    async def send(event, message, **kwargs):
+        replies.append(str(message))
+    monkeypatch.setattr(bot, "send", send)
+
+    async def dispatch(matcher, event):
+        state = {}
+        TrieRule.get_value(bot, event, state)
+        await check_and_run_matcher(matcher, bot, event, state)
+
+    async def main():
+        await dispatch(daily.recorder, _event("typst 的表格怎么合并单元格", 1, user_id=7))
+        await dispatch(daily.search_cmd, _event("/search 合并单元格 7", 2))
+        await dispatch(daily.search_cmd, _event("/search", 3))
+    asyncio.run(main())
+
+    assert replies[0].startswith("找到 1 条相关消息")
+    assert "用户7: typst 的表格怎么合并单元格" in replies[0]
+    assert replies[1] == "用法: /search <关键词> [天数]"
+
+def test_related_context_comes_from_previous_days(workdir):
+    feature = _feature(workdir, context_days=7, context_limit=5)
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    past = [
+        _record(1, "1", "Tinymist 怎么配置预览", today - timedelta(days=2)),
+        _record(2, "2", "今天吃什么", today - timedelta(days=2)),
+        _record(3, "3", "tinymist 预览卡住了", today - timedelta(days=10)),
+    ]
+    messages = [
+        _record(4, "1", "tinymist 又更新了", today),
+        _record(5, "2", "新版 tinymist 支持导出", today),
+    ]
+    feature.save_messages(past + messages)
+
+    context = feature.get_related_context("1", messages)
+    assert [record.msg_id for record in context] == ["1"]
+
+    prompts = []
+
+    async def call_llm(request):
+        prompts.append(request[-1]["content"])
+        return "{}"
+    feature._call_llm = call_llm
+    asyncio.run(feature.analyze_messages(messages, context))
+    assert "往日相关讨论" in prompts[0]
+    assert "Tinymist 怎么配置预览" in prompts[0]
+
+def test_related_context_is_off_by_default(workdir):
+    feature = _feature(workdir)
+    today = datetime.now()
+    feature.save_messages([_record(1, "1", "tinymist", today - timedelta(days=1))])
+    assert feature.get_related_context("1", [_record(2, "1", "tinymist", today)]) == []
+
+def test_scheduled_jobs_do_not_load_unused_feature(monkeypatch):
+    proxy = LazyProxy(lambda: pytest.fail("不应创建功能实例"))
+    monkeypatch.setattr(daily, "daily_summary_feature", proxy)
+    asyncio.run(daily.maintain_database())
+    asyncio.run(daily.backup_database())
+    assert not proxy.loaded
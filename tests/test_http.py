@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from _stub import run, serve
+from typst_bot.core.http import CachedFetcher, FetchConfig
+
+LAST_MODIFIED = "Wed, 01 May 2024 09:00:00 GMT"
+
+def _versioned(state):
+    """按 ETag / Last-Modified 支持条件请求的资源"""
+    async def handler(request):
+        etag = f'"v{state["version"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        if state.get("last_modified") and request.headers.get("If-Modified-Since") == state["last_modified"]:
+            return web.Response(status=304)
+        headers = {"ETag": etag} if state.get("etag", True) else {}
+        if state.get("last_modified"):
+            headers["Last-Modified"] = state["last_modified"]
+        return web.Response(text=f"body v{state['version']}", headers=headers)
+    return handler
+
+def _expire(fetcher, url, seconds):
+    """把缓存条目的获取时间提前，模拟时间流逝"""
+    fetcher._entries[url].fetched_at -= seconds
+
+async def _settle(fetcher):
+    """等待后台刷新完成"""
+    await asyncio.gather(*fetcher._inflight.values(), return_exceptions=True)
+
+def test_fresh_entry_is_served_from_memory():
+    async def main():
+        async with serve({"/t": _versioned({"version": 1})}) as stub:
+            fetcher = CachedFetcher(FetchConfig(ttl=60))
+            assert await fetcher.fetch(stub.url("/t")) == "body v1"
+            assert await fetcher.fetch(stub.url("/t")) == "body v1"
+            assert stub.count("/t") == 1
+    run(main())
+
+def test_concurrent_fetches_are_coalesced():
+    async def main():
+        async def slow(request):
+            await asyncio.sleep(0.05)
+            return web.Response(text="slow")
+
+        async with serve({"/slow": slow}) as stub:
+            fetcher = CachedFetcher()
+            bodies = await asyncio.gather(*(fetcher.fetch(stub.url("/slow")) for _ in range(5)))
+            assert bodies == ["slow"] * 5
+            assert stub.count("/slow") == 1
+    run(main())
+
+def test_stale_entry_is_returned_while_revalidating_with_etag():
+    async def main():
+        state = {"version": 1}
+        async with serve({"/t": _versioned(state)}) as stub:
+            fetcher = CachedFetcher(FetchConfig(ttl=60, stale_ttl=600))
+            url = stub.url("/t")
+            await fetcher.fetch(url)
+
+            # 过期但在 stale_ttl 内：立即返回旧内容，后台条件请求得到304
+            _expire(fetcher, url, 120)
+            assert await fetcher.fetch(url) == "body v1"
+            await _settle(fetcher)
+            assert stub.requests[-1].headers["If-None-Match"] == '"v1"'
+            assert fetcher._entries[url].body == "body v1"
+            assert await fetcher.fetch(url) == "body v1"
+            assert stub.count("/t") == 2
+
+            # 源站内容更新：后台刷新取得新内容，下次请求返回
+            state["version"] = 2
+            _expire(fetcher, url, 120)
+            assert await fetcher.fetch(url) == "body v1"
+            await _settle(fetcher)
+            assert await fetcher.fetch(url) == "body v2"
+    run(main())
+
+def test_revalidates_with_if_modified_since():
+    async def main():
+        state = {"version": 1, "etag": False, "last_modified": LAST_MODIFIED}
+        async with serve({"/t": _versioned(state)}) as stub:
+            fetcher = CachedFetcher(FetchConfig(ttl=60, stale_ttl=0))
+            url = stub.url("/t")
+            await fetcher.fetch(url)
+
+            # 超出 stale_ttl：同步等待条件请求
+            _expire(fetcher, url, 120)
+            assert await fetcher.fetch(url) == "body v1"
+            request = stub.requests[-1]
+            assert request.headers["If-Modified-Since"] == LAST_MODIFIED
+            assert "If-None-Match" not in request.headers
+            assert time.time() - fetcher._entries[url].fetched_at < 60
+            assert await fetcher.fetch(url) == "body v1"
+            assert stub.count("/t") == 2
+    run(main())
+
+def test_falls_back_to_disk_copy_when_origin_is_down(tmp_path):
+    async def main():
+        config = FetchConfig(ttl=60, stale_ttl=0, cache_dir=tmp_path)
+        async with serve({"/t": _versioned({"version": 1})}) as stub:
+            url = stub.url("/t")
+            assert await CachedFetcher(config).fetch(url) == "body v1"
+
+        # 源站已关闭，新的获取器（如重启后）从磁盘读到过期副本
+        fetcher = CachedFetcher(config)
+        fetcher._load_entry(url)
+        _expire(fetcher, url, 3600)
+        assert await fetcher.fetch(url) == "body v1"
+
+        # 没有磁盘副本时抛出错误
+        with pytest.raises(Exception):
+            await CachedFetcher(FetchConfig(cache_dir=tmp_path / "empty")).fetch(url)
+    run(main())
+
+def test_error_status_without_cache_raises():
+    async def main():
+        async with serve({}) as stub:
+            with pytest.raises(RuntimeError, match="HTTP 404"):
+                await CachedFetcher().fetch(stub.url("/missing"))
+    run(main())
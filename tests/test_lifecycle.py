@@ -0,0 +1,52 @@
+import asyncio
+import os
+import signal
+
+from typst_bot.core.lifecycle import LifecycleConfig, LifecycleManager
+
+def test_signal_drains_before_server_handler_runs():
+    lifecycle = LifecycleManager(LifecycleConfig(drain_timeout=5))
+    events = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: events.append("server_exit"))
+
+    @lifecycle.tracked
+    async def request(name):
+        await asyncio.sleep(0.2)
+        events.append(name)
+
+    async def main():
+        await lifecycle.install_signal_handlers()
+        running = asyncio.create_task(request("in_flight"))
+        await asyncio.sleep(0.05)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.01)
+        # 收到信号后不再接收新请求
+        await request("rejected")
+        await running
+        await asyncio.sleep(0.05)
+
+    try:
+        asyncio.run(main())
+    finally:
+        signal.signal(signal.SIGTERM, original)
+    assert events == ["in_flight", "server_exit"]
+    assert not lifecycle.accepting
+
+def test_drain_deadline_is_shared():
+    lifecycle = LifecycleManager(LifecycleConfig(drain_timeout=0.2))
+
+    @lifecycle.tracked
+    async def stuck():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(stuck())
+        await asyncio.sleep(0)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await lifecycle.drain()
+        await lifecycle.shutdown()
+        task.cancel()
+        return loop.time() - started
+
+    assert asyncio.run(main()) < 0.4
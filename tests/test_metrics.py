@@ -0,0 +1,43 @@
+import pytest
+from nonebot.drivers import Request
+
+from typst_bot.core.metrics import MetricsConfig, MetricsRegistry, _authorized, setup_metrics_endpoint
+
+def test_same_metric_is_shared():
+    registry = MetricsRegistry()
+    first = registry.counter("calls_total", "调用数", ("status",))
+    assert registry.counter("calls_total", "调用数", ("status",)) is first
+
+@pytest.mark.parametrize("register", [
+    lambda registry: registry.gauge("calls_total", "调用数", ("status",)),
+    lambda registry: registry.counter("calls_total", "调用数", ("feature",)),
+    lambda registry: registry.counter("calls_total", "调用数"),
+])
+def test_conflicting_registration_raises(register):
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "调用数", ("status",))
+    with pytest.raises(ValueError):
+        register(registry)
+
+def test_collect_callback_is_not_dropped():
+    registry = MetricsRegistry()
+    registry.gauge("queue", "队列长度", collect=lambda: {(): 1})
+    with pytest.raises(ValueError):
+        registry.gauge("queue", "队列长度", collect=lambda: {(): 2})
+
+def test_histogram_buckets_must_match():
+    registry = MetricsRegistry()
+    registry.histogram("latency_seconds", "耗时", buckets=(0.1, 1.0))
+    with pytest.raises(ValueError):
+        registry.histogram("latency_seconds", "耗时", buckets=(0.5,))
+
+def test_token_from_header_or_query():
+    url = "http://127.0.0.1/metrics"
+    assert _authorized(Request("GET", url, headers={"Authorization": "Bearer secret"}), "secret")
+    assert _authorized(Request("GET", url, params={"token": "secret"}), "secret")
+    assert not _authorized(Request("GET", url, headers={"Authorization": "Bearer wrong"}), "secret")
+    assert not _authorized(Request("GET", url), "secret")
+
+def test_endpoint_disabled_by_default():
+    assert MetricsConfig().enabled is False
+    assert setup_metrics_endpoint(object(), MetricsConfig()) is False
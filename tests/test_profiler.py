@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from typst_bot.core.profiler import ProfileResult, ProfilerConfig, SamplingProfiler
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def _profile(tmp_path, schedule):
+    profiler = SamplingProfiler(ProfilerConfig(interval=0.002, slow_callback=0.05, output_dir=tmp_path))
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, schedule, loop)
+        return await profiler.profile(0.6)
+    return asyncio.run(main())
+
+def test_consecutive_short_callbacks_are_not_merged(tmp_path):
+    def schedule(loop):
+        for _ in range(30):
+            loop.call_soon(_busy, 0.01)
+    result = _profile(tmp_path, schedule)
+    assert result.samples > 0
+    assert result.slow_callbacks == []
+
+def test_slow_callback_is_reported(tmp_path):
+    result = _profile(tmp_path, lambda loop: loop.call_soon(_busy, 0.12))
+    assert len(result.slow_callbacks) == 1
+    name, seconds = result.slow_callbacks[0]
+    assert name.endswith(":_busy")
+    assert 0.08 < seconds < 0.3
+
+def test_summary_omits_server_path(tmp_path):
+    path = tmp_path / "profiles" / "profile-20250101-120000.folded"
+    summary = ProfileResult(duration=1.0, samples=0, idle_samples=0, folded_path=str(path)).summary()
+    assert "profile-20250101-120000.folded" in summary
+    assert str(tmp_path) not in summary
@@ -0,0 +1,90 @@
+import pytest
+
+from typst_bot.core import ratelimit as ratelimit_module
+from typst_bot.core.ratelimit import BucketConfig, FeatureLimits, RateLimitConfig, RateLimiter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit_module.time, "monotonic", clock)
+    return clock
+
+def _limiter(**limits):
+    return RateLimiter(RateLimitConfig(features={"render": FeatureLimits(**limits)}))
+
+def test_burst_then_reject(clock):
+    limiter = _limiter(user=BucketConfig(rate=0.5, burst=2))
+    assert limiter.check("render", "1", "10").allowed
+    assert limiter.check("render", "1", "10").allowed
+    decision = limiter.check("render", "1", "10")
+    assert not decision.allowed
+    assert decision.scope == "user"
+    assert decision.retry_after == pytest.approx(2)
+    assert decision.message() == "操作过于频繁，请 2 秒后再试"
+    # 其他用户不受影响
+    assert limiter.check("render", "2", "10").allowed
+
+def test_group_and_global_scopes(clock):
+    limiter = _limiter(group=BucketConfig(rate=1, burst=1), global_=BucketConfig(rate=1, burst=2))
+    assert limiter.check("render", "1", "10").allowed
+    assert limiter.check("render", "2", "10").scope == "group"
+    assert limiter.check("render", "3", "20").allowed
+    decision = limiter.check("render", "4", "30")
+    assert decision.scope == "global"
+    assert decision.message().startswith("机器人繁忙")
+
+def test_reject_consumes_no_tokens(clock):
+    limiter = _limiter(user=BucketConfig(rate=1, burst=5), group=BucketConfig(rate=1, burst=1))
+    assert limiter.check("render", "1", "10").allowed
+    assert not limiter.check("render", "1", "10").allowed
+    assert not limiter.check("render", "1", "10").allowed
+    # 群组桶拒绝时用户桶不应被扣减
+    assert limiter._buckets[("render", "user", "1")].tokens == 4
+
+def test_notifies_once_per_cooldown(clock):
+    limiter = _limiter(user=BucketConfig(rate=0.1, burst=1))
+    limiter.check("render", "1")
+    assert limiter.check("render", "1").notify
+    clock.now += 5
+    assert not limiter.check("render", "1").notify
+    clock.now += 5.1
+    assert limiter.check("render", "1").allowed
+    assert limiter.check("render", "1").notify
+
+def test_tokens_refill_over_time(clock):
+    limiter = _limiter(user=BucketConfig(rate=1, burst=2))
+    for _ in range(2):
+        limiter.check("render", "1")
+    assert not limiter.check("render", "1").allowed
+    clock.now += 1
+    assert limiter.check("render", "1").allowed
+    clock.now += 100
+    for _ in range(2):
+        assert limiter.check("render", "1").allowed
+    assert not limiter.check("render", "1").allowed
+
+def test_evict_drops_full_buckets(clock):
+    limiter = _limiter(user=BucketConfig(rate=1, burst=2))
+    limiter.check("render", "1")
+    limiter.check("render", "2")
+    limiter.check("render", "2")
+    clock.now += 1
+    assert limiter.evict() == 1
+    assert len(limiter) == 1
+    clock.now += 1
+    assert limiter.evict() == 1
+    assert len(limiter) == 0
+
+def test_disabled_or_unknown_feature_is_allowed(clock):
+    limiter = _limiter(user=BucketConfig(rate=0.1, burst=1))
+    assert limiter.check("chat", "1").allowed
+    limiter.config.enabled = False
+    for _ in range(3):
+        assert limiter.check("render", "1").allowed
@@ -0,0 +1,45 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from conftest import ROOT
+from typst_bot.core.lazy import LazyProxy
+
+# 与 benchmarks/bench_import.py 的默认预算一致，测试环境波动较大时放宽到三倍
+IMPORT_BUDGET = 0.3 * 3
+
+def test_plugin_import_stays_lazy_and_within_budget():
+    output = subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks/bench_import.py"), "--child"],
+        capture_output=True, text=True, check=True, cwd=ROOT / "benchmarks"
+    ).stdout
+    run = json.loads(output.strip().splitlines()[-1])
+    assert run["heavy"] == []
+    assert run["load"] < IMPORT_BUDGET
+
+def test_resolve_async_does_not_block_the_loop():
+    def build():
+        time.sleep(0.3)
+        return object()
+    proxy = LazyProxy(build)
+
+    async def main():
+        gaps, last = [], time.perf_counter()
+
+        async def tick():
+            nonlocal last
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+        ticker = asyncio.create_task(tick())
+        instance = await proxy.resolve_async()
+        ticker.cancel()
+        return instance, max(gaps)
+
+    instance, max_gap = asyncio.run(main())
+    assert proxy.loaded and proxy.resolve() is instance
+    assert max_gap < 0.1
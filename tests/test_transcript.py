@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from typst_bot.core.transcript import TranscriptConfig, TranscriptEncoder
+from typst_bot.models import MessageRecord
+
+START = datetime(2024, 5, 1, 9, 0)
+
+def _records(*messages):
+    """(发送者, 内容[, 分钟偏移]) -> MessageRecord 列表"""
+    records = []
+    for index, (sender, content, *minute) in enumerate(messages):
+        records.append(MessageRecord(
+            msg_id=str(index),
+            group_id="1",
+            sender_id=sender,
+            sender_name=f"用户{sender}",
+            content=content,
+            timestamp=START + timedelta(minutes=minute[0] if minute else index * 5)
+        ))
+    return records
+
+def _body(text):
+    return text.splitlines()[2:]
+
+def test_header_and_aliases():
+    text = TranscriptEncoder().encode(_records(("1", "你好"), ("2", "早")))
+    assert text.splitlines()[0] == "成员: A=用户1 B=用户2"
+    assert _body(text) == ["[+0] A: 你好", "[+5] B: 早"]
+
+def test_merges_consecutive_messages_within_window():
+    records = _records(("1", "第一句", 0), ("1", "第二句", 1), ("1", "很久之后", 30))
+    assert _body(TranscriptEncoder().encode(records)) == [
+        "[+0] A: 第一句 / 第二句",
+        "[+30] A: 很久之后",
+    ]
+
+def test_repeat_by_same_sender():
+    records = _records(("1", "哈哈"), ("1", "哈哈"), ("1", "哈哈"))
+    assert _body(TranscriptEncoder().encode(records)) == ["[+0] A: 哈哈 (x3)"]
+
+def test_repeat_by_other_senders_keeps_authorship():
+    records = _records(("1", "666"), ("2", "666"), ("3", "666"), ("2", "666"))
+    assert _body(TranscriptEncoder().encode(records)) == ["[+0] A: 666 (x4 +B +C)"]
+
+def test_repeat_ignores_count_in_user_text():
+    records = _records(("1", "投票结果 (x3)"), ("2", "投票结果 (x3)"))
+    assert _body(TranscriptEncoder().encode(records)) == ["[+0] A: 投票结果 (x3) (x2 +B)"]
+
+def test_new_message_ends_repeat():
+    records = _records(("1", "好"), ("2", "好"), ("3", "不好"), ("1", "不好"))
+    assert _body(TranscriptEncoder().encode(records)) == [
+        "[+0] A: 好 (x2 +B)",
+        "[+10] C: 不好 (x2 +A)",
+    ]
+
+def test_media_aliases_and_runs():
+    records = _records(("1", "[CQ:at,qq=1]看[CQ:image,file=a][CQ:image,file=b][CQ:image,file=c]"))
+    assert _body(TranscriptEncoder().encode(records)) == ["[+0] A: 看[图]x3"]
+
+def test_long_code_is_truncated_and_deduplicated():
+    code = "\n".join(f"print({i})" for i in range(100))
+    encoder = TranscriptEncoder(TranscriptConfig(max_code_chars=50, code_head_lines=2))
+    body = _body(encoder.encode(_records(("1", code), ("2", code))))
+    assert body[:2] == ["[+0] A: print(0)", "print(1)"]
+    assert body[2].startswith("…<#") and body[2].endswith("省略98行>")
+    assert body[3].startswith("[+5] B: <同上代码#")
+
+def test_long_lines_are_truncated_by_characters():
+    code = "\n".join(["const a=1;" * 500, "QUJD" * 1000, "end"])
+    encoder = TranscriptEncoder(TranscriptConfig(max_code_chars=200, code_head_lines=2))
+    body = _body(encoder.encode(_records(("1", code))))
+    assert body == [f"[+0] A: {code[:200]}…<#{body[0].split('<#')[1][:8]} 共{len(code)}字>"]
+    assert len(body[0]) < 260
+
+def test_empty():
+    assert TranscriptEncoder().encode([]) == ""
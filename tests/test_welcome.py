@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import io
+import shutil
+
+import pytest
+
+from typst_bot.core import CompileResult, StageTimer, TemplateManager
+from typst_bot.features.welcome import WelcomeFeature
+from typst_bot.models import WelcomeConfig, WelcomeContext
+
+from conftest import ROOT
+
+def _feature(tmp_path, **overrides):
+    template_dir = tmp_path / "templates"
+    shutil.copytree(ROOT / "data/welcome/templates", template_dir)
+    config = {
+        "template_cache_dir": tmp_path / "cache",
+        "background_cache_dir": tmp_path / "backgrounds",
+        "avatar_cache_dir": tmp_path / "avatars",
+        **overrides
+    }
+    return WelcomeFeature(WelcomeConfig(template_dir=template_dir, **config))
+
+CONTEXT = WelcomeContext(
+    group_id="1",
+    group_name="测试群",
+    user_id="10001",
+    nickname="测试用户Alice",
+    nickname_list='("测试用户Alice",)',
+    count=1,
+    join_time="2024-05-01 09:00:00",
+    member_count=42
+)
+
+@pytest.mark.skipif(shutil.which("typst") is None, reason="需要typst命令行")
+@pytest.mark.parametrize("ppi", [144, 300])
+def test_layered_render_matches_single_pass(tmp_path, ppi):
+    Image = pytest.importorskip("PIL.Image")
+    ImageChops = pytest.importorskip("PIL.ImageChops")
+    feature = _feature(tmp_path, ppi=ppi)
+    avatar = io.BytesIO()
+    Image.new("RGB", (64, 64), (220, 80, 60)).save(avatar, format="JPEG")
+
+    async def fake_avatar(user_id):
+        return avatar.getvalue()
+    feature.avatars.get = fake_avatar
+
+    async def main():
+        layers = feature._get_layers(CONTEXT.group_id)
+        assert layers is not None
+        layered = await feature._render_layers(layers, CONTEXT, StageTimer())
+        template = feature.template_manager.get_template("default").content
+        variables, assets = await feature._avatar_assets(template, [int(CONTEXT.user_id)])
+        assert list(assets) == ["avatar-10001.jpg"]
+        full = await feature.compiler.compile(
+            TemplateManager.render_content(template, {**CONTEXT.model_dump(), **variables}),
+            assets=assets
+        )
+        assert full.success, full.error
+        return layered, full.content
+
+    layered, full = asyncio.run(main())
+    a = Image.open(io.BytesIO(base64.b64decode(layered))).convert("RGBA")
+    b = Image.open(io.BytesIO(base64.b64decode(full))).convert("RGBA")
+    assert a.size == b.size
+    assert ImageChops.difference(a, b).getbbox() is None
+
+def test_background_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    compiled = []
+
+    async def fake_compile(content, **kwargs):
+        compiled.append(content)
+        return CompileResult(success=True, content=base64.b64encode(content.encode()).decode())
+
+    def new_feature(name):
+        feature = _feature(
+            tmp_path / name,
+            background_cache_dir=tmp_path / "backgrounds",
+            background_cache_size=2
+        )
+        monkeypatch.setattr(feature.compiler, "compile", fake_compile)
+        return feature
+
+    def kept():
+        return sorted(path.read_bytes() for path in (tmp_path / "backgrounds").glob("*.png"))
+
+    async def render(feature, *contents):
+        for content in contents:
+            await feature._get_background(content)
+            await asyncio.sleep(0.01)  # 区分文件修改时间
+
+    feature = new_feature("first")
+    asyncio.run(render(feature, "a", "b", "a", "c"))
+    assert compiled == ["a", "b", "c"]
+    assert kept() == [b"b", b"c"]
+
+    # 重启后从磁盘读取的背景更新使用时间，不会先被淘汰
+    compiled.clear()
+    feature = new_feature("second")
+    asyncio.run(render(feature, "b", "d", "c"))
+    assert compiled == ["d", "c"]
+    assert kept() == [b"c", b"d"]
@@ -0,0 +1,108 @@
+import asyncio
+import shutil
+
+import pytest
+
+pytest.importorskip("opencc")
+
+from typst_bot.core.executor import default_executor
+from typst_bot.features import yau as yau_module
+from typst_bot.features.yau import YauFeature
+from typst_bot.models import YauBotConfig
+
+@pytest.fixture
+def feature(tmp_path):
+    return YauFeature(YauBotConfig(template_dir=tmp_path / "templates"))
+
+@pytest.fixture
+def offloaded(monkeypatch):
+    """降低工作池阈值，并记录提交到工作池的片段"""
+    monkeypatch.setattr(default_executor.config, "inline_threshold", 20)
+    calls = []
+    original = default_executor.run
+
+    async def run(func, *args, size=0):
+        calls.append(list(args[1]))
+        return await original(func, *args, size=size)
+    monkeypatch.setattr(default_executor, "run", run)
+    return calls
+
+SENTENCE = "这个头发要理一理，后天再说吧。"
+
+def test_offloaded_conversion_matches_inline(feature, offloaded):
+    text = SENTENCE * 3 + "我们一起去发展软件。"
+    expected = YauFeature(feature.config)._convert_text(text)
+    assert asyncio.run(feature.convert_text(text)) == expected
+    assert "頭髮" in expected
+
+def test_offloaded_conversion_uses_segment_cache(feature, offloaded):
+    first = "这个头发要理一理，后天再说吧，" * 2 + "我们一起去发展软件。"
+    second = "这个头发要理一理，后天再说吧，" * 2 + "国家的面积很大，人口也很多，历史非常悠久。"
+    asyncio.run(feature.convert_text(first))
+    assert offloaded == [["这个头发要理一理，", "后天再说吧，", "我们一起去发展软件。"]]
+
+    # 只有未命中缓存的片段进入工作池，重复片段只转换一次
+    offloaded.clear()
+    asyncio.run(feature.convert_text(second))
+    assert offloaded == [["国家的面积很大，", "人口也很多，", "历史非常悠久。"]]
+
+    # 未命中部分较短时直接在事件循环中转换
+    offloaded.clear()
+    asyncio.run(feature.convert_text(first.replace("我们", "你们")))
+    assert offloaded == []
+
+def _dialog(feature, *lines):
+    request = feature.parse_message("yau " + "\n".join(lines))
+    return [(message.speaker, message.content) for message in request.messages]
+
+def test_parses_speaker_prefixes(feature):
+    assert _dialog(feature, "你们国内的学生", "学生：老师好", "Alice: hi") == [
+        (None, "你们国内的学生"),
+        ("学生", "老师好"),
+        ("Alice", "hi"),
+    ]
+
+def test_single_line_is_not_a_dialog(feature):
+    assert feature.parse_message("yau 学生：老师好").messages == []
+
+@pytest.mark.parametrize("line", [
+    "http://example.com/a:b",
+    "https://typst.app",
+    "注意：这里要加分号",
+    "例如: 这样写",
+    "PS: 顺便一提",
+    "C:\\Users\\me",
+    "12:30 开会",
+])
+def test_lines_that_are_not_speakers(feature, line):
+    assert _dialog(feature, "老师好", line)[1] == (None, line)
+
+def test_time_after_speaker_prefix(feature):
+    assert _dialog(feature, "老师好", "会议时间：12：30")[1] == ("会议时间", "12：30")
+
+MARKUP = "开头*加粗，加粗*，#text(red)[红色，红色]，$a, b$，`x, y`，<lbl>，#emoji.face，结尾。"
+
+@pytest.mark.parametrize("page_chars", [4, 8, 16])
+def test_split_text_never_cuts_markup(feature, page_chars):
+    feature.config.page_chars = page_chars
+    chunks = feature._split_text(MARKUP * 3)
+    assert "".join(chunks) == MARKUP * 3
+    for chunk in chunks:
+        for pair in ("**", "$$", "``", "[]"):
+            assert chunk.count(pair[0]) % 2 == 0 if pair[0] == pair[1] else chunk.count(pair[0]) == chunk.count(pair[1])
+        assert not chunk.startswith(("[", "(", "ed", "bl", "face", "moji"))
+
+def test_split_text_prefers_punctuation(feature):
+    feature.config.page_chars = 10
+    assert feature._split_text("一二三，四五六七，八九十一二。") == ["一二三，四五六七，", "八九十一二。"]
+
+def test_split_text_keeps_unclosed_markup_whole(feature):
+    feature.config.page_chars = 4
+    assert feature._split_text("甲乙，*丙丁，戊己") == ["甲乙，", "*丙丁，戊己"]
+
+@pytest.mark.skipif(shutil.which("typst") is None, reason="需要typst命令行")
+def test_split_chunks_compile(feature):
+    feature.config.page_chars = 6
+    for chunk in feature._split_text(MARKUP * 2):
+        result = asyncio.run(feature.compiler.compile(f"#box[\n{chunk}\n]"))
+        assert result.success, (chunk, result.error)